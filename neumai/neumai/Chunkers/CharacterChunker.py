@@ -1,8 +1,9 @@
 from typing import List, Generator, Optional
 from neumai.Chunkers.Chunker import Chunker
 from neumai.Shared.NeumDocument import NeumDocument
-from langchain.text_splitter import (CharacterTextSplitter)
-from pydantic import Field
+from neumai.Chunkers.splitter_utils import split_text_on_separator
+from neumai.Shared.Tokenizer import Tokenizer
+from pydantic import Field, validator
 
 class CharacterChunker(Chunker):
     """
@@ -24,6 +25,12 @@ class CharacterChunker(Chunker):
 
     separator : Optional[str]
         The separator to be used between chunks. Default is a double newline ("\n\n").
+
+    length_unit : Optional[str]
+        Unit in which chunk_size and chunk_overlap are measured: "characters" (default) or "tokens".
+
+    tokenizer_model : Optional[str]
+        Model whose tokenizer counts tokens when length_unit is "tokens". Default is text-embedding-ada-002.
     """
     
 
@@ -35,6 +42,10 @@ class CharacterChunker(Chunker):
 
     separator: Optional[str] = Field(default="\n\n", description="Optional separator for chunking.")
 
+    length_unit: Optional[str] = Field(default="characters", description="Unit of chunk_size and chunk_overlap: characters or tokens.")
+
+    tokenizer_model: Optional[str] = Field(default="text-embedding-ada-002", description="Model whose tokenizer counts tokens when length_unit is tokens.")
+
     @property
     def chunker_name(self) -> str:
         return "CharacterChunker"
@@ -45,25 +56,20 @@ class CharacterChunker(Chunker):
 
     @property
     def optional_properties(self) -> List[str]:
-        return ["chunk_size", "chunk_overlap", "batch_size", "separator"]
+        return ["chunk_size", "chunk_overlap", "batch_size", "separator", "length_unit", "tokenizer_model", "content_ids"]
 
     def chunk(self, documents:List[NeumDocument]) -> Generator[List[NeumDocument], None, None]:
 
         batch_size = self.batch_size
+        token_counter = Tokenizer.for_model(self.tokenizer_model).count_batch if self.length_unit == "tokens" else None
 
-        text_splitter = CharacterTextSplitter(
-            separator = self.separator,
-            chunk_size = self.chunk_size,
-            chunk_overlap  = self.chunk_overlap,
-            length_function = len,
-        )
-        
         # Iterate through documents to chunk them and them merge them back up
         documents_to_embed:List[NeumDocument] = []
         for doc in documents:
-            chunks = text_splitter.split_text(doc.content)
+            chunks = split_text_on_separator(doc.content, chunk_size=self.chunk_size, chunk_overlap=self.chunk_overlap, separator=self.separator, token_counter=token_counter)
+            chunk_ids = self.chunk_ids(doc_id=doc.id, contents=chunks)
             for i in range(len(chunks)):
-                documents_to_embed.append(NeumDocument(id=doc.id + "_" + str(i), content=chunks[i], metadata=doc.metadata))
+                documents_to_embed.append(NeumDocument(id=chunk_ids[i], content=chunks[i], metadata=doc.metadata))
                 if(len(documents_to_embed) == batch_size):
                     yield documents_to_embed
                     documents_to_embed = []
@@ -72,5 +78,11 @@ class CharacterChunker(Chunker):
         if(len(documents_to_embed) > 0):
             yield documents_to_embed
 
+    @validator("length_unit")
+    def validate_length_unit(cls, value):
+        if value not in ("characters", "tokens"):
+            raise ValueError("length_unit must be characters or tokens")
+        return value
+
     def config_validation(self) -> bool:
         return True   
\ No newline at end of file
@@ -1,9 +1,29 @@
 from abc import abstractmethod, ABC
 from neumai.Shared.NeumDocument import NeumDocument
-from typing import List, Generator
-from pydantic import BaseModel
+from typing import Dict, List, Generator, Optional
+from pydantic import BaseModel, Field
+import hashlib
 import json
+
+def content_chunk_ids(doc_id:str, contents:List[str], occurrences:Optional[Dict[str, int]] = None) -> List[str]:
+    """Stable chunk ids derived from the content of each chunk instead of its position in the document.
+
+    Editing a paragraph only changes the ids of the chunks containing it. Identical chunks within a document are told
+    apart by their occurrence, counted in `occurrences` (pass the same dict for every batch of chunks of a document).
+    """
+    if occurrences is None:
+        occurrences = {}
+    ids = []
+    for content in contents:
+        digest = hashlib.sha256(content.encode("utf-8")).hexdigest()[:32]
+        occurrence = occurrences.get(digest, 0)
+        occurrences[digest] = occurrence + 1
+        ids.append(f"{doc_id}_{digest}" + (f"_{occurrence}" if occurrence else ""))
+    return ids
+
 class Chunker(ABC, BaseModel):
+
+    content_ids: Optional[bool] = Field(default=False, description="Identify chunks by a hash of their content instead of their position.")
     
     @property
     @abstractmethod
@@ -24,6 +44,12 @@ class Chunker(ABC, BaseModel):
     def chunk(self, documents:List[NeumDocument]) -> Generator[List[NeumDocument], None, None]:
         """Chunk documents into more documents"""
 
+    def chunk_ids(self, doc_id:str, contents:List[str]) -> List[str]:
+        """Ids of the chunks of a document: `<doc id>_<position>`, or content hashes if `content_ids` is set"""
+        if self.content_ids:
+            return content_chunk_ids(doc_id=doc_id, contents=contents)
+        return [doc_id + "_" + str(i) for i in range(len(contents))]
+
     @abstractmethod
     def config_validation(self) -> bool:
         """config_validation if the chunker is correctly configured"""
@@ -33,7 +33,7 @@ class CustomChunker(Chunker):
 
     @property
     def optional_properties(self) -> List[str]:
-        return ["batch_size"]
+        return ["batch_size", "content_ids"]
 
     def chunk(self, documents:List[NeumDocument]) -> Generator[List[NeumDocument], None, None]:
         try:
@@ -52,8 +52,9 @@ class CustomChunker(Chunker):
         documents_to_embed:List[NeumDocument] = []
         for doc in documents:
             chunks = semantic_chunking(documents=[doc], chunking_code_exec=chunking_code_exec)
+            chunk_ids = self.chunk_ids(doc_id=doc.id, contents=[chunk.page_content for chunk in chunks])
             for i in range(len(chunks)):
-                documents_to_embed.append(NeumDocument(id=doc.id + "_" + str(i), content=chunks[i].page_content, metadata=doc.metadata))
+                documents_to_embed.append(NeumDocument(id=chunk_ids[i], content=chunks[i].page_content, metadata=doc.metadata))
                 if(len(documents_to_embed) == batch_size):
                     yield documents_to_embed
                     documents_to_embed = []
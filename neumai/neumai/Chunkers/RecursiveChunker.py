@@ -1,8 +1,9 @@
 from typing import List, Generator, Optional
 from neumai.Chunkers.Chunker import Chunker
 from neumai.Shared.NeumDocument import NeumDocument
-from langchain.text_splitter import (RecursiveCharacterTextSplitter)
-from pydantic import Field
+from neumai.Chunkers.splitter_utils import split_text_recursive
+from neumai.Shared.Tokenizer import Tokenizer
+from pydantic import Field, validator
 
 class RecursiveChunker(Chunker):
 
@@ -24,6 +25,12 @@ class RecursiveChunker(Chunker):
 
     separators : Optional[List[str]]
         A list of optional separators to be used for recursive chunking. Each separator defines a new level of chunking. Default separators include newline and space characters.
+
+    length_unit : Optional[str]
+        Unit in which chunk_size and chunk_overlap are measured: "characters" (default) or "tokens". Token sizes match chunks to the context window of the embedding model.
+
+    tokenizer_model : Optional[str]
+        Model whose tokenizer counts tokens when length_unit is "tokens". Default is text-embedding-ada-002.
     """
 
     chunk_size: Optional[int] = Field(default=500, description="Optional chunk size.")
@@ -34,6 +41,10 @@ class RecursiveChunker(Chunker):
 
     separators: Optional[List[str]] = Field(["\n\n", "\n", " ", ""], description="Optional list of separators for chunking.")
 
+    length_unit: Optional[str] = Field(default="characters", description="Unit of chunk_size and chunk_overlap: characters or tokens.")
+
+    tokenizer_model: Optional[str] = Field(default="text-embedding-ada-002", description="Model whose tokenizer counts tokens when length_unit is tokens.")
+
     @property
     def chunker_name(self) -> str:
         return "RecursiveChunker"
@@ -44,26 +55,21 @@ class RecursiveChunker(Chunker):
 
     @property
     def optional_properties(self) -> List[str]:
-        return ["chunk_size", "chunk_overlap", "batch_size", "separators"]
+        return ["chunk_size", "chunk_overlap", "batch_size", "separators", "length_unit", "tokenizer_model", "content_ids"]
 
 
     def chunk(self, documents:List[NeumDocument]) -> Generator[List[NeumDocument], None, None]:
         
         batch_size = self.batch_size
-
-        text_splitter = RecursiveCharacterTextSplitter(
-            separators = self.separators,
-            chunk_size = self.chunk_size,
-            chunk_overlap  = self.chunk_overlap,
-            length_function = len,
-        )
+        token_counter = Tokenizer.for_model(self.tokenizer_model).count_batch if self.length_unit == "tokens" else None
 
         # Iterate through documents to chunk them and them merge them back up
         documents_to_embed:List[NeumDocument] = []
         for doc in documents:
-            chunks = text_splitter.split_text(doc.content)
+            chunks = split_text_recursive(doc.content, chunk_size=self.chunk_size, chunk_overlap=self.chunk_overlap, separators=self.separators, token_counter=token_counter)
+            chunk_ids = self.chunk_ids(doc_id=doc.id, contents=chunks)
             for i in range(len(chunks)):
-                documents_to_embed.append(NeumDocument(id=doc.id + "_" + str(i), content=chunks[i], metadata=doc.metadata))
+                documents_to_embed.append(NeumDocument(id=chunk_ids[i], content=chunks[i], metadata=doc.metadata))
                 if(len(documents_to_embed) == batch_size):
                     yield documents_to_embed
                     documents_to_embed = []
@@ -72,5 +78,11 @@ class RecursiveChunker(Chunker):
         if(len(documents_to_embed) > 0):
             yield documents_to_embed
     
+    @validator("length_unit")
+    def validate_length_unit(cls, value):
+        if value not in ("characters", "tokens"):
+            raise ValueError("length_unit must be characters or tokens")
+        return value
+
     def config_validation(self) -> bool:
         return True   
\ No newline at end of file
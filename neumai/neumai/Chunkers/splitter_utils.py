@@ -0,0 +1,126 @@
+from typing import Callable, List, Optional, Sequence, Tuple
+
+# Text splitters used by `RecursiveChunker` and `CharacterChunker`.
+#
+# They produce the same chunks as langchain's RecursiveCharacterTextSplitter / CharacterTextSplitter (lengths measured
+# with `len`, separators matched literally, chunks stripped of surrounding whitespace), but split the text into
+# (start, end) offsets and only slice the original string once per chunk instead of copying every intermediate piece.
+#
+# Sizes are measured in characters, or in tokens when a `token_counter` is given. The counter receives the pieces of a
+# level of splitting at once, so tokenizers can encode them as a batch.
+
+DEFAULT_SEPARATORS = ["\n\n", "\n", " ", ""]
+
+def _check_sizes(chunk_size:int, chunk_overlap:int) -> None:
+    if chunk_overlap > chunk_size:
+        raise ValueError(f"Got a larger chunk overlap ({chunk_overlap}) than chunk size ({chunk_size}), should be smaller.")
+
+def _split_offsets(text:str, start:int, end:int, separator:str, keep_separator:bool) -> Tuple[Sequence[int], Sequence[int]]:
+    """Offsets of the non empty pieces of text[start:end] around `separator`.
+
+    With `keep_separator`, every piece but the first starts with the separator preceding it.
+    """
+    if not separator:
+        return range(start, end), range(start + 1, end + 1)
+    starts = []
+    ends = []
+    separator_length = len(separator)
+    piece_start = start
+    position = text.find(separator, start, end)
+    while position != -1:
+        if position > piece_start:
+            starts.append(piece_start)
+            ends.append(position)
+        piece_start = position if keep_separator else position + separator_length
+        position = text.find(separator, position + separator_length, end)
+    if end > piece_start:
+        starts.append(piece_start)
+        ends.append(end)
+    return starts, ends
+
+def _piece_lengths(text:str, starts:Sequence[int], ends:Sequence[int], token_counter:Optional[Callable[[List[str]], List[int]]]) -> Sequence[int]:
+    if token_counter is None:
+        return [end - start for start, end in zip(starts, ends)]
+    return token_counter([text[start:end] for start, end in zip(starts, ends)])
+
+def _merge_offsets(text:str, starts:Sequence[int], ends:Sequence[int], lengths:Sequence[int], lo:int, hi:int, separator:str, separator_length:int, chunk_size:int, chunk_overlap:int, chunks:List[str], in_characters:bool) -> None:
+    """Packs pieces lo..hi into chunks of up to `chunk_size`, overlapping by up to `chunk_overlap`, appended to `chunks`"""
+    first = lo
+    total = 0
+    for i in range(lo, hi):
+        length = lengths[i]
+        if total + length + (separator_length if i > first else 0) > chunk_size:
+            if i > first:
+                _append_chunk(text, starts, ends, first, i, separator, chunks, total if in_characters else None)
+                # Drop pieces from the start of the chunk until what is left fits in the overlap and leaves room for this piece
+                while total > chunk_overlap or (total + length + (separator_length if i > first else 0) > chunk_size and total > 0):
+                    total -= lengths[first] + (separator_length if i - first > 1 else 0)
+                    first += 1
+        total += length + (separator_length if i > first else 0)
+    if hi > first:
+        _append_chunk(text, starts, ends, first, hi, separator, chunks, total if in_characters else None)
+
+def _append_chunk(text:str, starts:Sequence[int], ends:Sequence[int], first:int, last:int, separator:str, chunks:List[str], length:Optional[int]) -> None:
+    # `length` is the number of characters of the pieces joined by the separator, if known
+    start = starts[first]
+    end = ends[last - 1]
+    if length is not None:
+        adjacent = end - start == length
+    else:
+        adjacent = not separator or all(starts[i + 1] - ends[i] == len(separator) for i in range(first, last - 1))
+    if adjacent:
+        # Pieces are adjacent in the text (with their separators in between), slice them in one go
+        chunk = text[start:end].strip()
+    else:
+        chunk = separator.join([text[starts[i]:ends[i]] for i in range(first, last)]).strip()
+    if chunk:
+        chunks.append(chunk)
+
+def _split_recursive(text:str, start:int, end:int, separators:List[str], chunk_size:int, chunk_overlap:int, token_counter:Optional[Callable[[List[str]], List[int]]], chunks:List[str]) -> None:
+    # Split on the first separator found in the text, pieces that are still too long are split on the following ones
+    separator = separators[-1]
+    next_separators:List[str] = []
+    for i, candidate in enumerate(separators):
+        if candidate == "":
+            separator = candidate
+            break
+        if text.find(candidate, start, end) != -1:
+            separator = candidate
+            next_separators = separators[i + 1:]
+            break
+
+    starts, ends = _split_offsets(text, start, end, separator, keep_separator=True)
+    lengths = _piece_lengths(text, starts, ends, token_counter)
+    # Separators are kept at the start of pieces, so pieces are merged back without one
+    good_start = None
+    for i in range(len(starts)):
+        if lengths[i] < chunk_size:
+            if good_start is None:
+                good_start = i
+            continue
+        if good_start is not None:
+            _merge_offsets(text, starts, ends, lengths, good_start, i, "", 0, chunk_size, chunk_overlap, chunks, token_counter is None)
+            good_start = None
+        if next_separators:
+            _split_recursive(text, starts[i], ends[i], next_separators, chunk_size, chunk_overlap, token_counter, chunks)
+        else:
+            chunks.append(text[starts[i]:ends[i]])
+    if good_start is not None:
+        _merge_offsets(text, starts, ends, lengths, good_start, len(starts), "", 0, chunk_size, chunk_overlap, chunks, token_counter is None)
+
+def split_text_recursive(text:str, chunk_size:int, chunk_overlap:int, separators:Optional[List[str]] = None, token_counter:Optional[Callable[[List[str]], List[int]]] = None) -> List[str]:
+    """Splits text on the first of `separators` it contains, recursing into pieces longer than `chunk_size` with the next separators"""
+    _check_sizes(chunk_size, chunk_overlap)
+    chunks:List[str] = []
+    _split_recursive(text, 0, len(text), separators or DEFAULT_SEPARATORS, chunk_size, chunk_overlap, token_counter, chunks)
+    return chunks
+
+def split_text_on_separator(text:str, chunk_size:int, chunk_overlap:int, separator:str = "\n\n", token_counter:Optional[Callable[[List[str]], List[int]]] = None) -> List[str]:
+    """Splits text on `separator` and merges the pieces back, joined by the separator, into chunks of up to `chunk_size`"""
+    _check_sizes(chunk_size, chunk_overlap)
+    chunks:List[str] = []
+    starts, ends = _split_offsets(text, 0, len(text), separator, keep_separator=False)
+    lengths = _piece_lengths(text, starts, ends, token_counter)
+    separator_length = len(separator) if token_counter is None else token_counter([separator])[0]
+    _merge_offsets(text, starts, ends, lengths, 0, len(starts), separator, separator_length, chunk_size, chunk_overlap, chunks, token_counter is None)
+    return chunks
@@ -2,11 +2,10 @@ from datetime import datetime
 from neumai.DataConnectors import DataConnector
 from typing import List, Generator, Optional
 from azure.storage.blob import BlobClient, ContainerClient
-from neumai.Shared.LocalFile import LocalFile
+from neumai.Shared.LocalFile import LocalFile, DEFAULT_MAX_IN_MEMORY_SIZE
 from neumai.Shared.CloudFile import CloudFile
 from neumai.Shared.Exceptions import AzureBlobConnectionException
 from neumai.Shared.Selector import Selector
-import tempfile
 import os
 from pydantic import Field
 
@@ -77,7 +76,7 @@ class AzureBlobConnector(DataConnector):
                 "last_access_on": file.last_accessed_on.isoformat() if file.last_accessed_on is not None else None
             }
             selected_metadata  = {k: metadata[k] for k in self.selector.to_metadata if k in metadata}
-            yield CloudFile(file_identifier=name, metadata=selected_metadata, id = name)
+            yield CloudFile(file_identifier=name, metadata=selected_metadata, id = name, etag=file.etag, last_modified=file.last_modified.isoformat())
 
     def connect_and_list_delta(self, last_run:datetime) -> Generator[CloudFile, None, None]:
         container = ContainerClient.from_connection_string(
@@ -96,17 +95,24 @@ class AzureBlobConnector(DataConnector):
                     "last_access_on": file.last_accessed_on.isoformat() if file.last_accessed_on is not None else None
                 }
                 selected_metadata  = {k: metadata[k] for k in self.selector.to_metadata if k in metadata}
-                yield CloudFile(file_identifier=name, metadata=selected_metadata, id=name)
+                yield CloudFile(file_identifier=name, metadata=selected_metadata, id=name, etag=file.etag, last_modified=file.last_modified.isoformat())
 
     def connect_and_download(self,  cloudFile:CloudFile) -> Generator[LocalFile, None, None]:
         client = BlobClient.from_connection_string(conn_str=self.connection_string, container_name=self.container_name, blob_name=cloudFile.file_identifier)
-        with tempfile.TemporaryDirectory() as temp_dir:
-            file_path = f"{temp_dir}/{self.container_name}/{cloudFile.file_identifier}"
-            os.makedirs(os.path.dirname(file_path), exist_ok=True)
-            with open(f"{file_path}", "wb") as file:
-                blob_data = client.download_blob()
+        suffix = os.path.splitext(cloudFile.file_identifier)[1]
+        blob_data = client.download_blob()
+        if blob_data.size <= DEFAULT_MAX_IN_MEMORY_SIZE:
+            yield LocalFile(content=blob_data.readall(), metadata=cloudFile.metadata, id=cloudFile.id, suffix=suffix)
+            return
+        # Large blobs are streamed to a temporary file, removed once loaded
+        localFile = LocalFile.spill_file(metadata=cloudFile.metadata, id=cloudFile.id, suffix=suffix)
+        try:
+            with open(localFile.file_path, "wb") as file:
                 blob_data.readinto(file)
-            yield LocalFile(file_path=file_path, metadata=cloudFile.metadata, id=cloudFile.id)
+        except Exception:
+            localFile.close()
+            raise
+        yield localFile
         
     def config_validation(self) -> bool:
         if not all(x in self.available_metadata for x in self.selector.to_metadata):
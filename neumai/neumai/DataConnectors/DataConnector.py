@@ -1,8 +1,9 @@
 from abc import abstractmethod, ABC
-from typing import List, Generator
+from typing import List, Generator, AsyncGenerator
 from neumai.Shared.LocalFile import LocalFile
 from neumai.Shared.CloudFile import CloudFile
 from neumai.Shared.Selector import Selector
+from neumai.Shared.async_utils import iterate_in_thread
 from datetime import datetime
 from pydantic import BaseModel
 import json
@@ -53,6 +54,14 @@ class DataConnector(BaseModel, ABC):
         """Check for changes in the source"""
         """Code to be pushed to a worker and run on a schedule"""
     
+    def connect_and_list_sync(self) -> Generator[CloudFile, None, None]:
+        """Files listed by `Pipeline.sync`. The id of a file must not change as long as its content doesn't.
+
+        By default the files of a full listing. Connectors whose files are batches of rows override it, since inserting
+        a row would move the rows of every later batch.
+        """
+        yield from self.connect_and_list_full()
+
     @abstractmethod
     def connect_and_download(self, cloudFile:CloudFile) -> Generator[LocalFile, None, None]:
         """Connect to source and download file into local storage"""
@@ -61,6 +70,21 @@ class DataConnector(BaseModel, ABC):
     def config_validation(self) -> bool:
         """config_validation if the connector is correctly configured"""
 
+    async def aconnect_and_list_full(self) -> AsyncGenerator[CloudFile, None]:
+        """Async version of connect_and_list_full. By default the blocking generator is run in a worker thread."""
+        async for cloudFile in iterate_in_thread(self.connect_and_list_full()):
+            yield cloudFile
+
+    async def aconnect_and_list_delta(self, last_run:datetime) -> AsyncGenerator[CloudFile, None]:
+        """Async version of connect_and_list_delta. By default the blocking generator is run in a worker thread."""
+        async for cloudFile in iterate_in_thread(self.connect_and_list_delta(last_run=last_run)):
+            yield cloudFile
+
+    async def aconnect_and_download(self, cloudFile:CloudFile) -> AsyncGenerator[LocalFile, None]:
+        """Async version of connect_and_download. By default the blocking generator is run in a worker thread."""
+        async for localFile in iterate_in_thread(self.connect_and_download(cloudFile=cloudFile)):
+            yield localFile
+
     # To do auto_sync logic.
 
     def as_json(self):
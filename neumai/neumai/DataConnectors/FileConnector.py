@@ -1,12 +1,13 @@
 from datetime import datetime
-from typing import List, Generator, Optional
+from typing import List, Generator, AsyncGenerator, Optional, Tuple
 from neumai.DataConnectors.DataConnector import DataConnector
 from neumai.Shared.LocalFile import LocalFile
 from neumai.Shared.CloudFile import CloudFile
 from neumai.Shared.Selector import Selector
 from pydantic import Field
 from neumai.Shared.Exceptions import NeumFileException
-import tempfile
+
+DEFAULT_HEADERS = {"user-agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/88.0.4324.182 Safari/537.36"}
 
 class FileConnector(DataConnector):
     """
@@ -59,22 +60,46 @@ class FileConnector(DataConnector):
     def connect_and_list_full(self) -> Generator[CloudFile, None, None]:
         availableMetadata = {'url':self.url}
         selected_metadata  = {k: availableMetadata[k] for k in self.selector.to_metadata if k in availableMetadata}
-        yield CloudFile(file_identifier=self.url, metadata=selected_metadata, id=self.url)
+        etag, last_modified = self._get_version(self.url)
+        yield CloudFile(file_identifier=self.url, metadata=selected_metadata, id=self.url, etag=etag, last_modified=last_modified)
 
     def connect_and_list_delta(self, last_run:datetime) -> Generator[CloudFile, None, None]:
         # Delta is not different, we are just getting one file. 
-        yield self.connect_and_list_full()
+        yield from self.connect_and_list_full()
+
+    def _get_version(self, url:str) -> Tuple[Optional[str], Optional[str]]:
+        """ETag and Last-Modified headers of the file, if the server provides them"""
+        import requests
+
+        try:
+            response = requests.head(url, headers=DEFAULT_HEADERS, allow_redirects=True)
+        except requests.RequestException:
+            return None, None
+        if not response.ok:
+            return None, None
+        return response.headers.get("ETag"), response.headers.get("Last-Modified")
 
     def connect_and_download(self, cloudFile:CloudFile) -> Generator[LocalFile, None, None]:
         # Connect to random file location
         import requests
-        import os
-        from urllib.parse import urlparse
 
-        headers = {"user-agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/88.0.4324.182 Safari/537.36"}
-        response = requests.get(cloudFile.file_identifier, headers=headers)
+        response = requests.get(cloudFile.file_identifier, headers=DEFAULT_HEADERS)
         if not response.ok:
             raise NeumFileException(f"File can't be accessed. Please make sure it is publicly available.")     
+        yield self._write_local_file(cloudFile=cloudFile, content=response.content)
+
+    async def aconnect_and_download(self, cloudFile:CloudFile) -> AsyncGenerator[LocalFile, None]:
+        import httpx
+
+        async with httpx.AsyncClient(headers=DEFAULT_HEADERS, follow_redirects=True) as client:
+            response = await client.get(cloudFile.file_identifier)
+        if not response.is_success:
+            raise NeumFileException(f"File can't be accessed. Please make sure it is publicly available.")
+        yield self._write_local_file(cloudFile=cloudFile, content=response.content)
+
+    def _write_local_file(self, cloudFile:CloudFile, content:bytes) -> LocalFile:
+        import os
+        from urllib.parse import urlparse
 
         # Parse the URL to get the path
         path = urlparse(cloudFile.file_identifier).path
@@ -82,10 +107,8 @@ class FileConnector(DataConnector):
         # Extract the file extension
         file_extension = os.path.splitext(path)[1]
 
-        # Download file
-        with tempfile.NamedTemporaryFile(delete=False, suffix=file_extension) as temp_file:
-            temp_file.write(response.content)
-            yield LocalFile(file_path=temp_file.name, metadata=cloudFile.metadata, id=cloudFile.id, type=file_extension)
+        # Small files are handed to the loader in memory, large ones are spilled to a temporary file
+        return LocalFile.from_bytes(content=content, metadata=cloudFile.metadata, id=cloudFile.id, type=file_extension, suffix=file_extension)
 
     def config_validation(self) -> bool:
         import requests
@@ -1,15 +1,26 @@
-from psycopg2.extras import DictCursor
-from datetime import datetime
+from psycopg2 import sql
+from datetime import date, datetime, time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from threading import Event
 from neumai.DataConnectors.DataConnector import DataConnector
-from typing import List, Generator, Optional
+from typing import Any, List, Generator, Optional, Tuple, Union
 from neumai.Shared.LocalFile import LocalFile
 from neumai.Shared.CloudFile import CloudFile
 from neumai.Shared.Selector import Selector
-from neumai.Shared.Exceptions import PostgresConnectionException
+from neumai.Shared.Exceptions import PostgresConnectionException, PostgresChangeCaptureException
+from neumai.DataConnectors.pgoutput_utils import decode_row_changes
 from decimal import Decimal
-from pydantic import Field
+from pydantic import Field, validator
 import psycopg2
+import hashlib
 import json
+import queue
+
+_PARTITION_DONE = object()
+
+# Values returned by psycopg2 that are already JSON compatible
+_JSON_TYPES = (str, int, float, bool, dict, type(None))
 
 class PostgresConnector(DataConnector):
     """
@@ -24,8 +35,30 @@ class PostgresConnector(DataConnector):
         Connection string for the Postgres database.
     query : str
         Query to be executed to pull data from the database. (i.e. Select * From TableName)
+    batch_size : Optional[int]
+        Number of rows per batch. Rows are also fetched from the database in pages of this size. Default is 1000.
     selector : Optional[Selector]
         Optional selector object to define what data data should be used to generate embeddings or stored as metadata with the vector.
+    partition_column : Optional[str]
+        Unique, indexed column returned by the query (i.e. the primary key). If set, rows are read with keyset pagination ordered by this column instead of a single server-side cursor.
+    num_partitions : Optional[int]
+        Number of ranges of `partition_column` read in parallel, each over its own connection. Only numeric columns are split. Default is 1.
+    serialize_batches : Optional[bool]
+        Store batches in the CloudFiles as JSON strings. By default rows are handed to the loader as dictionaries, without being serialized and parsed again.
+    delta_mode : Optional[str]
+        How changed rows are found by delta runs: "full" (every row, the default), "watermark" (rows whose `watermark_column` is after the last run) or "logical_replication" (changes read from a logical replication slot, including deleted rows).
+    key_column : Optional[str]
+        Unique column returned by the query identifying rows in delta runs and syncs. Changed rows are listed as files with id `Postgres_<key>`. Default is "id".
+    watermark_column : Optional[str]
+        Column holding the last update time of rows (i.e. updated_at). Required for the "watermark" delta mode.
+    soft_delete_column : Optional[str]
+        Boolean column marking rows as deleted. Changed rows with it set are listed as deleted in the "watermark" delta mode.
+    replication_table : Optional[str]
+        Table (i.e. public.items) whose changes are read from the replication slot. Required for the "logical_replication" delta mode.
+    replication_slot : Optional[str]
+        Name of the logical replication slot. Created with the pgoutput plugin if it doesn't exist. Default is "neumai_slot".
+    publication : Optional[str]
+        Name of the publication of `replication_table` read by the slot. Created if it doesn't exist. Default is "neumai_publication".
     
     """
 
@@ -37,6 +70,26 @@ class PostgresConnector(DataConnector):
     
     selector: Optional[Selector] = Field(Selector(to_embed=[], to_metadata=[]), description="Selector for data connector metadata")
 
+    partition_column: Optional[str] = Field(None, description="Unique column used for keyset pagination and partitioned reads.")
+
+    num_partitions: Optional[int] = Field(1, description="Number of partitions read in parallel.")
+
+    serialize_batches: Optional[bool] = Field(False, description="Store batches as JSON strings.")
+
+    delta_mode: Optional[str] = Field("full", description="Delta mode: full, watermark or logical_replication.")
+
+    key_column: Optional[str] = Field("id", description="Unique column identifying rows in delta runs and syncs.")
+
+    watermark_column: Optional[str] = Field(None, description="Last update time column for the watermark delta mode.")
+
+    soft_delete_column: Optional[str] = Field(None, description="Column marking rows as deleted for the watermark delta mode.")
+
+    replication_table: Optional[str] = Field(None, description="Table read from the replication slot.")
+
+    replication_slot: Optional[str] = Field("neumai_slot", description="Name of the logical replication slot.")
+
+    publication: Optional[str] = Field("neumai_publication", description="Name of the publication read by the replication slot.")
+
     @property
     def connector_name(self) -> str:
         return "PostgresConnector"
@@ -47,12 +100,18 @@ class PostgresConnector(DataConnector):
 
     @property
     def optional_properties(self) -> List[str]:
-        return ["batch_size"]
+        return ["batch_size", "partition_column", "num_partitions", "serialize_batches", "delta_mode", "key_column", "watermark_column", "soft_delete_column", "replication_table", "replication_slot", "publication"]
     
     @property
     def available_metadata(self) -> str:
         return []
 
+    @validator("delta_mode")
+    def validate_delta_mode(cls, value):
+        if value not in ("full", "watermark", "logical_replication"):
+            raise ValueError(f"{value} is an invalid delta mode. Available modes: ['full', 'watermark', 'logical_replication']")
+        return value
+
     @property
     def schedule_avaialable(self) -> bool:
         return True
@@ -74,6 +133,10 @@ class PostgresConnector(DataConnector):
             return super().default(obj)
     
     def connect_and_list_full(self) -> Generator[CloudFile, None, None]:
+        if self.partition_column:
+            yield from self._list_partitioned()
+            return
+
         connection_string = self.connection_string
         query = self.query
         
@@ -81,32 +144,297 @@ class PostgresConnector(DataConnector):
         batch_size = self.batch_size
 
         with psycopg2.connect(connection_string) as connection:
-            with connection.cursor(cursor_factory=DictCursor, name='neumai') as cursor:
-                cursor.itersize = 1000  # fetch 1000 rows at a time
+            with connection.cursor(name='neumai') as cursor:
+                cursor.itersize = batch_size  # fetch a batch of rows per round trip
                 cursor.execute(query)
                 batch_rows = []
+                batch_number = 0
+                column_names = None
                 for row in cursor:
-                    serialized_string = json.dumps(dict(row),cls=self.CustomEncoder)
-                    serialized_dict = json.loads(serialized_string)
-                    batch_rows.append(serialized_dict)
+                    if column_names is None:
+                        # Only available once the server-side cursor returned its first rows
+                        column_names = [column.name for column in cursor.description]
+                    batch_rows.append(self._normalize_row(column_names=column_names, row=row))
                     if(len(batch_rows) == batch_size):
-                        yield CloudFile(data=json.dumps(batch_rows), metadata={}, id="Postgres")
+                        yield self._batch_file(batch_rows=batch_rows, batch_id=batch_number)
                         batch_rows = []
+                        batch_number += 1
                 if len(batch_rows) > 0:
-                    yield CloudFile(data=json.dumps(batch_rows), metadata={}, id="Postgres")
+                    yield self._batch_file(batch_rows=batch_rows, batch_id=batch_number)
+
+    def _list_partitioned(self) -> Generator[CloudFile, None, None]:
+        with closing(psycopg2.connect(self.connection_string)) as connection:
+            partitions = self._partitions(connection=connection)
+        if not partitions:
+            return
+        if len(partitions) == 1:
+            with closing(psycopg2.connect(self.connection_string)) as connection:
+                for batch_number, batch_rows in enumerate(self._read_range(connection, *partitions[0])):
+                    yield self._batch_file(batch_rows=batch_rows, batch_id=batch_number)
+            return
+
+        # Every partition is read by its own thread and connection. Batches are handed over through a bounded
+        # queue so readers don't get ahead of the pipeline.
+        batches = queue.Queue(maxsize=2 * len(partitions))
+        stop = Event()
+
+        def put(item) -> bool:
+            while not stop.is_set():
+                try:
+                    batches.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def read(partition_number:int, partition:Tuple[Any, Any, bool]):
+            try:
+                with closing(psycopg2.connect(self.connection_string)) as connection:
+                    for batch_number, batch_rows in enumerate(self._read_range(connection, *partition)):
+                        if not put(self._batch_file(batch_rows=batch_rows, batch_id=f"{partition_number}_{batch_number}")):
+                            return
+            except Exception as e:
+                put(e)
+            finally:
+                put(_PARTITION_DONE)
+
+        with ThreadPoolExecutor(max_workers=len(partitions)) as executor:
+            for partition_number, partition in enumerate(partitions):
+                executor.submit(read, partition_number, partition)
+            try:
+                remaining = len(partitions)
+                while remaining > 0:
+                    item = batches.get()
+                    if item is _PARTITION_DONE:
+                        remaining -= 1
+                    elif isinstance(item, Exception):
+                        raise item
+                    else:
+                        yield item
+            finally:
+                stop.set()
+
+    def _base_query(self) -> sql.Composable:
+        # The query is wrapped in a parameterized statement, so literal % signs must be escaped
+        return sql.SQL(self.query.strip().rstrip(";").replace("%", "%%"))
+
+    def _partitions(self, connection) -> List[Tuple[Any, Any, bool]]:
+        """Splits the range of `partition_column` into `num_partitions` ranges of (lower, upper, upper inclusive)"""
+        column = sql.Identifier(self.partition_column)
+        with connection.cursor() as cursor:
+            cursor.execute(sql.SQL("SELECT min({column}), max({column}) FROM ({query}) AS neumai_bounds").format(column=column, query=self._base_query()))
+            low, high = cursor.fetchone()
+        if low is None:
+            return []
+        num_partitions = self.num_partitions
+        if num_partitions <= 1 or isinstance(low, bool) or not isinstance(low, (int, float, Decimal)):
+            return [(low, high, True)]
+        if isinstance(low, int):
+            step = max(1, -(-(high - low + 1) // num_partitions))
+        else:
+            step = (high - low) / num_partitions
+        partitions = []
+        lower = low
+        for i in range(1, num_partitions + 1):
+            upper = low + step * i
+            if i == num_partitions or upper >= high:
+                partitions.append((lower, high, True))
+                break
+            partitions.append((lower, upper, False))
+            lower = upper
+        return partitions
+
+    def _read_range(self, connection, lower:Any, upper:Any, upper_inclusive:bool) -> Generator[List[dict], None, None]:
+        """Reads the rows of a range of `partition_column` a page at a time, continuing after the last key of each page"""
+        column = sql.Identifier(self.partition_column)
+        batch_size = self.batch_size
+        last_key = None
+        while True:
+            if last_key is None:
+                conditions, params = [sql.SQL("{} >= %s").format(column)], [lower]
+            else:
+                conditions, params = [sql.SQL("{} > %s").format(column)], [last_key]
+            conditions.append(sql.SQL("{} <= %s" if upper_inclusive else "{} < %s").format(column))
+            params.append(upper)
+            page_query = sql.SQL("SELECT * FROM ({query}) AS neumai_page WHERE {conditions} ORDER BY {column} LIMIT %s").format(
+                query=self._base_query(),
+                conditions=sql.SQL(" AND ").join(conditions),
+                column=column,
+            )
+            with connection.cursor() as cursor:
+                cursor.execute(page_query, params + [batch_size])
+                rows = cursor.fetchall()
+                column_names = [column.name for column in cursor.description]
+            connection.commit()
+            if not rows:
+                return
+            last_key = rows[-1][column_names.index(self.partition_column)]
+            yield [self._normalize_row(column_names=column_names, row=row) for row in rows]
+            if len(rows) < batch_size:
+                return
+
+    @classmethod
+    def _normalize_value(cls, value):
+        if isinstance(value, Decimal):
+            return str(value)  # Convert Decimal to a string representation
+        elif isinstance(value, (datetime, date, time)):
+            return value.isoformat()  # Convert dates to ISO format string
+        elif isinstance(value, (list, tuple)):
+            return [cls._normalize_value(item) for item in value]
+        return value
+
+    @classmethod
+    def _normalize_row(cls, column_names:List[str], row:tuple) -> dict:
+        """Converts a row into a dictionary of JSON compatible values, as `CustomEncoder` would"""
+        return {
+            name: value if type(value) in _JSON_TYPES else cls._normalize_value(value)
+            for name, value in zip(column_names, row)
+        }
+
+    def _batch_file(self, batch_rows:List[dict], batch_id:Union[int, str]) -> CloudFile:
+        data, content_hash = self._batch_data(batch_rows)
+        return CloudFile(data=data, metadata={}, id=f"Postgres_{batch_id}", content_hash=content_hash)
+
+    def _batch_data(self, batch_rows:List[dict]) -> Tuple[Union[str, List[dict]], str]:
+        # Rows have no version of their own, the hash of the batch tells syncs whether it changed
+        if self.serialize_batches:
+            data = json.dumps(batch_rows)
+            return data, hashlib.sha256(data.encode("utf-8")).hexdigest()
+        return batch_rows, hashlib.sha256(repr(batch_rows).encode("utf-8")).hexdigest()
+
+    def connect_and_list_sync(self) -> Generator[CloudFile, None, None]:
+        # Batches are numbered by position, and the query has no order: an inserted row, or a synchronized scan starting
+        # mid-table, would move rows into other batches and re-embed them. Rows are listed as files keyed by `key_column`.
+        with closing(psycopg2.connect(self.connection_string)) as connection:
+            for key, row in self._read_keyed_rows(connection=connection):
+                yield self._row_file(key=key, row=row)
 
     def connect_and_list_delta(self, last_run:datetime) -> Generator[CloudFile, None, None]:
-        # No metadatadata to determine what rows are new. Needs to be done through websocket
-        yield from self.connect_and_list_full()
+        if self.delta_mode == "watermark":
+            yield from self._list_watermark_changes(last_run=last_run)
+        elif self.delta_mode == "logical_replication":
+            yield from self._list_replication_changes()
+        else:
+            # No metadatadata to determine what rows are new
+            yield from self.connect_and_list_full()
+
+    def _list_watermark_changes(self, last_run:Optional[datetime]) -> Generator[CloudFile, None, None]:
+        with closing(psycopg2.connect(self.connection_string)) as connection:
+            condition, params = None, []
+            if last_run is not None:
+                condition, params = sql.SQL("{} > %s").format(sql.Identifier(self.watermark_column)), [last_run]
+            for key, row in self._read_keyed_rows(connection=connection, condition=condition, params=params):
+                if self.soft_delete_column and row.get(self.soft_delete_column):
+                    yield self._deleted_row_file(key=key)
+                else:
+                    yield self._row_file(key=key, row=row)
+
+    def _list_replication_changes(self) -> Generator[CloudFile, None, None]:
+        with closing(psycopg2.connect(self.connection_string)) as connection:
+            if self._create_replication_slot(connection=connection):
+                # Changes are only captured from the creation of the slot, so the first run lists every row
+                for key, row in self._read_keyed_rows(connection=connection):
+                    yield self._row_file(key=key, row=row)
+                return
+            while True:
+                # Peek instead of consuming, the slot is only advanced once the changed rows were processed
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        "SELECT lsn, data FROM pg_logical_slot_peek_binary_changes(%s, NULL, %s, 'proto_version', '1', 'publication_names', %s)",
+                        (self.replication_slot, self.batch_size, self.publication),
+                    )
+                    messages = cursor.fetchall()
+                connection.commit()
+                if not messages:
+                    return
+                try:
+                    changes, key_type = decode_row_changes(messages=[data for _, data in messages], key_column=self.key_column)
+                except (KeyError, ValueError) as e:
+                    raise PostgresChangeCaptureException(f"Reading changes from {self.replication_table} failed. See Exception: {e}")
+                yield from self._changed_row_files(connection=connection, changes=changes, key_type=key_type)
+                with connection.cursor() as cursor:
+                    cursor.execute("SELECT pg_replication_slot_advance(%s, %s)", (self.replication_slot, messages[-1][0]))
+                connection.commit()
+
+    def _create_replication_slot(self, connection) -> bool:
+        """Creates the publication and the replication slot if they don't exist. Returns whether the slot was created."""
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM pg_publication WHERE pubname = %s", (self.publication,))
+            if cursor.fetchone() is None:
+                cursor.execute(sql.SQL("CREATE PUBLICATION {} FOR TABLE {}").format(
+                    sql.Identifier(self.publication),
+                    sql.Identifier(*self.replication_table.split(".")),
+                ))
+            connection.commit()
+            cursor.execute("SELECT 1 FROM pg_replication_slots WHERE slot_name = %s", (self.replication_slot,))
+            if cursor.fetchone() is not None:
+                connection.commit()
+                return False
+            cursor.execute("SELECT pg_create_logical_replication_slot(%s, 'pgoutput')", (self.replication_slot,))
+        connection.commit()
+        return True
+
+    def _changed_row_files(self, connection, changes:dict, key_type:Optional[int]) -> Generator[CloudFile, None, None]:
+        upserted = [key for key, operation in changes.items() if operation == "upsert"]
+        deleted = [key for key, operation in changes.items() if operation == "delete"]
+        if upserted:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT format_type(%s, NULL)", (key_type,))
+                (key_type_name,) = cursor.fetchone()
+            found = set()
+            for i in range(0, len(upserted), self.batch_size):
+                condition = sql.SQL("{} = ANY(%s::{}[])").format(sql.Identifier(self.key_column), sql.SQL(key_type_name))
+                for key, row in self._read_keyed_rows(connection=connection, condition=condition, params=[upserted[i:i + self.batch_size]]):
+                    found.add(key)
+                    yield self._row_file(key=key, row=row)
+            # Rows that changed but are no longer returned by the query
+            deleted += [key for key in upserted if key not in found]
+        for key in deleted:
+            yield self._deleted_row_file(key=key)
+
+    def _read_keyed_rows(self, connection, condition:Optional[sql.Composable] = None, params:Optional[list] = None) -> Generator[Tuple[str, dict], None, None]:
+        """Reads the rows returned by the query, optionally filtered, with the value of `key_column` in text format"""
+        row_query = sql.SQL("SELECT neumai_rows.*, {key}::text AS neumai_key FROM ({query}) AS neumai_rows").format(
+            key=sql.Identifier(self.key_column),
+            query=self._base_query(),
+        )
+        if condition is not None:
+            row_query = row_query + sql.SQL(" WHERE ") + condition
+        with connection.cursor(name='neumai_changes') as cursor:
+            cursor.itersize = self.batch_size
+            cursor.execute(row_query, params or [])
+            column_names = None
+            for row in cursor:
+                if column_names is None:
+                    column_names = [column.name for column in cursor.description]
+                row = self._normalize_row(column_names=column_names, row=row)
+                key = row.pop("neumai_key")
+                yield key, row
+        connection.commit()
+
+    def _row_file(self, key:str, row:dict) -> CloudFile:
+        data, content_hash = self._batch_data([row])
+        return CloudFile(data=data, metadata={}, id=f"Postgres_{key}", content_hash=content_hash)
+
+    def _deleted_row_file(self, key:str) -> CloudFile:
+        return CloudFile(metadata={}, id=f"Postgres_{key}", is_deleted=True)
 
     def connect_and_download(self, cloudFile:CloudFile) -> Generator[LocalFile, None, None]:
-        data = json.loads(cloudFile.data)
+        if isinstance(cloudFile.data, str):
+            data = json.loads(cloudFile.data)
+        else:
+            data = cloudFile.data
         for row in data:
-            yield LocalFile(in_mem_data=json.dumps(row), metadata=cloudFile.metadata)
+            # Rows are handed to the JSONLoader as dictionaries unless batches are serialized
+            yield LocalFile(in_mem_data=json.dumps(row) if self.serialize_batches else row, metadata=cloudFile.metadata)
 
     def config_validation(self) -> bool:
         if not all(x in self.available_metadata for x in self.selector.to_metadata):
             raise ValueError("Invalid metadata values provided")
+        if self.delta_mode == "watermark" and not self.watermark_column:
+            raise ValueError("watermark_column is required for the watermark delta mode")
+        if self.delta_mode == "logical_replication" and not self.replication_table:
+            raise ValueError("replication_table is required for the logical_replication delta mode")
         try:
             psycopg2.connect(self.connection_string)
         except Exception as e:
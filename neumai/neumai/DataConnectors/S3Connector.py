@@ -1,13 +1,17 @@
 from datetime import datetime
-from typing import List, Generator, Optional
+from typing import Any, List, Generator, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from threading import Lock
 import boto3
-from neumai.Shared.LocalFile import LocalFile
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
+from neumai.Shared.LocalFile import LocalFile, DEFAULT_MAX_IN_MEMORY_SIZE
 from neumai.Shared.CloudFile import CloudFile
 from neumai.Shared.Selector import Selector
 from neumai.Shared.Exceptions import S3ConnectionException
 from neumai.DataConnectors.DataConnector import DataConnector
-from pydantic import Field
-import tempfile
+from pydantic import Field, PrivateAttr
+import io
 import os
 
 class S3Connector(DataConnector):
@@ -29,6 +33,20 @@ class S3Connector(DataConnector):
         File prefix filter
     selector : Optional[Selector]
         Optional selector object to define what data data should be used to generate embeddings or stored as metadata with the vector.
+    list_workers : Optional[int]
+        Number of workers listing the bucket. Listing is sharded by the sub-prefixes found under `prefix` using `delimiter`. Default is 8.
+    delimiter : Optional[str]
+        Delimiter used to split the bucket into sub-prefixes listed in parallel. Default is "/".
+    download_concurrency : Optional[int]
+        Number of threads downloading the parts of a single large object with ranged GETs. Default is 8.
+    multipart_threshold_mb : Optional[int]
+        Objects larger than this size (in MB) are downloaded in parts. Default is 8.
+    multipart_chunksize_mb : Optional[int]
+        Size (in MB) of each part of a multipart download. Default is 8.
+    max_pool_connections : Optional[int]
+        Maximum number of HTTP connections kept open by the S3 client, shared by every listing and download thread. Default is 50.
+    endpoint_url : Optional[str]
+        Optional endpoint of an S3 compatible service (i.e. MinIO).
     
     """
     
@@ -42,6 +60,24 @@ class S3Connector(DataConnector):
 
     selector: Optional[Selector] = Field(Selector(to_embed=[], to_metadata=[]), description="Selector for data connector metadata")
 
+    list_workers: Optional[int] = Field(8, description="Number of workers listing the bucket.")
+
+    delimiter: Optional[str] = Field("/", description="Delimiter used to shard the listing by sub-prefix.")
+
+    download_concurrency: Optional[int] = Field(8, description="Number of threads downloading parts of a large object.")
+
+    multipart_threshold_mb: Optional[int] = Field(8, description="Size in MB above which objects are downloaded in parts.")
+
+    multipart_chunksize_mb: Optional[int] = Field(8, description="Size in MB of each downloaded part.")
+
+    max_pool_connections: Optional[int] = Field(50, description="Maximum number of HTTP connections kept open by the S3 client.")
+
+    endpoint_url: Optional[str] = Field(None, description="Endpoint of an S3 compatible service.")
+
+    _client: Any = PrivateAttr(default=None)
+
+    _client_lock: Lock = PrivateAttr(default_factory=Lock)
+
     @property
     def connector_name(self) -> str:
         return "S3Connector"
@@ -52,7 +88,7 @@ class S3Connector(DataConnector):
 
     @property
     def optional_properties(self) -> List[str]:
-        return ["prefix"]
+        return ["prefix", "list_workers", "delimiter", "download_concurrency", "multipart_threshold_mb", "multipart_chunksize_mb", "max_pool_connections", "endpoint_url"]
     
     @property
     def available_metadata(self) -> str:
@@ -70,90 +106,119 @@ class S3Connector(DataConnector):
     def compatible_loaders(self) -> List[str]:
         return ["AutoLoader", "HTMLLoader", "MarkdownLoader", "CSVLoader", "JSONLoader", "PDFLoader"]
     
-    def connect_and_list_full(self) -> Generator[CloudFile, None, None]:
-        aws_key_id= self.aws_key_id
-        aws_access_key= self.aws_access_key
-        bucket_name= self.bucket_name
-        prefix = self.prefix
-        session = boto3.Session(
-            aws_access_key_id=aws_key_id,
-            aws_secret_access_key=aws_access_key,
+    @property
+    def client(self):
+        """S3 client shared by every listing and download call. boto3 clients are thread safe, sessions are not."""
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    session = boto3.Session(
+                        aws_access_key_id=self.aws_key_id,
+                        aws_secret_access_key=self.aws_access_key,
+                    )
+                    self._client = session.client("s3", endpoint_url=self.endpoint_url, config=Config(max_pool_connections=self.max_pool_connections))
+        return self._client
+
+    @property
+    def transfer_config(self) -> TransferConfig:
+        return TransferConfig(
+            multipart_threshold=self.multipart_threshold_mb * 1024 * 1024,
+            multipart_chunksize=self.multipart_chunksize_mb * 1024 * 1024,
+            max_concurrency=self.download_concurrency,
         )
-        s3_resource = session.resource('s3')
-        s3_client = session.client("s3")
-        bucket = s3_resource.Bucket(bucket_name)
 
+    def _list_page(self, prefix:str, continuation_token:Optional[str]) -> Tuple[List[dict], List[str], Optional[str]]:
+        """Lists one page of objects directly under a prefix. Returns the objects, the sub-prefixes and the token of the next page."""
+        kwargs = {"Bucket": self.bucket_name, "Prefix": prefix}
+        if self.delimiter:
+            kwargs["Delimiter"] = self.delimiter
+        if continuation_token:
+            kwargs["ContinuationToken"] = continuation_token
+        response = self.client.list_objects_v2(**kwargs)
+        sub_prefixes = [common_prefix["Prefix"] for common_prefix in response.get("CommonPrefixes", [])]
+        next_token = response.get("NextContinuationToken") if response.get("IsTruncated") else None
+        return response.get("Contents", []), sub_prefixes, next_token
+
+    def _list_objects(self) -> Generator[dict, None, None]:
+        """Lists the bucket under `prefix`, listing sub-prefixes and their pages in parallel. Objects are yielded as pages arrive."""
+        with ThreadPoolExecutor(max_workers=self.list_workers, thread_name_prefix="neumai-s3-list") as executor:
+            prefix = self.prefix or ""
+            pending = {executor.submit(self._list_page, prefix, None): prefix}
+            try:
+                while pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        prefix = pending.pop(future)
+                        objects, sub_prefixes, next_token = future.result()
+                        if next_token:
+                            pending[executor.submit(self._list_page, prefix, next_token)] = prefix
+                        for sub_prefix in sub_prefixes:
+                            pending[executor.submit(self._list_page, sub_prefix, None)] = sub_prefix
+                        yield from objects
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    def _to_cloud_file(self, obj:dict, metadata:dict) -> CloudFile:
+        selected_metadata  = {k: metadata[k] for k in self.selector.to_metadata if k in metadata}
+        # If metadata passed, then I will add all the user generated values that are associated to the file
+        if "metadata" in self.selector.to_metadata:
+            # Make an additional call to get the full context
+            additional_metdata:dict = self.client.head_object(Bucket=self.bucket_name, Key=obj["Key"])
+            selected_metadata.update(additional_metdata['Metadata'])
+        return CloudFile(file_identifier=obj["Key"], metadata=selected_metadata, id=obj["Key"], etag=obj.get("ETag"), last_modified=obj["LastModified"].isoformat(), size=obj.get("Size"))
+
+    def connect_and_list_full(self) -> Generator[CloudFile, None, None]:
         # List out the files to be passed on
-        for obj in bucket.objects.filter(Prefix=prefix):
+        for obj in self._list_objects():
             # Hard coded metadata available on the object
             metadata = {
-                "last_modified" : obj.last_modified
+                "last_modified" : obj["LastModified"]
             }
-            selected_metadata  = {k: metadata[k] for k in self.selector.to_metadata if k in metadata}
-            # If metadata passed, then I will add all the user generated values that are associated to the file
-            if "metadata" in self.selector.to_metadata:
-                # Make an additional call to get the full context
-                additional_metdata:dict = s3_client.head_object(Bucket=bucket_name, Key=obj.key)
-                selected_metadata.update(additional_metdata['Metadata'])
-            yield CloudFile(file_identifier=obj.key, metadata=selected_metadata, id=obj.key)
+            yield self._to_cloud_file(obj=obj, metadata=metadata)
 
     def connect_and_list_delta(self, last_run:datetime) -> Generator[CloudFile, None, None]:
-        # Connect to S3
-        aws_key_id= self.aws_key_id
-        aws_access_key= self.aws_access_key
-        bucket_name= self.bucket_name
-        prefix = self.prefix
-        session = boto3.Session(
-            aws_access_key_id=aws_key_id,
-            aws_secret_access_key=aws_access_key,
-        )
-        s3_resource = session.resource('s3')
-        s3_client = session.client("s3")
-        bucket = s3_resource.Bucket(bucket_name)
-
         # List out the files that have changed
-        for obj in bucket.objects.filter(Prefix=prefix):    
+        for obj in self._list_objects():
             # Check if file has changed
-            if(last_run < obj.last_modified):
+            if(last_run < obj["LastModified"]):
                 # If file changed, then download
                 metadata = {
-                    "key" : obj.key,
-                    "last_modified" : obj.last_modified
+                    "key" : obj["Key"],
+                    "last_modified" : obj["LastModified"]
                 }
-                selected_metadata  = {k: metadata[k] for k in self.selector.to_metadata if k in metadata}
-                # If metadata passed, then I will add all the user generated values that are associated to the file
-                if "metadata" in self.selector.to_metadata:
-                    # Make an additional call to get the full context
-                    additional_metdata:dict = s3_client.head_object(Bucket=bucket_name, Key=obj.key)
-                    selected_metadata.update(additional_metdata['Metadata'])
-                yield CloudFile(file_identifier=obj.key, metadata=selected_metadata, id=obj.key)
+                yield self._to_cloud_file(obj=obj, metadata=metadata)
 
     def connect_and_download(self, cloudFile:CloudFile) -> Generator[LocalFile, None, None]:
-        # Connect to S3
-        aws_key_id= self.aws_key_id
-        aws_access_key= self.aws_access_key
-        bucket_name= self.bucket_name
-        session = boto3.Session(
-            aws_access_key_id=aws_key_id,
-            aws_secret_access_key=aws_access_key,
-        )
-        s3_client = session.client("s3")
-        with tempfile.TemporaryDirectory() as temp_dir:
-            file_path = f"{temp_dir}/{cloudFile.file_identifier}"
-            os.makedirs(os.path.dirname(file_path), exist_ok=True)
-            s3_client.download_file(bucket_name, cloudFile.file_identifier, file_path)
-            yield LocalFile(file_path=file_path, metadata=cloudFile.metadata, id=cloudFile.id)
+        suffix = os.path.splitext(cloudFile.file_identifier)[1]
+        size = cloudFile.size
+        if size is None:
+            size = self.client.head_object(Bucket=self.bucket_name, Key=cloudFile.file_identifier)["ContentLength"]
+        if size <= self.multipart_threshold_mb * 1024 * 1024:
+            response = self.client.get_object(Bucket=self.bucket_name, Key=cloudFile.file_identifier)
+            content = response["Body"].read()
+            yield LocalFile(content=content, metadata=cloudFile.metadata, id=cloudFile.id, suffix=suffix)
+            return
+        # Objects over the multipart threshold are fetched with parallel ranged GETs, in memory up to
+        # DEFAULT_MAX_IN_MEMORY_SIZE and into a temporary file, removed once loaded, above it
+        if size <= DEFAULT_MAX_IN_MEMORY_SIZE:
+            buffer = io.BytesIO()
+            self.client.download_fileobj(self.bucket_name, cloudFile.file_identifier, buffer, Config=self.transfer_config)
+            yield LocalFile(content=buffer.getbuffer(), metadata=cloudFile.metadata, id=cloudFile.id, suffix=suffix)
+            return
+        localFile = LocalFile.spill_file(metadata=cloudFile.metadata, id=cloudFile.id, suffix=suffix)
+        try:
+            self.client.download_file(self.bucket_name, cloudFile.file_identifier, localFile.file_path, Config=self.transfer_config)
+        except Exception:
+            localFile.close()
+            raise
+        yield localFile
 
     def config_validation(self) -> bool:      
         if not all(x in self.available_metadata for x in self.selector.to_metadata):
             raise ValueError("Invalid metadata values provided")
         try:
-            session = boto3.Session(
-                aws_access_key_id=self.aws_key_id,
-                aws_secret_access_key=self.aws_access_key,
-            )
-            client = session.client("s3")
-            client.head_bucket(Bucket=self.bucket_name)
+            self.client.head_bucket(Bucket=self.bucket_name)
         except Exception as e:
             raise S3ConnectionException(f"Connection to S3 failed, check key and key ID. See Exception: {e}")
         return True 
@@ -6,7 +6,6 @@ from neumai.Shared.Selector import Selector
 from neumai.Shared.Exceptions import SharepointConnectionException
 from neumai.DataConnectors.DataConnector import DataConnector
 from pydantic import Field
-import tempfile
 import requests
 
 class SharepointConnector(DataConnector):
@@ -93,7 +92,7 @@ class SharepointConnector(DataConnector):
                     "lastModifiedBy.user.displayName":item['createdBy']['user']['displayName'],
                 }
                 selected_metadata  = {k: available_metadata[k] for k in self.selector.to_metadata if k in available_metadata}
-                yield CloudFile(file_identifier=file_url, id=file_name, type=file_type, metadata=selected_metadata)
+                yield CloudFile(file_identifier=file_url, id=file_name, type=file_type, metadata=selected_metadata, etag=item.get('eTag'), last_modified=item['lastModifiedDateTime'])
             
             elif 'folder' in item.keys():
                 # It's a folder, process it recursively
@@ -124,7 +123,7 @@ class SharepointConnector(DataConnector):
                 }
                 if last_run < item['lastModifiedDateTime']:
                     selected_metadata  = {k: available_metadata[k] for k in metadata_keys if k in available_metadata}
-                    yield CloudFile(file_identifier=file_url, id=file_name, type=file_type, metadata=selected_metadata)
+                    yield CloudFile(file_identifier=file_url, id=file_name, type=file_type, metadata=selected_metadata, etag=item.get('eTag'), last_modified=item['lastModifiedDateTime'])
             
             elif 'folder' in item.keys():
                 # It's a folder, process it recursively
@@ -212,9 +211,7 @@ class SharepointConnector(DataConnector):
         metadata = cloudFile.metadata
         import requests
         file_r = requests.get(file_identifier)
-        with tempfile.NamedTemporaryFile(delete=False, suffix=f"_{id}") as temp_file:
-            temp_file.write(file_r.content)
-        yield LocalFile(file_path=temp_file.name, metadata=metadata, id=id, type=type)
+        yield LocalFile.from_bytes(content=file_r.content, metadata=metadata, id=id, type=type, suffix=f"_{id}")
     
     def config_validation(self) -> bool:
         if not all(x in self.available_metadata for x in self.selector.to_metadata):
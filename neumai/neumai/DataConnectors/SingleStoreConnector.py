@@ -1,6 +1,6 @@
 from datetime import datetime
 from neumai.DataConnectors.DataConnector import DataConnector
-from typing import List, Generator, Optional
+from typing import List, Generator, Optional, Union
 from neumai.Shared.LocalFile import LocalFile
 from neumai.Shared.CloudFile import CloudFile
 from neumai.Shared.Selector import Selector
@@ -8,6 +8,7 @@ from neumai.Shared.Exceptions import SinglestoreConnectionException
 from decimal import Decimal
 from pydantic import Field
 import singlestoredb as s2
+import hashlib
 import json
 
 
@@ -26,6 +27,8 @@ class SingleStoreConnector(DataConnector):
         Query to extract data from database (i.e. Select * From TableName)
     batch_size : Optional[int]
         Number of rows to process per batch
+    key_column : Optional[str]
+        Unique column returned by the query identifying rows. Required by `Pipeline.sync`, which lists every row as a file with id `SingleStore_<key>`.
     selector : Optional[Selector]
         Optional selector object to define what data data should be used to generate embeddings or stored as metadata with the vector.
     
@@ -39,6 +42,8 @@ class SingleStoreConnector(DataConnector):
 
     selector: Optional[Selector] = Field(Selector(to_embed=[], to_metadata=[]), description="Selector for data connector metadata")
 
+    key_column: Optional[str] = Field(None, description="Unique column identifying rows in syncs.")
+
     @property
     def connector_name(self) -> str:
         return "SingleStoreConnector"
@@ -49,7 +54,7 @@ class SingleStoreConnector(DataConnector):
 
     @property
     def optional_properties(self) -> List[str]:
-        return ["batch_size"]
+        return ["batch_size", "key_column"]
     
     @property
     def available_metadata(self) -> str:
@@ -83,6 +88,7 @@ class SingleStoreConnector(DataConnector):
         with s2.connect(connection_string, results_type="dict") as conn:
             with conn.cursor() as cur:
                 batch_rows = []
+                batch_number = 0
                 cur.execute(query)
                 while True:
                     rows = cur.fetchmany(batch_size)
@@ -93,11 +99,34 @@ class SingleStoreConnector(DataConnector):
                         serialized_dict = json.loads(serialized_string)
                         batch_rows.append(serialized_dict)
                         if(len(batch_rows) == batch_size):
-                            yield CloudFile(data=json.dumps(batch_rows), metadata={})
+                            yield self._batch_file(batch_rows=batch_rows, batch_number=batch_number)
                             batch_rows = []
+                            batch_number += 1
 
                 if len(batch_rows) > 0:
-                    yield CloudFile(data=json.dumps(batch_rows), metadata={})
+                    yield self._batch_file(batch_rows=batch_rows, batch_number=batch_number)
+
+    def _batch_file(self, batch_rows:List[dict], batch_number:Union[int, str]) -> CloudFile:
+        data = json.dumps(batch_rows)
+        # Rows have no version of their own, the hash of the batch tells syncs whether it changed
+        content_hash = hashlib.sha256(data.encode("utf-8")).hexdigest()
+        return CloudFile(data=data, metadata={}, id=f"SingleStore_{batch_number}", content_hash=content_hash)
+
+    def connect_and_list_sync(self) -> Generator[CloudFile, None, None]:
+        # Batches are numbered by position, so an inserted row would move rows into other batches and re-embed them.
+        # Rows are listed as files keyed by `key_column` instead.
+        if not self.key_column:
+            raise ValueError("key_column is required to sync a SingleStoreConnector")
+        with s2.connect(self.connection_string, results_type="dict") as conn:
+            with conn.cursor() as cur:
+                cur.execute(self.query)
+                while True:
+                    rows = cur.fetchmany(self.batch_size)
+                    if not rows:
+                        break
+                    for row in rows:
+                        row = json.loads(json.dumps(dict(row), cls=self.CustomEncoder))
+                        yield self._batch_file(batch_rows=[row], batch_number=str(row[self.key_column]))
 
     def connect_and_list_delta(self, last_run:datetime) -> Generator[CloudFile, None, None]:
         # No metadatadata to determine what rows are new. Needs to be done through websocket
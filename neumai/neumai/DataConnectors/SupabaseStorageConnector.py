@@ -7,7 +7,6 @@ from neumai.Shared.CloudFile import CloudFile
 from neumai.Shared.Selector import Selector
 from neumai.Shared.Exceptions import SupabaseConnectionException
 from pydantic import Field
-import tempfile
 import os
 
 
@@ -85,7 +84,7 @@ class SupabaseStorageConnector(DataConnector):
             # Download each file
             name = file['name']
             selected_metadata  = {k: file[k] for k in self.selector.to_metadata if k in file}
-            yield CloudFile(file_identifier=name, metadata=selected_metadata, id=name)
+            yield CloudFile(file_identifier=name, metadata=selected_metadata, id=name, etag=(file.get('metadata') or {}).get('eTag'), last_modified=file.get('updated_at'))
 
     def connect_and_list_delta(self, last_run:datetime) -> Generator[CloudFile, None, None]:
         # Connect to supabase
@@ -104,7 +103,7 @@ class SupabaseStorageConnector(DataConnector):
                 #If file changed, then download
                 name = file['name']
                 selected_metadata  = {k: file[k] for k in self.selector.to_metadata if k in file}
-                yield CloudFile(file_identifier=name, metadata=selected_metadata, id=name)
+                yield CloudFile(file_identifier=name, metadata=selected_metadata, id=name, etag=(file.get('metadata') or {}).get('eTag'), last_modified=file.get('updated_at'))
 
     def connect_and_download(self, cloudFile:CloudFile) -> Generator[LocalFile, None, None]:
         # Connect to supabase
@@ -114,13 +113,8 @@ class SupabaseStorageConnector(DataConnector):
         key = self.key
 
         supabase: Client = create_client(url, key)
-        with tempfile.TemporaryDirectory() as temp_dir:
-            file_path = f"{temp_dir}/{folder}/{cloudFile.file_identifier}"
-            os.makedirs(os.path.dirname(file_path), exist_ok=True)
-            with open(f"{file_path}", "wb") as file:
-                supabase_file = supabase.storage.from_(bucket).download(folder + "/" + cloudFile.file_identifier)
-                file.write(supabase_file)
-            yield LocalFile(file_path=file_path, metadata=cloudFile.metadata, id=cloudFile.id)
+        supabase_file = supabase.storage.from_(bucket).download(folder + "/" + cloudFile.file_identifier)
+        yield LocalFile.from_bytes(content=supabase_file, metadata=cloudFile.metadata, id=cloudFile.id, suffix=os.path.splitext(cloudFile.file_identifier)[1])
 
     def config_validation(self) -> bool:    
         if not all(x in self.available_metadata for x in self.selector.to_metadata):
@@ -1,14 +1,33 @@
 from neumai.DataConnectors.DataConnector import DataConnector
-from typing import List, Generator, Optional
+from neumai.DataConnectors.crawl_utils import CrawlCache, CrawlCacheEntry, HostRateLimiter, extract_links, normalize_url, parse_sitemap
+from typing import Any, Dict, List, Generator, AsyncGenerator, NamedTuple, Optional, Tuple
 from neumai.Shared.LocalFile import LocalFile
 from neumai.Shared.CloudFile import CloudFile
 from neumai.Shared.Selector import Selector
 from neumai.Shared.Exceptions import WebsiteConnectionException
+from datetime import datetime
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from email.utils import format_datetime, parsedate_to_datetime
+from threading import Lock
+from urllib.parse import urlsplit
+from urllib.robotparser import RobotFileParser
 from bs4 import BeautifulSoup
-from pydantic import Field
-import tempfile
+from bs4.dammit import UnicodeDammit
+from pydantic import Field, PrivateAttr
+from requests.adapters import HTTPAdapter
 import requests
 
+DEFAULT_HEADERS = {"user-agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/88.0.4324.182 Safari/537.36"}
+
+class _Page(NamedTuple):
+    url: str
+    changed: bool
+    html: Optional[bytes]
+    etag: Optional[str]
+    last_modified: Optional[str]
+    links: List[str]
+
 class WebsiteConnector(DataConnector):
     """
     Website Connector
@@ -19,9 +38,25 @@ class WebsiteConnector(DataConnector):
     -----------
 
     url : str
-        Website URL
+        Website URL. Several URLs can be given separated by commas.
     selector : Optional[Selector]
         Optional selector object to define what data data should be used to generate embeddings or stored as metadata with the vector.
+    crawl : Optional[bool]
+        Follow the links of the pages to other pages of the same site. Default is False, which only extracts the given URLs.
+    max_depth : Optional[int]
+        Maximum number of links followed from the given URLs when crawling. Default is 3.
+    max_pages : Optional[int]
+        Maximum number of pages fetched when crawling. Default is 1000.
+    max_concurrency : Optional[int]
+        Number of pages fetched concurrently when crawling. Default is 16.
+    requests_per_second : Optional[float]
+        Maximum number of requests sent to a host per second. A Crawl-delay in robots.txt takes precedence if it is slower. Default is 10.
+    respect_robots_txt : Optional[bool]
+        Skip pages disallowed by the robots.txt of the site. Default is True.
+    use_sitemap : Optional[bool]
+        Also crawl the pages listed in the sitemaps of the site (from robots.txt or /sitemap.xml). Default is True.
+    crawl_cache_path : Optional[str]
+        Path to a SQLite file keeping the ETag / Last-Modified and links of crawled pages between runs. Without it they are only kept in memory.
     
     """
 
@@ -30,6 +65,30 @@ class WebsiteConnector(DataConnector):
 
     selector: Optional[Selector] = Field(Selector(to_embed=[], to_metadata=[]), description="Selector for data connector metadata")
 
+    crawl: Optional[bool] = Field(False, description="Follow links to other pages of the same site.")
+
+    max_depth: Optional[int] = Field(3, description="Maximum link depth when crawling.")
+
+    max_pages: Optional[int] = Field(1000, description="Maximum number of pages fetched when crawling.")
+
+    max_concurrency: Optional[int] = Field(16, description="Number of pages fetched concurrently.")
+
+    requests_per_second: Optional[float] = Field(10, description="Maximum number of requests per second to a host.")
+
+    respect_robots_txt: Optional[bool] = Field(True, description="Skip pages disallowed by robots.txt.")
+
+    use_sitemap: Optional[bool] = Field(True, description="Crawl the pages listed in the sitemaps of the site.")
+
+    crawl_cache_path: Optional[str] = Field(None, description="Path to the SQLite file caching page validators and links.")
+
+    _session: Optional[requests.Session] = PrivateAttr(default=None)
+
+    _crawl_cache: Optional[CrawlCache] = PrivateAttr(default=None)
+
+    _robots: Dict[str, Optional[RobotFileParser]] = PrivateAttr(default_factory=dict)
+
+    _lock: Lock = PrivateAttr(default_factory=Lock)
+
     @property
     def connector_name(self) -> str:
         return "WebsiteConnector"
@@ -40,7 +99,7 @@ class WebsiteConnector(DataConnector):
 
     @property
     def optional_properties(self) -> List[str]:
-        return []
+        return ["crawl", "max_depth", "max_pages", "max_concurrency", "requests_per_second", "respect_robots_txt", "use_sitemap", "crawl_cache_path"]
     
     @property
     def available_metadata(self) -> str:
@@ -58,36 +117,244 @@ class WebsiteConnector(DataConnector):
     def compatible_loaders(self) -> List[str]:
         return ["HTMLLoader"]
     
+    @property
+    def urls(self) -> List[str]:
+        return [u.strip() for u in str(self.url).split(",") if u.strip()]
+
     def connect_and_list_full(self) -> Generator[CloudFile, None, None]:
+        if self.crawl:
+            yield from self._crawl(conditional=False)
+            return
         # Send an HTTP GET request to the website
-        url:str = str(self.url)
-        clean_url = url.replace(" ", "")
-        list_urls = clean_url.split(" , ")
-        for u in list_urls:
-            available_metadata = {'url':u}
-            selected_metadata  = {k: available_metadata[k] for k in self.selector.to_metadata if k in available_metadata}
-            yield CloudFile(file_identifier=u, metadata=selected_metadata, id=u)
-
-    def connect_and_list_delta(self) -> Generator[CloudFile, None, None]:
-        yield from self.connect_and_list_full()
+        for u in self.urls:
+            etag, last_modified = self._get_version(u)
+            yield CloudFile(file_identifier=u, metadata=self._metadata(u), id=u, etag=etag, last_modified=last_modified)
+
+    def connect_and_list_delta(self, last_run:datetime) -> Generator[CloudFile, None, None]:
+        if self.crawl:
+            # Pages are requested with conditional GETs, unchanged pages are skipped
+            yield from self._crawl(conditional=True, last_run=last_run)
+            return
+        for u in self.urls:
+            page = self._fetch_page(url=u, conditional=True, last_run=last_run, follow_links=False)
+            if page is not None and page.changed:
+                yield self._page_file(page)
+
+    def _metadata(self, url:str) -> dict:
+        available_metadata = {'url':url}
+        return {k: available_metadata[k] for k in self.selector.to_metadata if k in available_metadata}
+
+    def _page_file(self, page:_Page) -> CloudFile:
+        # The page was already downloaded, it is handed to connect_and_download through the file
+        return CloudFile(file_identifier=page.url, metadata=self._metadata(page.url), id=page.url, etag=page.etag, last_modified=page.last_modified, data=page.html)
+
+    @property
+    def session(self) -> requests.Session:
+        """HTTP session shared by every request, keeping up to `max_concurrency` connections per host open"""
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=self.max_concurrency, pool_maxsize=self.max_concurrency)
+                    session.mount("http://", adapter)
+                    session.mount("https://", adapter)
+                    session.headers.update(DEFAULT_HEADERS)
+                    self._session = session
+        return self._session
+
+    @property
+    def crawl_cache(self) -> CrawlCache:
+        if self._crawl_cache is None:
+            with self._lock:
+                if self._crawl_cache is None:
+                    self._crawl_cache = CrawlCache(path=self.crawl_cache_path or ":memory:")
+        return self._crawl_cache
+
+    def _robots_for(self, url:str) -> Optional[RobotFileParser]:
+        """robots.txt of the host of a URL, fetched once. None if the site doesn't have one."""
+        parts = urlsplit(url)
+        origin = f"{parts.scheme}://{parts.netloc}"
+        with self._lock:
+            if origin in self._robots:
+                return self._robots[origin]
+        robots = None
+        try:
+            response = self.session.get(f"{origin}/robots.txt", timeout=30)
+            if response.ok:
+                robots = RobotFileParser()
+                robots.parse(response.text.splitlines())
+        except requests.RequestException:
+            pass
+        with self._lock:
+            self._robots.setdefault(origin, robots)
+            return self._robots[origin]
+
+    def _sitemap_pages(self, url:str) -> List[str]:
+        """Pages listed in the sitemaps of the site of a URL, including sitemaps nested in sitemap indexes"""
+        parts = urlsplit(url)
+        robots = self._robots_for(url)
+        sitemaps = deque((robots.site_maps() if robots else None) or [f"{parts.scheme}://{parts.netloc}/sitemap.xml"])
+        seen, pages = set(), []
+        while sitemaps and len(pages) < self.max_pages:
+            sitemap = sitemaps.popleft()
+            if sitemap in seen:
+                continue
+            seen.add(sitemap)
+            try:
+                response = self.session.get(sitemap, timeout=30)
+            except requests.RequestException:
+                continue
+            if not response.ok:
+                continue
+            entries = parse_sitemap(response.content)
+            sitemaps.extend(entries.sitemaps)
+            pages += entries.pages
+        return pages
+
+    def _fetch_page(self, url:str, conditional:bool, last_run:Optional[datetime], follow_links:bool, rate_limiter:Optional[HostRateLimiter] = None) -> Optional[_Page]:
+        """Fetches a page. Returns None if it is disallowed, can't be fetched or is not HTML.
+
+        With `conditional`, the validators of the last fetch are sent and an unchanged page is returned without HTML.
+        """
+        robots = self._robots_for(url) if self.respect_robots_txt else None
+        if robots is not None and not robots.can_fetch(DEFAULT_HEADERS["user-agent"], url):
+            return None
+        if rate_limiter is not None:
+            crawl_delay = robots.crawl_delay(DEFAULT_HEADERS["user-agent"]) if robots is not None else None
+            rate_limiter.wait(urlsplit(url).netloc, min_interval=float(crawl_delay or 0))
+
+        cached = self.crawl_cache.get(url)
+        headers = {}
+        if conditional:
+            # Unchanged pages can only be skipped when crawling if their links are known
+            if cached is not None and cached.etag:
+                headers["If-None-Match"] = cached.etag
+            if cached is not None and cached.last_modified:
+                headers["If-Modified-Since"] = cached.last_modified
+            elif last_run is not None and (cached is not None or not follow_links):
+                headers["If-Modified-Since"] = format_datetime(last_run if last_run.tzinfo else last_run.astimezone(), usegmt=True)
+        try:
+            response = self.session.get(url, headers=headers, timeout=30)
+        except requests.RequestException:
+            return None
+        if response.status_code == 304:
+            links = cached.links if cached is not None else []
+            return _Page(url=url, changed=False, html=None, etag=cached.etag if cached else None, last_modified=cached.last_modified if cached else None, links=links)
+        if not response.ok or "html" not in response.headers.get("Content-Type", "text/html"):
+            return None
+        # The body is kept as bytes, so BeautifulSoup picks up the <meta charset> of pages served without a charset
+        html = response.content
+        final_url = normalize_url(response.url) or url
+        links = extract_links(self._decode_html(response), final_url) if follow_links else []
+        etag, last_modified = response.headers.get("ETag"), response.headers.get("Last-Modified")
+        self.crawl_cache.put(url, CrawlCacheEntry(etag=etag, last_modified=last_modified, links=links))
+        changed = True
+        if conditional and last_run is not None and last_modified:
+            # The page had to be fetched for its links, it can still be skipped if it didn't change since the last run
+            try:
+                changed = parsedate_to_datetime(last_modified) > (last_run if last_run.tzinfo else last_run.astimezone())
+            except (TypeError, ValueError):
+                pass
+        return _Page(url=url, changed=changed, html=html, etag=etag, last_modified=last_modified, links=links)
+
+    @staticmethod
+    def _decode_html(response:requests.Response) -> str:
+        """Text of a page, decoded with the charset of the Content-Type header or else the one declared by the page"""
+        declared = [response.encoding] if "charset=" in response.headers.get("Content-Type", "").lower() else []
+        return UnicodeDammit(response.content, declared, is_html=True).unicode_markup or ""
+
+    def _crawl(self, conditional:bool, last_run:Optional[datetime] = None) -> Generator[CloudFile, None, None]:
+        """Crawls the pages of the sites of the given URLs, breadth first, fetching `max_concurrency` pages at a time"""
+        seeds = [normalize_url(u) or u for u in self.urls]
+        hosts = {urlsplit(u).netloc for u in seeds}
+        frontier = deque()
+        seen = set()
+
+        def add(url:str, depth:int):
+            if url not in seen and urlsplit(url).netloc in hosts:
+                seen.add(url)
+                frontier.append((url, depth))
+
+        for u in seeds:
+            add(u, 0)
+        if self.use_sitemap:
+            for u in seeds:
+                for page_url in self._sitemap_pages(u):
+                    page_url = normalize_url(page_url)
+                    if page_url is not None:
+                        add(page_url, 0)
+
+        rate_limiter = HostRateLimiter(requests_per_second=self.requests_per_second)
+        fetched = 0
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            pending = {}
+            try:
+                while frontier or pending:
+                    while frontier and len(pending) < self.max_concurrency and fetched + len(pending) < self.max_pages:
+                        url, depth = frontier.popleft()
+                        future = executor.submit(self._fetch_page, url=url, conditional=conditional, last_run=last_run, follow_links=depth < self.max_depth, rate_limiter=rate_limiter)
+                        pending[future] = depth
+                    if not pending:
+                        break
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        depth = pending.pop(future)
+                        page = future.result()
+                        if page is None:
+                            continue
+                        fetched += 1
+                        if depth < self.max_depth:
+                            for link in page.links:
+                                add(link, depth + 1)
+                        if page.changed:
+                            yield self._page_file(page)
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    def _get_version(self, url:str) -> Tuple[Optional[str], Optional[str]]:
+        """ETag and Last-Modified headers of the page, if the server provides them"""
+        try:
+            response = self.session.head(url, allow_redirects=True, timeout=30)
+        except requests.RequestException:
+            return None, None
+        if not response.ok:
+            return None, None
+        return response.headers.get("ETag"), response.headers.get("Last-Modified")
     
     def connect_and_download(self, cloudFile:CloudFile) -> Generator[LocalFile, None, None]:
-            headers = {"user-agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/88.0.4324.182 Safari/537.36"}
-            response = requests.get(cloudFile.file_identifier, headers=headers)
+            if cloudFile.data is not None:
+                yield self._write_local_file(cloudFile=cloudFile, content=cloudFile.data)
+                return
+            response = self.session.get(cloudFile.file_identifier, timeout=30)
             if not response.ok:
                 raise WebsiteConnectionException(f"File can't be accessed. Please make sure it is publicly available.")     
+            yield self._write_local_file(cloudFile=cloudFile, content=response.content)
+
+    async def aconnect_and_download(self, cloudFile:CloudFile) -> AsyncGenerator[LocalFile, None]:
+            import httpx
+
+            if cloudFile.data is not None:
+                yield self._write_local_file(cloudFile=cloudFile, content=cloudFile.data)
+                return
+
+            async with httpx.AsyncClient(headers=DEFAULT_HEADERS, follow_redirects=True) as client:
+                response = await client.get(cloudFile.file_identifier)
+            if not response.is_success:
+                raise WebsiteConnectionException(f"File can't be accessed. Please make sure it is publicly available.")
+            yield self._write_local_file(cloudFile=cloudFile, content=response.content)
+
+    def _write_local_file(self, cloudFile:CloudFile, content:Any) -> LocalFile:
             # Parse the HTML content
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = BeautifulSoup(content, 'html.parser')
             # Find the <body> element and extract its HTML content
             body = soup.find('body')
             # Some sites don't have a body, so instead just get all the text off it.
             if body == None:
                 body = soup.get_text()
             body_html = str(body)  # Convert the body tag to a string to get its HTML content
-            # Create a temporary file and write the extracted HTML to it
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".html", mode='w', encoding="utf-8") as temp:
-                temp.write(body_html)
-                yield LocalFile(file_path=temp.name, metadata=cloudFile.metadata, id=cloudFile.id)
+            # Hand the extracted HTML to the loader in memory, large pages are spilled to a temporary file
+            return LocalFile.from_bytes(content=body_html.encode("utf-8"), metadata=cloudFile.metadata, id=cloudFile.id, suffix=".html")
         
     def config_validation(self) -> bool:
         # Check for metadata values
@@ -96,7 +363,7 @@ class WebsiteConnector(DataConnector):
         
         # Check to see that site exists
         try:
-            response = requests.get(self.url)
+            response = self.session.get(self.urls[0])
             if not response.ok:
                 raise WebsiteConnectionException(f"File can't be accessed. Please make sure it is publicly available.")     
         except Exception as e:
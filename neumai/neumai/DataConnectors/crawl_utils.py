@@ -0,0 +1,130 @@
+from typing import Dict, List, NamedTuple, Optional
+from html.parser import HTMLParser
+from threading import Lock
+from urllib.parse import urldefrag, urljoin, urlsplit, urlunsplit
+import xml.etree.ElementTree as ElementTree
+import gzip
+import json
+import sqlite3
+import time
+
+# Helpers used by `WebsiteConnector` to crawl a website.
+
+_SKIPPED_EXTENSIONS = (
+    ".png", ".jpg", ".jpeg", ".gif", ".svg", ".webp", ".ico", ".css", ".js", ".pdf", ".zip", ".gz", ".tar",
+    ".mp3", ".mp4", ".avi", ".mov", ".woff", ".woff2", ".ttf", ".eot", ".xml", ".json",
+)
+
+class _LinkExtractor(HTMLParser):
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.base:Optional[str] = None
+        self.hrefs:List[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "a":
+            href = dict(attrs).get("href")
+            if href:
+                self.hrefs.append(href)
+        elif tag == "base" and self.base is None:
+            self.base = dict(attrs).get("href")
+
+def normalize_url(url:str) -> Optional[str]:
+    """Drops the fragment of a URL. Returns None for URLs that are not http(s) or point to non HTML resources."""
+    url, _ = urldefrag(url.strip())
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.netloc:
+        return None
+    if parts.path.lower().endswith(_SKIPPED_EXTENSIONS):
+        return None
+    # https://host and https://host/ are the same page
+    return urlunsplit((parts.scheme, parts.netloc, parts.path or "/", parts.query, ""))
+
+def extract_links(html:str, page_url:str) -> List[str]:
+    """Absolute, normalized URLs of the links in a page. Stdlib parsing is used since it is much faster than building a tree."""
+    extractor = _LinkExtractor()
+    try:
+        extractor.feed(html)
+        extractor.close()
+    except Exception:
+        # Keep the links found before the markup broke the parser
+        pass
+    base = urljoin(page_url, extractor.base) if extractor.base else page_url
+    links = []
+    for href in extractor.hrefs:
+        link = normalize_url(urljoin(base, href))
+        if link is not None:
+            links.append(link)
+    return links
+
+class SitemapEntries(NamedTuple):
+    pages: List[str]
+    sitemaps: List[str]
+
+def parse_sitemap(content:bytes) -> SitemapEntries:
+    """URLs of the pages and of the nested sitemaps listed in a sitemap (optionally gzipped)"""
+    if content[:2] == b"\x1f\x8b":
+        content = gzip.decompress(content)
+    try:
+        root = ElementTree.fromstring(content)
+    except ElementTree.ParseError:
+        return SitemapEntries(pages=[], sitemaps=[])
+    locations = [element.text.strip() for element in root.iter() if element.tag.endswith("loc") and element.text]
+    if root.tag.endswith("sitemapindex"):
+        return SitemapEntries(pages=[], sitemaps=locations)
+    return SitemapEntries(pages=locations, sitemaps=[])
+
+class HostRateLimiter:
+    """Spaces out requests to the same host. Callers reserve the next slot of the host and sleep until it."""
+
+    def __init__(self, requests_per_second:Optional[float]) -> None:
+        self.interval = 1 / requests_per_second if requests_per_second else 0
+        self._next_slot:Dict[str, float] = {}
+        self._lock = Lock()
+
+    def wait(self, host:str, min_interval:float = 0) -> None:
+        interval = max(self.interval, min_interval)
+        if interval <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + interval
+        if slot > now:
+            time.sleep(slot - now)
+
+class CrawlCacheEntry(NamedTuple):
+    etag: Optional[str]
+    last_modified: Optional[str]
+    links: List[str]
+
+class CrawlCache:
+    """Validators (ETag, Last-Modified) and links of crawled pages.
+
+    Pages are re-requested with conditional GETs. When a page is unchanged the server answers 304 without a body, so
+    its links are taken from the cache to keep crawling.
+    """
+
+    def __init__(self, path:str = ":memory:") -> None:
+        self._lock = Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute("CREATE TABLE IF NOT EXISTS pages (url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, links TEXT NOT NULL)")
+
+    def get(self, url:str) -> Optional[CrawlCacheEntry]:
+        with self._lock:
+            row = self._connection.execute("SELECT etag, last_modified, links FROM pages WHERE url = ?", (url,)).fetchone()
+        if row is None:
+            return None
+        return CrawlCacheEntry(etag=row[0], last_modified=row[1], links=json.loads(row[2]))
+
+    def put(self, url:str, entry:CrawlCacheEntry) -> None:
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO pages (url, etag, last_modified, links) VALUES (?, ?, ?, ?)",
+                (url, entry.etag, entry.last_modified, json.dumps(entry.links)),
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,99 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+import struct
+
+# Decoding of the messages of pgoutput, the logical decoding plugin built into Postgres (protocol version 1).
+# Only the messages needed to know which rows changed are decoded.
+# See https://www.postgresql.org/docs/current/protocol-logicalrep-message-formats.html
+
+def _read_string(data:bytes, offset:int) -> Tuple[str, int]:
+    end = data.index(b"\0", offset)
+    return data[offset:end].decode("utf-8"), end + 1
+
+def _read_tuple(data:bytes, offset:int) -> Tuple[List[Optional[str]], int]:
+    """Reads TupleData. Values are in text format, NULLs and unchanged TOASTed values are returned as None"""
+    (number_of_columns,) = struct.unpack_from("!h", data, offset)
+    offset += 2
+    values = []
+    for _ in range(number_of_columns):
+        kind = data[offset:offset + 1]
+        offset += 1
+        if kind == b"t":
+            (length,) = struct.unpack_from("!i", data, offset)
+            offset += 4
+            values.append(data[offset:offset + length].decode("utf-8"))
+            offset += length
+        else:
+            values.append(None)
+    return values, offset
+
+def decode_row_changes(messages:Iterable[bytes], key_column:str) -> Tuple[Dict[str, str], Optional[int]]:
+    """Folds pgoutput messages into the last operation applied to every row.
+
+    Returns a dictionary mapping the value of `key_column` (in text format) to "upsert" or "delete", in the order
+    rows were last changed, and the type oid of `key_column`.
+    """
+    # relation id -> (column names, column type oids)
+    relations:Dict[int, Tuple[List[str], List[int]]] = {}
+    changes:Dict[str, str] = {}
+    key_type = None
+
+    def key_of(relation_id:int, values:List[Optional[str]]) -> str:
+        nonlocal key_type
+        names, types = relations[relation_id]
+        if key_column not in names:
+            raise KeyError(f"Column {key_column} is not part of the replicated table")
+        index = names.index(key_column)
+        key_type = types[index]
+        key = values[index]
+        if key is None:
+            # Old rows only carry the replica identity, which is the primary key by default
+            raise ValueError(f"Changes don't include {key_column}. Make it the primary key or set REPLICA IDENTITY FULL on the table")
+        return key
+
+    def record(key:str, operation:str):
+        changes.pop(key, None)
+        changes[key] = operation
+
+    for message in messages:
+        message = bytes(message)
+        kind = message[:1]
+        if kind == b"R":
+            (relation_id,) = struct.unpack_from("!I", message, 1)
+            offset = 5
+            _, offset = _read_string(message, offset)  # namespace
+            _, offset = _read_string(message, offset)  # relation name
+            offset += 1  # replica identity setting
+            (number_of_columns,) = struct.unpack_from("!h", message, offset)
+            offset += 2
+            names, types = [], []
+            for _ in range(number_of_columns):
+                offset += 1  # flags
+                name, offset = _read_string(message, offset)
+                (type_oid, _) = struct.unpack_from("!Ii", message, offset)
+                offset += 8
+                names.append(name)
+                types.append(type_oid)
+            relations[relation_id] = (names, types)
+        elif kind == b"I":
+            (relation_id,) = struct.unpack_from("!I", message, 1)
+            values, _ = _read_tuple(message, 6)
+            record(key_of(relation_id, values), "upsert")
+        elif kind == b"U":
+            (relation_id,) = struct.unpack_from("!I", message, 1)
+            offset = 5
+            old_key = None
+            if message[offset:offset + 1] in (b"K", b"O"):
+                old_values, offset = _read_tuple(message, offset + 1)
+                old_key = key_of(relation_id, old_values)
+            new_values, _ = _read_tuple(message, offset + 1)
+            new_key = key_of(relation_id, new_values)
+            if old_key is not None and old_key != new_key:
+                record(old_key, "delete")
+            record(new_key, "upsert")
+        elif kind == b"D":
+            (relation_id,) = struct.unpack_from("!I", message, 1)
+            values, _ = _read_tuple(message, 6)
+            record(key_of(relation_id, values), "delete")
+        # Begin, commit, origin and type messages don't change rows. Truncates don't carry the keys of the removed
+        # rows, a full run is needed to remove their vectors.
+    return changes, key_type
@@ -49,20 +49,36 @@ class AzureOpenAIEmbed(EmbedConnector):
     @property
     def optional_properties(self) -> List[str]:
         return ['max_retries', 'chunk_size']
-    
-    def validation(self) -> bool:
-        """config_validation connector setup"""
-        return True 
 
-    def embed(self, documents:List[NeumDocument]) -> Tuple[List, dict]:
-        """Generate embeddings with Azure OpenAI"""
-        embedding = azure_openai.AzureOpenAIEmbeddings(
+    @property
+    def model_parameters(self) -> dict:
+        return {"deployment_name": self.deployment_name, "endpoint": self.endpoint}
+
+    @property
+    def max_batch_size(self) -> int:
+        return max(self.chunk_size, 16)
+    
+    def _create_client(self) -> azure_openai.AzureOpenAIEmbeddings:
+        return azure_openai.AzureOpenAIEmbeddings(
             max_retries=self.max_retries,
             chunk_size=max(self.chunk_size, 16),
             azure_deployment=self.deployment_name,
             api_key=self.api_key,
             azure_endpoint=self.endpoint
         )
+    
+    async def _aclose_async_client(self, client:azure_openai.AzureOpenAIEmbeddings) -> None:
+        # The langchain embeddings call the API through the openai clients they hold
+        await client.async_client._client.close()
+        client.client._client.close()
+
+    def validation(self) -> bool:
+        """config_validation connector setup"""
+        return True 
+
+    def embed(self, documents:List[NeumDocument]) -> Tuple[List, dict]:
+        """Generate embeddings with Azure OpenAI"""
+        embedding = self.client
         embeddings = []
         texts = [x.content for x in documents]
         embeddings  = embedding.embed_documents(texts=texts)
@@ -75,10 +91,19 @@ class AzureOpenAIEmbed(EmbedConnector):
     
     def embed_query(self, query: str) -> List[float]:
         """Generate embeddings for a single query using Azure OpenAI"""
+        return self.client.embed_query(query)
 
-        embedding = azure_openai.AzureOpenAIEmbeddings(
-            azure_deployment=self.deployment_name,
-            api_key=self.api_key,
-            azure_endpoint=self.endpoint
-        )
-        return embedding.embed_query(query)
\ No newline at end of file
+    async def aembed(self, documents:List[NeumDocument]) -> Tuple[List, dict]:
+        """Generate embeddings with Azure OpenAI using the async client"""
+        texts = [x.content for x in documents]
+        embeddings = await self.async_client.aembed_documents(texts=texts)
+        info = {
+            "estimated_cost":str("Not implemented"),
+            "total_tokens":str("Not implemented"),
+            "attempts_used":str("Not implemented")
+        }
+        return embeddings,info
+
+    async def aembed_query(self, query: str) -> List[float]:
+        """Generate embeddings for a single query using the Azure OpenAI async client"""
+        return await self.async_client.aembed_query(query)
@@ -0,0 +1,194 @@
+from typing import Dict, List, Optional, Tuple
+from threading import Lock
+from neumai.EmbedConnectors.EmbedConnector import EmbedConnector
+from neumai.EmbedConnectors.EmbedCache import (
+    EmbedCacheBackend,
+    InMemoryEmbedCache,
+    SQLiteEmbedCache,
+    RedisEmbedCache,
+    embed_cache_key,
+)
+from neumai.Shared.NeumDocument import NeumDocument
+from neumai.Shared.Exceptions import InvalidEmbedConnectorException
+from pydantic import Field, PrivateAttr, validator
+import asyncio
+
+class CachedEmbed(EmbedConnector):
+    """
+    Cached Embed Connector
+
+    Wraps any embed connector with a content addressed embedding cache. Embeddings are keyed by a hash of the embed connector, its model parameters and the exact text, so re-running a pipeline or re-syncing a lightly edited file only calls the embedding service for text it has not seen before.
+
+    Attributes:
+    -----------
+    embed_connector : EmbedConnector
+        The embed connector used to generate embeddings that are not in the cache.
+
+    cache_backend : Optional[str]
+        Where embeddings are cached: "memory" (LRU in the current process), "sqlite" (local file) or "redis" (Redis compatible server). Default is "memory".
+
+    cache_path : Optional[str]
+        Path to the SQLite file. Required for the "sqlite" backend.
+
+    redis_url : Optional[str]
+        URL of the Redis server (i.e. redis://localhost:6379/0). Required for the "redis" backend.
+
+    max_entries : Optional[int]
+        Maximum number of embeddings kept in the cache. Least recently used embeddings are evicted first. Default is 100000.
+    """
+
+    embed_connector: EmbedConnector = Field(..., description="Embed connector generating embeddings on cache misses.")
+
+    cache_backend: Optional[str] = Field("memory", description="Cache backend: memory, sqlite or redis.")
+
+    cache_path: Optional[str] = Field(None, description="Path to the SQLite cache file.")
+
+    redis_url: Optional[str] = Field(None, description="URL of the Redis server.")
+
+    max_entries: Optional[int] = Field(100000, description="Maximum number of cached embeddings.")
+
+    _cache: Optional[EmbedCacheBackend] = PrivateAttr(default=None)
+
+    _cache_lock: Lock = PrivateAttr(default_factory=Lock)
+
+    @property
+    def embed_name(self) -> str:
+        return 'CachedEmbed'
+
+    @property
+    def required_properties(self) -> List[str]:
+        return ['embed_connector']
+
+    @property
+    def optional_properties(self) -> List[str]:
+        return ['cache_backend', 'cache_path', 'redis_url', 'max_entries']
+
+    @property
+    def model_parameters(self) -> dict:
+        return self.embed_connector.model_parameters
+
+    @property
+    def max_batch_size(self) -> int:
+        return self.embed_connector.max_batch_size
+
+    @property
+    def max_batch_tokens(self) -> Optional[int]:
+        return self.embed_connector.max_batch_tokens
+
+    @property
+    def tokenizer_model(self) -> Optional[str]:
+        return self.embed_connector.tokenizer_model
+
+    @validator("embed_connector", pre=True, always=True)
+    def deserialize_embed_connector(cls, value):
+        if isinstance(value, dict):
+            from neumai.ModelFactories.EmbedConnectorFactory import EmbedConnectorFactory
+            return EmbedConnectorFactory.get_embed(value.get("embed_name"), value.get("embed_information"))
+        return value
+
+    @validator("cache_backend")
+    def validate_cache_backend(cls, value):
+        if value not in ("memory", "sqlite", "redis"):
+            raise ValueError(f"{value} is an invalid cache backend. Available backends: ['memory', 'sqlite', 'redis']")
+        return value
+
+    def validation(self) -> bool:
+        """config_validation connector setup"""
+        if self.cache_backend == "sqlite" and not self.cache_path:
+            raise InvalidEmbedConnectorException("cache_path is required for the sqlite cache backend")
+        if self.cache_backend == "redis" and not self.redis_url:
+            raise InvalidEmbedConnectorException("redis_url is required for the redis cache backend")
+        return self.embed_connector.validation()
+
+    @property
+    def cache(self) -> EmbedCacheBackend:
+        if self._cache is None:
+            with self._cache_lock:
+                if self._cache is None:
+                    if self.cache_backend == "sqlite":
+                        self._cache = SQLiteEmbedCache(path=self.cache_path, max_entries=self.max_entries)
+                    elif self.cache_backend == "redis":
+                        self._cache = RedisEmbedCache(url=self.redis_url, max_entries=self.max_entries)
+                    else:
+                        self._cache = InMemoryEmbedCache(max_entries=self.max_entries)
+        return self._cache
+
+    def cache_info(self) -> dict:
+        """Hit / miss counters and size of the cache"""
+        return self.cache.stats()
+
+    def _key(self, text:str) -> str:
+        return embed_cache_key(self.embed_connector.embed_name, self.embed_connector.model_parameters, text)
+
+    def _split(self, documents:List[NeumDocument], cached:Dict[str, List[float]], keys:List[str]) -> List[NeumDocument]:
+        # Only embed each missing text once, even if it appears several times in the batch
+        missing:Dict[str, NeumDocument] = {}
+        for document, key in zip(documents, keys):
+            if key not in cached and key not in missing:
+                missing[key] = document
+        return list(missing.values())
+
+    def _info(self, keys:List[str], embedded:int, info:Optional[dict]) -> dict:
+        info = dict(info or {
+            "estimated_cost":str("Not implemented"),
+            "total_tokens":str("Not implemented"),
+            "attempts_used":str("Not implemented")
+        })
+        info["cache_hits"] = len(keys) - embedded
+        info["cache_misses"] = embedded
+        return info
+
+    def embed(self, documents:List[NeumDocument]) -> Tuple[List, dict]:
+        """Generate embeddings, only calling the embed connector for texts that are not cached"""
+        keys = [self._key(document.content) for document in documents]
+        cached = self.cache.get_many(keys)
+        to_embed = self._split(documents=documents, cached=cached, keys=keys)
+        info = None
+        if to_embed:
+            embeddings, info = self.embed_connector.embed(documents=to_embed)
+            new_entries = {self._key(document.content): embedding for document, embedding in zip(to_embed, embeddings)}
+            self.cache.put_many(new_entries)
+            cached.update(new_entries)
+        return [cached[key] for key in keys], self._info(keys=keys, embedded=len(to_embed), info=info)
+
+    def embed_query(self, query:str) -> List[float]:
+        """Generate embeddings for a single query, using the cache if available"""
+        key = self._key(query)
+        cached = self.cache.get_many([key])
+        if key in cached:
+            return cached[key]
+        embedding = self.embed_connector.embed_query(query=query)
+        self.cache.put_many({key: embedding})
+        return embedding
+
+    async def aembed(self, documents:List[NeumDocument]) -> Tuple[List, dict]:
+        keys = [self._key(document.content) for document in documents]
+        cached = await asyncio.to_thread(self.cache.get_many, keys)
+        to_embed = self._split(documents=documents, cached=cached, keys=keys)
+        info = None
+        if to_embed:
+            embeddings, info = await self.embed_connector.aembed(documents=to_embed)
+            new_entries = {self._key(document.content): embedding for document, embedding in zip(to_embed, embeddings)}
+            await asyncio.to_thread(self.cache.put_many, new_entries)
+            cached.update(new_entries)
+        return [cached[key] for key in keys], self._info(keys=keys, embedded=len(to_embed), info=info)
+
+    async def aembed_query(self, query:str) -> List[float]:
+        key = self._key(query)
+        cached = await asyncio.to_thread(self.cache.get_many, [key])
+        if key in cached:
+            return cached[key]
+        embedding = await self.embed_connector.aembed_query(query=query)
+        await asyncio.to_thread(self.cache.put_many, {key: embedding})
+        return embedding
+
+    def as_json(self):
+        """Python does not have built in serialization. We need this logic to be able to respond in our API..
+
+        Returns:
+            _type_: the json to return
+        """
+        json_to_return = super().as_json()
+        # Keep the name of the wrapped connector so it can be deserialized through the factory
+        json_to_return['embed_information']['embed_connector'] = self.embed_connector.as_json()
+        return json_to_return
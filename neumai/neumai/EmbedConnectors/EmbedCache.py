@@ -0,0 +1,181 @@
+from abc import ABC, abstractmethod
+from array import array
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, List
+import hashlib
+import json
+import sqlite3
+import time
+
+def embed_cache_key(embed_name:str, model_parameters:dict, text:str) -> str:
+    """Content address of an embedding: the embed connector, the model parameters and the exact text embedded."""
+    digest = hashlib.sha256()
+    digest.update(embed_name.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(json.dumps(model_parameters, sort_keys=True).encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(text.encode("utf-8"))
+    return digest.hexdigest()
+
+def _pack_vector(vector:List[float]) -> bytes:
+    return array("d", vector).tobytes()
+
+def _unpack_vector(data:bytes) -> List[float]:
+    vector = array("d")
+    vector.frombytes(data)
+    return vector.tolist()
+
+class EmbedCacheBackend(ABC):
+    """Storage for cached embeddings. Backends are size bounded and keep hit / miss counters."""
+
+    def __init__(self, max_entries:int) -> None:
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = Lock()
+
+    @abstractmethod
+    def _get_many(self, keys:List[str]) -> Dict[str, List[float]]:
+        """Returns the cached vectors for the keys found in the cache"""
+
+    @abstractmethod
+    def put_many(self, entries:Dict[str, List[float]]) -> None:
+        """Stores vectors in the cache, evicting the least recently used entries beyond max_entries"""
+
+    @abstractmethod
+    def size(self) -> int:
+        """Number of entries in the cache"""
+
+    def get_many(self, keys:List[str]) -> Dict[str, List[float]]:
+        found = self._get_many(keys) if keys else {}
+        with self._stats_lock:
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def close(self) -> None:
+        pass
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "size": self.size(), "max_entries": self.max_entries}
+
+class InMemoryEmbedCache(EmbedCacheBackend):
+    """LRU cache held in the memory of the current process."""
+
+    def __init__(self, max_entries:int) -> None:
+        super().__init__(max_entries=max_entries)
+        self._entries:"OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = Lock()
+
+    def _get_many(self, keys:List[str]) -> Dict[str, List[float]]:
+        found = {}
+        with self._lock:
+            for key in keys:
+                vector = self._entries.get(key)
+                if vector is not None:
+                    self._entries.move_to_end(key)
+                    found[key] = vector
+        return found
+
+    def put_many(self, entries:Dict[str, List[float]]) -> None:
+        with self._lock:
+            for key, vector in entries.items():
+                self._entries[key] = vector
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def size(self) -> int:
+        return len(self._entries)
+
+class SQLiteEmbedCache(EmbedCacheBackend):
+    """LRU cache persisted in a local SQLite file, shared across runs of a pipeline."""
+
+    def __init__(self, path:str, max_entries:int) -> None:
+        super().__init__(max_entries=max_entries)
+        self._lock = Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL, last_access REAL NOT NULL)")
+            self._connection.execute("CREATE INDEX IF NOT EXISTS embeddings_last_access ON embeddings (last_access)")
+            self._size = self._connection.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def _get_many(self, keys:List[str]) -> Dict[str, List[float]]:
+        found = {}
+        now = time.time()
+        with self._lock, self._connection:
+            # Stay below SQLite's limit of host parameters per statement
+            for i in range(0, len(keys), 500):
+                batch = keys[i:i + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._connection.execute(f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", batch).fetchall()
+                for key, vector in rows:
+                    found[key] = _unpack_vector(vector)
+            if found:
+                self._connection.executemany("UPDATE embeddings SET last_access = ? WHERE key = ?", [(now, key) for key in found])
+        return found
+
+    def put_many(self, entries:Dict[str, List[float]]) -> None:
+        if not entries:
+            return
+        now = time.time()
+        with self._lock, self._connection:
+            for key, vector in entries.items():
+                cursor = self._connection.execute("INSERT OR IGNORE INTO embeddings (key, vector, last_access) VALUES (?, ?, ?)", (key, _pack_vector(vector), now))
+                self._size += cursor.rowcount
+            if self._size > self.max_entries:
+                self._connection.execute("DELETE FROM embeddings WHERE key IN (SELECT key FROM embeddings ORDER BY last_access ASC LIMIT ?)", (self._size - self.max_entries,))
+                self._size = self.max_entries
+
+    def size(self) -> int:
+        return self._size
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+class RedisEmbedCache(EmbedCacheBackend):
+    """LRU cache stored in a Redis compatible server, shared across processes and machines."""
+
+    def __init__(self, url:str, max_entries:int, namespace:str = "neumai:embeddings") -> None:
+        super().__init__(max_entries=max_entries)
+        try:
+            import redis
+        except ImportError:
+            raise ImportError("You must run " "`pip install redis`")
+        self._client = redis.Redis.from_url(url)
+        self._namespace = namespace
+        self._lru_key = f"{namespace}:lru"
+
+    def _key(self, key:str) -> str:
+        return f"{self._namespace}:{key}"
+
+    def _get_many(self, keys:List[str]) -> Dict[str, List[float]]:
+        values = self._client.mget([self._key(key) for key in keys])
+        found = {key: _unpack_vector(value) for key, value in zip(keys, values) if value is not None}
+        if found:
+            now = time.time()
+            self._client.zadd(self._lru_key, {key: now for key in found})
+        return found
+
+    def put_many(self, entries:Dict[str, List[float]]) -> None:
+        if not entries:
+            return
+        now = time.time()
+        pipe = self._client.pipeline()
+        pipe.mset({self._key(key): _pack_vector(vector) for key, vector in entries.items()})
+        pipe.zadd(self._lru_key, {key: now for key in entries})
+        pipe.zcard(self._lru_key)
+        size = pipe.execute()[-1]
+        if size > self.max_entries:
+            evicted = self._client.zpopmin(self._lru_key, size - self.max_entries)
+            if evicted:
+                self._client.delete(*[self._key(key.decode("utf-8") if isinstance(key, bytes) else key) for key, _ in evicted])
+
+    def size(self) -> int:
+        return self._client.zcard(self._lru_key)
+
+    def close(self) -> None:
+        self._client.close()
@@ -1,11 +1,23 @@
 from abc import ABC, abstractmethod
-from typing import List, Tuple
+from typing import Any, List, Tuple, Optional
+from threading import Lock
 from neumai.Shared.NeumDocument import NeumDocument
-from pydantic import BaseModel
+from neumai.Shared.NeumVectorBatch import NeumVectorBatch
+from neumai.Shared.async_utils import LoopClients, aclose_client
+from pydantic import BaseModel, PrivateAttr
+from uuid import uuid4
+import asyncio
 import json
 
 class EmbedConnector(ABC, BaseModel):
 
+    _client: Any = PrivateAttr(default=None)
+
+    # Async HTTP clients are bound to the event loop they were first used on, and closed when it shuts down
+    _async_clients: LoopClients = PrivateAttr(default_factory=LoopClients)
+
+    _client_lock: Lock = PrivateAttr(default_factory=Lock)
+
     @property
     @abstractmethod
     def embed_name(self) -> str:
@@ -21,6 +33,60 @@ class EmbedConnector(ABC, BaseModel):
     def optional_properties(self) -> List[str]:
         pass
 
+    @property
+    def max_batch_size(self) -> int:
+        """Maximum number of texts sent to the service in a single request"""
+        return 32
+
+    @property
+    def max_batch_tokens(self) -> Optional[int]:
+        """Maximum number of tokens sent to the service in a single request. None if the service has no limit"""
+        return None
+
+    @property
+    def tokenizer_model(self) -> Optional[str]:
+        """Model whose tokenizer counts the tokens of texts sent to the service. None if tokens are only estimated"""
+        return None
+
+    @property
+    def model_parameters(self) -> dict:
+        """Parameters that determine the vectors produced for a given text. Used to key cached embeddings"""
+        return {}
+
+    def _create_client(self) -> Any:
+        """Create the client used to call the embedding service"""
+        raise NotImplementedError(f"{self.embed_name} does not create a client")
+
+    def _create_async_client(self) -> Any:
+        """Create the client used by the async methods. Defaults to a new sync client"""
+        return self._create_client()
+
+    async def _aclose_async_client(self, client:Any) -> None:
+        """Close a client created by `_create_async_client`"""
+        await aclose_client(client)
+
+    @property
+    def client(self) -> Any:
+        """Client created on first use and reused across calls and threads, keeping its HTTP connections alive"""
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    self._client = self._create_client()
+        return self._client
+
+    @property
+    def async_client(self) -> Any:
+        """Client created on first use within the running event loop and reused by later calls on that loop"""
+        return self._async_clients.get(create=self._create_async_client, aclose=self._aclose_async_client)
+
+    def close(self) -> None:
+        """Close the async clients of the connector. Closing from inside an event loop should use `aclose` instead."""
+        self._async_clients.close()
+
+    async def aclose(self) -> None:
+        """Async version of close"""
+        await self._async_clients.aclose()
+
     @abstractmethod
     def validation(self) -> bool:
         """config_validation connector setup"""
@@ -33,6 +99,30 @@ class EmbedConnector(ABC, BaseModel):
     def embed_query(self, query:str) -> List[float]:
         """Generate embeddings with a given service"""
 
+    def embed_to_batch(self, documents:List[NeumDocument], ids:Optional[List[str]] = None) -> Tuple[NeumVectorBatch, dict]:
+        """Embed documents into a NeumVectorBatch carrying their metadata. Vectors get random ids unless `ids` are given."""
+        embeddings, info = self.embed(documents=documents)
+        return self._to_batch(documents=documents, embeddings=embeddings, ids=ids), info
+
+    async def aembed(self, documents:List[NeumDocument]) -> Tuple[List, dict]:
+        """Async version of embed. By default the blocking call is run in a worker thread."""
+        return await asyncio.to_thread(self.embed, documents=documents)
+
+    async def aembed_to_batch(self, documents:List[NeumDocument], ids:Optional[List[str]] = None) -> Tuple[NeumVectorBatch, dict]:
+        """Async version of embed_to_batch"""
+        embeddings, info = await self.aembed(documents=documents)
+        return self._to_batch(documents=documents, embeddings=embeddings, ids=ids), info
+
+    @staticmethod
+    def _to_batch(documents:List[NeumDocument], embeddings:Any, ids:Optional[List[str]]) -> NeumVectorBatch:
+        if ids is None:
+            ids = [str(uuid4()) for _ in range(len(documents))]
+        return NeumVectorBatch.from_embeddings(ids=ids, embeddings=embeddings, metadata=[document.metadata for document in documents])
+
+    async def aembed_query(self, query:str) -> List[float]:
+        """Async version of embed_query. By default the blocking call is run in a worker thread."""
+        return await asyncio.to_thread(self.embed_query, query=query)
+
     def as_json(self):
         """Python does not have built in serialization. We need this logic to be able to respond in our API..
 
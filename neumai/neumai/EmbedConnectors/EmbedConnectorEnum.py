@@ -4,6 +4,7 @@ class EmbedConnectorEnum(str, Enum):
     openaiembed = "openaiembed"
     azureopenaiembed = "azureopenaiembed"
     replicateembed = "replicateembed"
+    cachedembed = "cachedembed"
 
     def as_embed_connector_enum(embed_connector_name: str):
         if embed_connector_name == None or embed_connector_name == "":
@@ -1,9 +1,11 @@
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 from neumai.EmbedConnectors.EmbedConnector import EmbedConnector
 from neumai.Shared.NeumDocument import NeumDocument
+from neumai.Shared.NeumVectorBatch import NeumVectorBatch
 from neumai.Shared.Exceptions import HuggingFaceConnectonException
-from huggingface_hub import InferenceClient
+from huggingface_hub import InferenceClient, AsyncInferenceClient
 from pydantic import Field
+import numpy as np
 
 class HuggingFaceEmbed(EmbedConnector):
     """
@@ -24,6 +26,16 @@ class HuggingFaceEmbed(EmbedConnector):
     def optional_properties(self) -> List[str]:
         return []
     
+    @property
+    def model_parameters(self) -> dict:
+        return {"model": self.model}
+    
+    def _create_client(self) -> InferenceClient:
+        return InferenceClient(model=self.model, token=self.token)
+
+    def _create_async_client(self) -> AsyncInferenceClient:
+        return AsyncInferenceClient(model=self.model, token=self.token)
+
     def validation(self) -> bool:
         """config_validation connector setup"""
         try:
@@ -33,7 +45,15 @@ class HuggingFaceEmbed(EmbedConnector):
         return True 
     
     def embed(self, documents:List[NeumDocument]) -> Tuple[List, dict]:
-        client = InferenceClient(model=self.model, token=self.token)
+        embeddings = self._embed_matrix(documents=documents)
+        return embeddings.tolist(), self._info()
+
+    def embed_to_batch(self, documents:List[NeumDocument], ids:Optional[List[str]] = None) -> Tuple[NeumVectorBatch, dict]:
+        # The inference client returns arrays, keep them as a matrix instead of going through lists
+        return self._to_batch(documents=documents, embeddings=self._embed_matrix(documents=documents), ids=ids), self._info()
+
+    def _embed_matrix(self, documents:List[NeumDocument]) -> np.ndarray:
+        client = self.client
         batch_size = 32
         all_embeddings = []
         for i in range(0, len(documents), batch_size):
@@ -42,15 +62,45 @@ class HuggingFaceEmbed(EmbedConnector):
             # get batch of texts and ids
             batch = [doc.content for doc in documents[i:i_end]]
             embeddings = client.feature_extraction(text=batch)
-            all_embeddings.extend(embeddings.tolist())
-        info = {
+            all_embeddings.append(embeddings)
+        return self._stack(all_embeddings)
+    
+    def embed_query(self, query: str) -> List[float]:
+        return self.client.feature_extraction(text=query)
+
+    async def aembed(self, documents:List[NeumDocument]) -> Tuple[List, dict]:
+        embeddings = await self._aembed_matrix(documents=documents)
+        return embeddings.tolist(), self._info()
+
+    async def aembed_to_batch(self, documents:List[NeumDocument], ids:Optional[List[str]] = None) -> Tuple[NeumVectorBatch, dict]:
+        return self._to_batch(documents=documents, embeddings=await self._aembed_matrix(documents=documents), ids=ids), self._info()
+
+    async def _aembed_matrix(self, documents:List[NeumDocument]) -> np.ndarray:
+        client = self.async_client
+        batch_size = 32
+        all_embeddings = []
+        for i in range(0, len(documents), batch_size):
+            # set end position of batch
+            i_end = min(i + batch_size, len(documents))
+            # get batch of texts and ids
+            batch = [doc.content for doc in documents[i:i_end]]
+            embeddings = await client.feature_extraction(text=batch)
+            all_embeddings.append(embeddings)
+        return self._stack(all_embeddings)
+
+    @staticmethod
+    def _stack(embeddings:List[np.ndarray]) -> np.ndarray:
+        if not embeddings:
+            return np.empty((0, 0), dtype=np.float32)
+        return np.concatenate([np.asarray(batch, dtype=np.float32) for batch in embeddings])
+
+    @staticmethod
+    def _info() -> dict:
+        return {
             "estimated_cost":str("Not implemented"),
             "total_tokens":str("Not implemented"),
             "attempts_used":str("Not implemented")
         }
-        return all_embeddings, info
-    
-    def embed_query(self, query: str) -> List[float]:
-        client = InferenceClient(model=self.model, token=self.token)
-        return client.feature_extraction(text=query)
 
+    async def aembed_query(self, query: str) -> List[float]:
+        return await self.async_client.feature_extraction(text=query)
@@ -41,6 +41,36 @@ class OpenAIEmbed(EmbedConnector):
     def optional_properties(self) -> List[str]:
         return ['max_retries', 'chunk_size']
 
+    @property
+    def model_parameters(self) -> dict:
+        # OpenAIEmbeddings default model
+        return {"model": "text-embedding-ada-002"}
+
+    @property
+    def max_batch_size(self) -> int:
+        return self.chunk_size
+
+    @property
+    def max_batch_tokens(self) -> Optional[int]:
+        # OpenAI caps the tokens summed across all inputs of an embeddings request
+        return 300000
+
+    @property
+    def tokenizer_model(self) -> Optional[str]:
+        return self.model_parameters["model"]
+
+    def _create_client(self) -> OpenAIEmbeddings:
+        return OpenAIEmbeddings(
+            max_retries=self.max_retries,
+            chunk_size=self.chunk_size,
+            api_key=self.api_key, 
+        )
+
+    async def _aclose_async_client(self, client:OpenAIEmbeddings) -> None:
+        # The langchain embeddings call the API through the openai clients they hold
+        await client.async_client._client.close()
+        client.client._client.close()
+
     def validation(self) -> bool:
         """config_validation connector setup"""
         try:
@@ -52,11 +82,7 @@ class OpenAIEmbed(EmbedConnector):
     def embed(self, documents:List[NeumDocument]) -> Tuple[List, dict]:
         """Generate embeddings with OpenAI"""
 
-        embedding = OpenAIEmbeddings(
-            max_retries=self.max_retries,
-            chunk_size=self.chunk_size,
-            api_key=self.api_key, 
-        )
+        embedding = self.client
         embeddings = []
         texts = [x.content for x in documents]
         # do we want to persist some embeddings if they were able to be wrriten but not another "batch" of them? or should we treat all texts as an atomic operation
@@ -71,5 +97,19 @@ class OpenAIEmbed(EmbedConnector):
 
     def embed_query(self, query: str) -> List[float]:
         """Generate embeddings for a single query using OpenAI"""
-        embedding = OpenAIEmbeddings(api_key=self.api_key)
-        return embedding.embed_query(query)
+        return self.client.embed_query(query)
+
+    async def aembed(self, documents:List[NeumDocument]) -> Tuple[List, dict]:
+        """Generate embeddings with OpenAI using the async client"""
+        texts = [x.content for x in documents]
+        embeddings = await self.async_client.aembed_documents(texts=texts)
+        info = {
+            "estimated_cost":str("Not implemented"),
+            "total_tokens":str("Not implemented"),
+            "attempts_used":str("Not implemented")
+        }
+        return embeddings,info
+
+    async def aembed_query(self, query: str) -> List[float]:
+        """Generate embeddings for a single query using the OpenAI async client"""
+        return await self.async_client.aembed_query(query)
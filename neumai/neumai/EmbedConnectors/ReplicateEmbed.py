@@ -35,15 +35,21 @@ class ReplicateEmbed(EmbedConnector):
     def optional_properties(self) -> List[str]:
         return []
 
+    @property
+    def model_parameters(self) -> dict:
+        return {"replicate_model": self.replicate_model}
+
+    def _create_client(self) -> replicate.Client:
+        return replicate.Client(api_token=self.api_key)
+
     def validation(self) -> bool:
         """config_validation connector setup"""
         return True 
 
     def embed(self, documents:List[NeumDocument]) -> Tuple[List, dict]:
         """Generate embeddings with Azure OpenAI"""
-        api_key = self.api_key
         model = self.replicate_model
-        client = replicate.Client(api_token=api_key)
+        client = self.client
         batch_size = 32
         batched_embeddings = []
         for i in range(0, len(documents), batch_size):
@@ -66,9 +72,8 @@ class ReplicateEmbed(EmbedConnector):
         return batched_embeddings, info
 
     def embed_query(self, query: str) -> List[float]:
-        api_key = self.api_key
         model = self.replicate_model
-        client = replicate.Client(api_token=api_key)
+        client = self.client
         output = client.run(
             model,
             input={"text": query}
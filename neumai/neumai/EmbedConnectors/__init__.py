@@ -4,3 +4,4 @@ from .EmbedConnector import EmbedConnector
 from .OpenAIEmbed import OpenAIEmbed
 from .EmbedConnector import EmbedConnector
 from .HuggingFaceEmbed import HuggingFaceEmbed
+from .CachedEmbed import CachedEmbed
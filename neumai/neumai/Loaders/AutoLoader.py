@@ -58,8 +58,8 @@ class AutoLoader(Loader):
         elif "json" in file.type:
             loader = JSONLoader()
         else:
-            loader = UnstructuredFileLoader(file_path=file.file_path)
-            documents = loader.load()
+            with file.as_path() as file_path:
+                documents = UnstructuredFileLoader(file_path=file_path).load()
             for doc in documents:
                 yield NeumDocument(id=file.id, content=doc.page_content, metadata=file.metadata)
             return 
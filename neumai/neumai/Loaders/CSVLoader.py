@@ -1,4 +1,4 @@
-from typing import List, Generator, Optional, Dict
+from typing import List, Generator, Optional, Dict, Tuple
 from neumai.Shared.NeumDocument import NeumDocument
 from neumai.Shared.LocalFile import LocalFile
 from neumai.Loaders.Loader import Loader
@@ -6,6 +6,14 @@ from pydantic import Field
 from neumai.Shared.Selector import Selector
 import csv
 
+# csv module arguments the columnar reader can mirror, mapped to their pyarrow.csv.ParseOptions name
+_COLUMNAR_CSV_ARGS = {
+    "delimiter": "delimiter",
+    "quotechar": "quote_char",
+    "escapechar": "escape_char",
+    "doublequote": "double_quote",
+}
+
 class CSVLoader(Loader):
     """
     CSV Loader
@@ -26,6 +34,12 @@ class CSVLoader(Loader):
     csv_args : Optional[Dict]
         Optional additional arguments that can be passed to the CSV reader. This can include settings like delimiter, quotechar, etc.
 
+    columnar : Optional[bool]
+        Whether to read the file in column batches with pyarrow and build documents with vectorized string operations. Produces the same documents as reading row by row, much faster. Falls back to row by row reading for `csv_args` pyarrow can't mirror (delimiter, quotechar, escapechar and doublequote are supported). Default is True.
+
+    batch_size : Optional[int]
+        Number of rows read per batch in columnar mode. Default is 10000.
+
     selector : Optional[Selector]
         An optional Selector object to define criteria for selecting, embedding, or modifying metadata in the data. Default is a Selector with empty 'to_embed' and 'to_metadata' lists.
     """
@@ -38,6 +52,10 @@ class CSVLoader(Loader):
 
     csv_args: Optional[Dict] = Field(None, description="Optional additional CSV arguments.")
 
+    columnar: Optional[bool] = Field(True, description="Read the file in column batches.")
+
+    batch_size: Optional[int] = Field(10000, description="Rows per batch in columnar mode.")
+
     selector: Optional[Selector] = Field(Selector(to_embed=[], to_metadata=[]), description="Selector for loader metadata")
 
     @property
@@ -50,7 +68,7 @@ class CSVLoader(Loader):
 
     @property
     def optional_properties(self) -> List[str]:
-        return ["id_key", "source_column", "encoding", "csv_args"]
+        return ["id_key", "source_column", "encoding", "csv_args", "columnar", "batch_size"]
     
     @property
     def available_metadata(self) -> List[str]:
@@ -64,23 +82,145 @@ class CSVLoader(Loader):
         return True   
 
     def load(self, file: LocalFile) -> Generator[NeumDocument, None, None]:
+        for documents in self.load_batches(file=file):
+            yield from documents
+
+    def load_batches(self, file: LocalFile) -> Generator[List[NeumDocument], None, None]:
+        """Load data into batches of Document objects, one batch per block of rows read."""
+        csv_args = self.csv_args or {}
+        if self.columnar and all(key in _COLUMNAR_CSV_ARGS for key in csv_args):
+            yield from self._load_columnar(file=file, csv_args=csv_args)
+        else:
+            yield from self._load_rows(file=file, csv_args=csv_args)
+
+    def _load_rows(self, file: LocalFile, csv_args: Dict, start_row: int = 0) -> Generator[List[NeumDocument], None, None]:
         source_column = self.source_column
         encoding = self.encoding# modify to use encoding
-        csv_args = self.csv_args # default to id
         id_key = self.id_key # default to id
-        selector = self.selector
+        batch_size = self.batch_size or 10000
 
-        with open(file.file_path, newline="", encoding=encoding) as csvfile:
+        with file.open_text(encoding=encoding, newline="") as csvfile:
             csv_reader = csv.DictReader(csvfile, **csv_args)  # Use csv_args if provided
+            documents = []
             for i, row in enumerate(csv_reader):
+                if i < start_row:
+                    continue
                 document_id = f"{row.get(id_key, '')}.{id_key}"
                 metadata = self.extract_metadata(row)
                 content = self.extract_content(row)
-                source = row[source_column] if source_column else file.file_path
+                source = row[source_column] if source_column else (file.file_path or file.id)
                 metadata["source"] = source
                 metadata["row"] = i
-                doc = NeumDocument(content=content, metadata=metadata, id=document_id)
-                yield doc
+                documents.append(NeumDocument(content=content, metadata=metadata, id=document_id))
+                if len(documents) >= batch_size:
+                    yield documents
+                    documents = []
+            if documents:
+                yield documents
+
+    def _load_columnar(self, file: LocalFile, csv_args: Dict) -> Generator[List[NeumDocument], None, None]:
+        """Reads the file in column batches and builds the documents of `batch_size` rows at a time."""
+        try:
+            import pyarrow as pa
+            import pyarrow.csv as pa_csv
+        except ImportError:
+            raise ImportError(
+                "You must run "
+                "`pip install pyarrow`"
+            )
+
+        parse_options = {_COLUMNAR_CSV_ARGS[key]: value for key, value in csv_args.items()}
+        if parse_options.get("escape_char", False) is None:
+            parse_options["escape_char"] = False
+        encoding = self.encoding or "utf-8"
+
+        def open_reader(column_types: Dict):
+            return pa_csv.open_csv(
+                pa.BufferReader(file.content) if file.content is not None else file.file_path,
+                # pyarrow skips the byte order mark of UTF-8 files
+                read_options=pa_csv.ReadOptions(autogenerate_column_names=True, encoding="utf8" if encoding.lower().replace("_", "-") in ("utf-8", "utf-8-sig", "utf8") else encoding),
+                parse_options=pa_csv.ParseOptions(newlines_in_values=True, **parse_options),
+                convert_options=pa_csv.ConvertOptions(column_types=column_types, strings_can_be_null=False, quoted_strings_can_be_null=False),
+            )
+
+        first_row = 0
+        columns = None
+        fallback = False
+        try:
+            # Every value is read as a string, which needs the names of the columns. They are known once the first
+            # block of the file is parsed.
+            reader = open_reader(column_types={})
+            column_names = reader.schema.names
+            reader.close()
+            reader = open_reader(column_types={name: pa.string() for name in column_names})
+            for record_batch in reader:
+                if columns is None:
+                    # The first row is the header
+                    fieldnames = [column[0].as_py() for column in record_batch.columns]
+                    if len(fieldnames) == 1:
+                        # Empty lines are values of a single column file, which pyarrow skips
+                        fallback = True
+                        break
+                    record_batch = record_batch.slice(1)
+                    # Rows are dicts keyed by column name: a repeated column keeps its first position and its last value
+                    columns = {name: index for index, name in enumerate(fieldnames)}
+                    embed_columns = self._projection(self.selector.to_embed, columns) if self.selector.to_embed else list(columns.items())
+                    metadata_columns = self._projection(self.selector.to_metadata, columns)
+                batch_size = self.batch_size or 10000
+                for offset in range(0, record_batch.num_rows, batch_size):
+                    block = record_batch.slice(offset, batch_size)
+                    yield self._block_documents(block=block, first_row=first_row, file=file, embed_columns=embed_columns, metadata_columns=metadata_columns, columns=columns)
+                    first_row += block.num_rows
+            reader.close()
+        except pa.ArrowInvalid:
+            # Empty files and rows with a different number of values than the header
+            fallback = True
+        if fallback:
+            # Let the csv module handle the rest of the file, rows already loaded are skipped
+            yield from self._load_rows(file=file, csv_args=csv_args, start_row=first_row)
+
+    def _block_documents(self, block, first_row: int, file: LocalFile, embed_columns: List[Tuple[str, int]], metadata_columns: List[Tuple[str, int]], columns: Dict[str, int]) -> List[NeumDocument]:
+        import pyarrow.compute as pc
+
+        def values(index: int) -> List[str]:
+            return block.column(index).to_numpy(zero_copy_only=False).tolist()
+
+        id_key = self.id_key
+        number_of_rows = block.num_rows
+        if embed_columns:
+            # "name: value" lines, with names and values stripped, joined by new lines
+            parts = []
+            for position, (name, index) in enumerate(embed_columns):
+                parts += [("\n" if position else "") + f"{name.strip()}: ", pc.utf8_trim_whitespace(block.column(index))]
+            contents = pc.binary_join_element_wise(*parts, "").to_numpy(zero_copy_only=False).tolist()
+        else:
+            contents = [""] * number_of_rows
+        if id_key in columns:
+            ids = pc.binary_join_element_wise(block.column(columns[id_key]), f".{id_key}", "").to_numpy(zero_copy_only=False).tolist()
+        else:
+            ids = [f".{id_key}"] * number_of_rows
+        if self.source_column:
+            sources = values(columns[self.source_column])
+        else:
+            sources = [file.file_path or file.id] * number_of_rows
+        rows = range(first_row, first_row + number_of_rows)
+        if not metadata_columns:
+            return [NeumDocument(content=content, metadata={"source": source, "row": row}, id=document_id) for content, document_id, source, row in zip(contents, ids, sources, rows)]
+
+        metadata_names = [name for name, _ in metadata_columns]
+        metadata_values = zip(*[values(index) for _, index in metadata_columns])
+        documents = []
+        for content, document_id, source, row, row_values in zip(contents, ids, sources, rows, metadata_values):
+            metadata = dict(zip(metadata_names, row_values))
+            metadata["source"] = source
+            metadata["row"] = row
+            documents.append(NeumDocument(content=content, metadata=metadata, id=document_id))
+        return documents
+
+    @staticmethod
+    def _projection(keys: List[str], columns: Dict[str, int]) -> List[Tuple[str, int]]:
+        """Columns selected by `keys`, in the order of `keys`. Keys that aren't columns of the file are skipped."""
+        return [(key, columns[key]) for key in dict.fromkeys(keys) if key in columns]
 
     def extract_metadata(self, row: dict) -> dict:
         # Adapted from CSVLoader.extract_metadata()
@@ -39,8 +39,9 @@ class HTMLLoader(Loader):
 
     def load(self, file:LocalFile) -> Generator[NeumDocument, None, None]:
         """Load data into Document objects."""
-        loader = UnstructuredHTMLLoader(file_path=file.file_path)
-        documents = loader.load()
+        # Unstructured reads from disk, in memory content is written to a temporary file for the duration of the load
+        with file.as_path() as file_path:
+            documents = UnstructuredHTMLLoader(file_path=file_path).load()
         # join the file and document metadata objects
         for doc in documents:
             yield NeumDocument(id=file.id, content=doc.page_content, metadata=file.metadata)
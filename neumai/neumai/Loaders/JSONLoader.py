@@ -4,8 +4,87 @@ from neumai.Shared.LocalFile import LocalFile
 from neumai.Loaders.Loader import Loader
 from pydantic import Field
 from neumai.Shared.Selector import Selector
+import io
 import json
 
+_JSON_LINES_EXTENSIONS = (".jsonl", ".ndjson")
+
+def _iter_json_array(text_file, chunk_size:int = 1024 * 1024) -> Generator:
+    """Yields the elements of a top-level JSON array one at a time, reading the file in chunks.
+
+    Values that are not arrays are yielded whole. At most one element (plus a chunk) is held in memory.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    eof = False
+
+    def fill():
+        # Drop the consumed part of the buffer before reading the next chunk
+        nonlocal buffer, pos, eof
+        chunk = text_file.read(chunk_size)
+        buffer = buffer[pos:] + chunk
+        pos = 0
+        eof = not chunk
+
+    def skip_whitespace():
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos] in " \t\n\r":
+                pos += 1
+            if pos < len(buffer) or eof:
+                return
+            fill()
+
+    skip_whitespace()
+    if pos == len(buffer):
+        return
+    if buffer[pos] != "[":
+        yield json.loads(buffer[pos:] + text_file.read())
+        return
+    pos += 1
+    expect_value = True
+    # A value must follow a comma, "[1,]" is invalid
+    after_comma = False
+    while True:
+        skip_whitespace()
+        if pos == len(buffer):
+            raise json.JSONDecodeError("Unterminated array", buffer, pos)
+        if buffer[pos] == "]" and not (expect_value and after_comma):
+            # Nothing but whitespace may follow the array, as with json.load
+            pos += 1
+            skip_whitespace()
+            if pos < len(buffer):
+                raise json.JSONDecodeError("Extra data", buffer, pos)
+            return
+        if not expect_value:
+            if buffer[pos] != ",":
+                raise json.JSONDecodeError("Expecting ',' delimiter", buffer, pos)
+            pos += 1
+            expect_value = True
+            after_comma = True
+            continue
+        try:
+            value, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            fill()
+            continue
+        # A number cut by the end of the buffer decodes as a shorter number (i.e. "1.5e10" read as "1.")
+        if not eof and (end == len(buffer) or buffer[end] in "0123456789.eE+-"):
+            fill()
+            continue
+        pos = end
+        expect_value = False
+        after_comma = False
+        yield value
+
+def _iter_json_lines(text_file) -> Generator:
+    for line in text_file:
+        if line.strip():
+            yield json.loads(line)
+
 class JSONLoader(Loader):
     """
     JSON Loader
@@ -19,12 +98,22 @@ class JSONLoader(Loader):
 
     selector : Optional[Selector]
         An optional Selector object used to define criteria for selecting, embedding, or modifying metadata in the JSON data. Default is a Selector with empty 'to_embed' and 'to_metadata' lists.
+
+    streaming : Optional[bool]
+        Parse the file incrementally, one element of the top-level array at a time, instead of loading it whole. Use it for files that don't fit in memory. Default is False.
+
+    json_lines : Optional[bool]
+        Whether the file contains one JSON value per line (JSON Lines). JSON Lines files are always read one line at a time. Detected from the .jsonl / .ndjson extension if not set.
     """
 
     id_key: Optional[str] = Field('id', description="Optional ID key.")
 
     selector: Optional[Selector] = Field(Selector(to_embed=[], to_metadata=[]), description="Selector for loader metadata")
 
+    streaming: Optional[bool] = Field(False, description="Parse the file one record at a time.")
+
+    json_lines: Optional[bool] = Field(None, description="Whether the file is in JSON Lines format.")
+
     @property
     def loader_name(self) -> str:
         return "JSONLoader"
@@ -35,7 +124,7 @@ class JSONLoader(Loader):
 
     @property
     def optional_properties(self) -> List[str]:
-        return ["id_key"]
+        return ["id_key", "streaming", "json_lines"]
 
     @property
     def loader_name(self) -> str:
@@ -56,14 +145,9 @@ class JSONLoader(Loader):
         """Load data into Document objects."""
         id_key = self.id_key
 
-        json_data = None
-        if file.file_path:
-            with open(file.file_path, 'r') as json_file:
-                json_data = json.load(json_file)
-        elif file.in_mem_data:
-            json_data = json.loads(file.in_mem_data)
-
-        if json_data is not None:
+        # Elements of a top-level array are processed independently (see process_item), so in streaming mode they
+        # are parsed and turned into documents one at a time.
+        for json_data in self.iterate_records(file=file):
             processed_json = self.process_item(item=json_data, id_key=id_key)
 
             for item in processed_json:
@@ -73,6 +157,32 @@ class JSONLoader(Loader):
                 metadata.update(file.metadata)
                 yield NeumDocument(content=content, metadata=metadata, id=document_id)
 
+    def iterate_records(self, file: LocalFile) -> Generator:
+        """Yields the JSON values to process: the whole file, or one record at a time when streaming / reading JSON Lines"""
+        json_lines = self.json_lines
+        if json_lines is None:
+            extension = (file.suffix or file.type or "").lower()
+            json_lines = extension.endswith(_JSON_LINES_EXTENSIONS)
+
+        if file.content is not None or file.file_path:
+            with file.open_text() as json_file:
+                if json_lines:
+                    yield from _iter_json_lines(json_file)
+                elif self.streaming:
+                    yield from _iter_json_array(json_file)
+                else:
+                    yield json.load(json_file)
+        elif file.in_mem_data:
+            if not isinstance(file.in_mem_data, str):
+                # Already parsed by the data connector (i.e. database rows)
+                yield file.in_mem_data
+            elif json_lines:
+                yield from _iter_json_lines(io.StringIO(file.in_mem_data))
+            elif self.streaming:
+                yield from _iter_json_array(io.StringIO(file.in_mem_data))
+            else:
+                yield json.loads(file.in_mem_data)
+
     def process_item(self, item, prefix="", metadata=None, document_id=None, id_key="id"):
         if metadata is None:
             metadata = {}
@@ -0,0 +1,296 @@
+from typing import Generator, Iterable, Iterator, List, Optional, Tuple
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from queue import Empty, Full, Queue
+from threading import Event, Lock
+from neumai.Loaders.Loader import Loader
+from neumai.Shared.LocalFile import LocalFile
+from neumai.Shared.NeumDocument import NeumDocument
+from neumai.Shared.Exceptions import LoaderProcessException, LoaderTimeoutException
+import copy
+import multiprocessing
+import os
+import pickle
+import signal
+import time
+import weakref
+
+_DOCUMENT = "document"
+_DONE = "done"
+_ERROR = "error"
+_NO_MORE_FILES = object()
+# Documents of a file received from its loader process and not read by the caller yet. A loader process producing
+# documents faster than they are read waits for them, so files of any size are loaded in bounded memory.
+_BUFFERED_DOCUMENTS = 64
+
+def _limit_memory(max_memory_mb:int) -> None:
+    try:
+        import resource
+    except ImportError:
+        # Not available on Windows, the limit is not enforced there
+        return
+    limit = max_memory_mb * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+def _loader_process_main(connection, max_memory_mb:Optional[int]) -> None:
+    """Loop of a loader process: receives (loader, file) tasks and streams back the documents of every file"""
+    # Interrupts are handled by the parent, which terminates its loader processes
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if max_memory_mb:
+        _limit_memory(max_memory_mb)
+    while True:
+        try:
+            task = connection.recv()
+        except EOFError:
+            return
+        if task is None:
+            return
+        loader, file = task
+        try:
+            for document in loader.load(file=file):
+                connection.send((_DOCUMENT, document))
+            connection.send((_DONE, None))
+        except Exception as e:
+            try:
+                pickle.dumps(e)
+            except Exception:
+                e = LoaderProcessException(f"{type(e).__name__}: {e}")
+            connection.send((_ERROR, e))
+
+class _LoaderProcess:
+    def __init__(self, context, max_memory_mb:Optional[int]) -> None:
+        self.connection, child_connection = context.Pipe()
+        self.process = context.Process(target=_loader_process_main, args=(child_connection, max_memory_mb), name="neumai-loader", daemon=True)
+        self.process.start()
+        child_connection.close()
+
+    def stop(self, kill:bool = False) -> None:
+        if not kill:
+            try:
+                self.connection.send(None)
+            except (BrokenPipeError, OSError):
+                kill = True
+            else:
+                self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.connection.close()
+
+class _FileStream:
+    """Documents of a file loaded by `LoaderProcessPool.load_files`, handed from its loading thread to the caller"""
+
+    def __init__(self, file:LocalFile, ready:Optional[Queue]) -> None:
+        self.file = file
+        self.queue:Queue = Queue(maxsize=_BUFFERED_DOCUMENTS)
+        self.cancelled = Event()
+        # Streams are put in `ready` once they have a document or finished, for unordered loads
+        self._ready = ready
+
+    def put(self, item) -> bool:
+        """Waits for room in the buffer. Returns False if the stream was cancelled."""
+        while not self.cancelled.is_set():
+            try:
+                self.queue.put(item, timeout=0.1)
+            except Full:
+                continue
+            if self._ready is not None:
+                self._ready.put(self)
+                self._ready = None
+            return True
+        return False
+
+    def documents(self) -> Generator[NeumDocument, None, None]:
+        while True:
+            try:
+                kind, value = self.queue.get(timeout=0.1)
+            except Empty:
+                if self.cancelled.is_set():
+                    return
+                continue
+            if kind == _DOCUMENT:
+                yield value
+            elif kind == _DONE:
+                return
+            else:
+                raise value
+
+class LoaderProcessPool:
+    """
+    Loader Process Pool
+
+    Runs `Loader.load` in a pool of worker processes, so CPU bound parsing (PDF, HTML, Markdown) uses every core
+    instead of running under the GIL of the pipeline. Processes are started on first use and reused across files.
+    Documents are sent back to the caller as the loader produces them.
+
+    A loader process that exceeds `timeout` on a file or exits (i.e. killed for exceeding its memory) is replaced by
+    a new one, and the load of that file raises `LoaderTimeoutException` / `LoaderProcessException`.
+
+    Attributes:
+    -----------
+    workers : Optional[int]
+        Number of loader processes. Defaults to the number of CPUs.
+
+    timeout : Optional[float]
+        Maximum number of seconds spent loading a single file. No limit by default.
+
+    max_memory_mb : Optional[int]
+        Maximum address space of every loader process, in MB. Loaders exceeding it fail with a MemoryError.
+        Only enforced on platforms providing `resource.RLIMIT_AS`.
+
+    ordered : bool
+        Whether `load_files` yields files in the order they were provided (default) or as soon as their first
+        documents are loaded.
+
+    start_method : Optional[str]
+        Multiprocessing start method ("fork", "spawn" or "forkserver"). Defaults to the platform's default.
+    """
+
+    def __init__(self, workers:Optional[int] = None, timeout:Optional[float] = None, max_memory_mb:Optional[int] = None, ordered:bool = True, start_method:Optional[str] = None) -> None:
+        self.workers = workers or os.cpu_count() or 1
+        self.timeout = timeout
+        self.max_memory_mb = max_memory_mb
+        self.ordered = ordered
+        self._context = multiprocessing.get_context(start_method)
+        self._idle:Queue = Queue()
+        self._lock = Lock()
+        self._processes:List[_LoaderProcess] = []
+        # Streams of `load_files`, cancelled by `close` so their loading threads don't wait on a reader that is gone
+        self._streams:weakref.WeakSet = weakref.WeakSet()
+        self._closed = False
+
+    def load(self, loader:Loader, file:LocalFile) -> Generator[NeumDocument, None, None]:
+        """Loads a file in one of the loader processes, yielding documents as they are produced."""
+        process = self._acquire()
+        healthy = False
+        try:
+            process.connection.send((loader, self._picklable(file)))
+            # Only time spent waiting on the loader counts towards the timeout, not time spent by the caller
+            waited = 0.0
+            while True:
+                if self.timeout is not None:
+                    started = time.monotonic()
+                    ready = process.connection.poll(max(self.timeout - waited, 0))
+                    waited += time.monotonic() - started
+                    if not ready:
+                        raise LoaderTimeoutException(f"Loading file {file.id} took longer than {self.timeout} seconds")
+                try:
+                    kind, value = process.connection.recv()
+                except EOFError:
+                    process.process.join(timeout=1)
+                    raise LoaderProcessException(f"Loader process exited with code {process.process.exitcode} while loading file {file.id}")
+                if kind == _DOCUMENT:
+                    yield value
+                elif kind == _DONE:
+                    healthy = True
+                    return
+                else:
+                    healthy = True
+                    raise value
+        finally:
+            self._release(process, healthy=healthy)
+
+    def load_files(self, loader:Loader, files:Iterable[LocalFile], ordered:Optional[bool] = None) -> Generator[Tuple[LocalFile, Iterator[NeumDocument]], None, None]:
+        """Loads files concurrently, yielding every file with an iterator over its documents.
+
+        Documents are streamed as the loader produces them, with at most `_BUFFERED_DOCUMENTS` of every file held in
+        memory, so streaming loaders (i.e. `JSONLoader` on a multi-GB file) keep their bounded memory use. Up to twice
+        as many files as processes are read ahead from `files`. Files are closed once loaded.
+        """
+        ordered = self.ordered if ordered is None else ordered
+        files = iter(files)
+        executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="neumai-loader")
+        ready = None if ordered else Queue()
+        in_flight = deque()
+        yielded = []
+        try:
+            exhausted = False
+            while True:
+                while not exhausted and len(in_flight) < 2 * self.workers:
+                    file = next(files, _NO_MORE_FILES)
+                    if file is _NO_MORE_FILES:
+                        exhausted = True
+                        break
+                    stream = _FileStream(file=file, ready=ready)
+                    with self._lock:
+                        self._streams.add(stream)
+                    in_flight.append((stream, executor.submit(self._stream_file, loader, stream)))
+                if not in_flight:
+                    return
+                if ordered:
+                    stream, future = in_flight.popleft()
+                else:
+                    stream = ready.get()
+                    index = next(i for i, (in_flight_stream, _) in enumerate(in_flight) if in_flight_stream is stream)
+                    stream, future = in_flight[index]
+                    del in_flight[index]
+                yielded = [(s, f) for s, f in yielded if not f.done()] + [(stream, future)]
+                yield stream.file, stream.documents()
+        finally:
+            for stream, future in list(in_flight) + yielded:
+                stream.cancelled.set()
+                if future.cancel():
+                    stream.file.close()
+            executor.shutdown(wait=False)
+
+    def close(self) -> None:
+        """Stops the loader processes"""
+        with self._lock:
+            self._closed = True
+            processes, self._processes = self._processes, []
+            for stream in list(self._streams):
+                stream.cancelled.set()
+        for process in processes:
+            process.stop()
+
+    def __enter__(self) -> "LoaderProcessPool":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def _stream_file(self, loader:Loader, stream:_FileStream) -> None:
+        documents = self.load(loader=loader, file=stream.file)
+        try:
+            for document in documents:
+                if not stream.put((_DOCUMENT, document)):
+                    return
+            stream.put((_DONE, None))
+        except Exception as e:
+            stream.put((_ERROR, e))
+        finally:
+            # Stopping early releases the loader process, which is replaced since it may still be sending documents
+            documents.close()
+            stream.file.close()
+
+    def _acquire(self) -> _LoaderProcess:
+        with self._lock:
+            if self._closed:
+                raise LoaderProcessException("Loader process pool is closed")
+            if self._idle.empty() and len(self._processes) < self.workers:
+                process = _LoaderProcess(context=self._context, max_memory_mb=self.max_memory_mb)
+                self._processes.append(process)
+                return process
+        return self._idle.get()
+
+    def _release(self, process:_LoaderProcess, healthy:bool) -> None:
+        if healthy and not self._closed:
+            self._idle.put(process)
+            return
+        # The process is stuck or gone, or still streaming documents nobody will read. Replace it.
+        with self._lock:
+            if process in self._processes:
+                self._processes.remove(process)
+        process.stop(kill=True)
+        if not self._closed:
+            with self._lock:
+                replacement = _LoaderProcess(context=self._context, max_memory_mb=self.max_memory_mb)
+                self._processes.append(replacement)
+            self._idle.put(replacement)
+
+    @staticmethod
+    def _picklable(file:LocalFile) -> LocalFile:
+        if isinstance(file.content, memoryview):
+            file = copy.copy(file)
+            file.content = file.content.tobytes()
+        return file
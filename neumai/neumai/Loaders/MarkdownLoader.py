@@ -41,8 +41,9 @@ class MarkdownLoader(Loader):
     #to more metadata including images, tables, etc.
     def load(self, file:LocalFile) -> Generator[NeumDocument, None, None]:
         """Load data into Document objects."""
-        loader = UnstructuredMarkdownLoader(file_path=file.file_path)
-        documents = loader.load()
+        # Unstructured reads from disk, in memory content is written to a temporary file for the duration of the load
+        with file.as_path() as file_path:
+            documents = UnstructuredMarkdownLoader(file_path=file_path).load()
         for doc in documents:
             yield NeumDocument(id=file.id, content=doc.page_content, metadata=file.metadata)
 
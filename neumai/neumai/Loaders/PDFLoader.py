@@ -3,6 +3,8 @@ from neumai.Shared.NeumDocument import NeumDocument
 from neumai.Shared.LocalFile import LocalFile
 from neumai.Loaders.Loader import Loader
 from langchain.document_loaders import PyPDFLoader
+from langchain.document_loaders.blob_loaders import Blob
+from langchain.document_loaders.parsers.pdf import PyPDFParser
 
 class PDFLoader(Loader):
     """ 
@@ -41,8 +43,11 @@ class PDFLoader(Loader):
     #to more metadata including images, tables, etc.
     def load(self, file:LocalFile) -> Generator[NeumDocument, None, None]:
         """Load data into Document objects."""
-        loader = PyPDFLoader(file_path=file.file_path)
-        documents = loader.load()
+        if file.content is not None:
+            # Parse in memory content directly instead of writing it back to disk
+            documents = PyPDFParser().parse(Blob.from_data(file.content, path=file.id))
+        else:
+            documents = PyPDFLoader(file_path=file.file_path).load()
         # join the file and document metadata objects
         for doc in documents:
             yield NeumDocument(id=file.id, content=doc.page_content, metadata=file.metadata)
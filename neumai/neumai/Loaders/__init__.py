@@ -5,4 +5,5 @@ from .MarkdownLoader import MarkdownLoader
 from .PDFLoader import PDFLoader
 from .CSVLoader import CSVLoader
 from .JSONLoader import JSONLoader
-from .LoaderEnum import LoaderEnum
\ No newline at end of file
+from .LoaderEnum import LoaderEnum
+from .LoaderProcessPool import LoaderProcessPool
\ No newline at end of file
@@ -2,7 +2,8 @@ from neumai.EmbedConnectors import (
     EmbedConnector,
     OpenAIEmbed,
     ReplicateEmbed,
-    AzureOpenAIEmbed
+    AzureOpenAIEmbed,
+    CachedEmbed
 )
 
 from neumai.EmbedConnectors.EmbedConnectorEnum import EmbedConnectorEnum
@@ -23,5 +24,7 @@ class EmbedConnectorFactory:
             return OpenAIEmbed(**embed_information)
         elif embed_connector_enum == EmbedConnectorEnum.replicateembed:
             return ReplicateEmbed(**embed_information)
+        elif embed_connector_enum == EmbedConnectorEnum.cachedembed:
+            return CachedEmbed(**embed_information)
         else:
             raise InvalidEmbedConnectorException(f"{embed_connector_name} is an invalid embed connector. Available connectors: {available_embed_connectors}] ")
\ No newline at end of file
@@ -1,4 +1,5 @@
 from neumai.SinkConnectors import (
+    MultiSink,
     PineconeSink,
     QdrantSink,
     SinkConnector,
@@ -27,5 +28,7 @@ class SinkConnectorFactory:
             return SupabaseSink(**sink_information)
         elif sink_connector_enum == SinkConnectorEnum.weaviatesink:
             return WeaviateSink(**sink_information)
+        elif sink_connector_enum == SinkConnectorEnum.multisink:
+            return MultiSink(**sink_information)
         else:
             raise InvalidSinkConnectorException(f"{sink_connector_name} is an invalid sink connector. Available connectors: {available_sink_connectors}]")
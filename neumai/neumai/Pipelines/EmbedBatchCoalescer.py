@@ -0,0 +1,92 @@
+from typing import Callable, List, Optional
+from threading import Lock
+from neumai.Shared.NeumDocument import NeumDocument
+from neumai.Shared.Tokenizer import Tokenizer
+import time
+
+def estimate_tokens(text:str) -> int:
+    """Rough token estimate (~4 characters per token) used to size embedding requests."""
+    return max(1, (len(text) + 3) // 4)
+
+class EmbedBatchCoalescer:
+    """
+    Embed Batch Coalescer
+
+    Gathers chunks across documents and files into batches sized for the embed connector. Chunkers yield one set of chunks
+    per document, which for small documents (CSV or database rows) means many embedding requests with a handful of texts.
+    The coalescer packs chunks until the batch reaches `max_items` texts or `max_tokens` estimated tokens, and releases
+    partially filled batches once they have waited for `max_wait_seconds`. Tokens are estimated from the length of the
+    texts, or counted exactly by `batch_token_counter` (i.e. the tokenizer of the embedding model) for all the chunks
+    added at once.
+
+    Chunks keep their own metadata, so the embeddings returned for a batch map back to the chunks by position.
+    """
+
+    def __init__(self, max_items:int, max_tokens:Optional[int] = None, max_wait_seconds:float = 0.5, token_counter:Callable[[str], int] = estimate_tokens, batch_token_counter:Optional[Callable[[List[str]], List[int]]] = None) -> None:
+        if max_items < 1:
+            raise ValueError("max_items must be greater or equal to 1")
+        self.max_items = max_items
+        self.max_tokens = max_tokens
+        self.max_wait_seconds = max_wait_seconds
+        self.token_counter = token_counter
+        self.batch_token_counter = batch_token_counter
+        self._batch:List[NeumDocument] = []
+        self._batch_tokens = 0
+        self._batch_started:Optional[float] = None
+        self._lock = Lock()
+
+    @classmethod
+    def for_embed(cls, embed, max_items:Optional[int] = None, max_tokens:Optional[int] = None, max_wait_seconds:float = 0.5) -> "EmbedBatchCoalescer":
+        """Create a coalescer using the request limits and the tokenizer of the given embed connector unless overridden."""
+        tokenizer_model = embed.tokenizer_model
+        return cls(
+            max_items=max_items or embed.max_batch_size,
+            max_tokens=max_tokens or embed.max_batch_tokens,
+            max_wait_seconds=max_wait_seconds,
+            batch_token_counter=Tokenizer.for_model(tokenizer_model).count_batch if tokenizer_model else None,
+        )
+
+    def add(self, chunks:List[NeumDocument]) -> List[List[NeumDocument]]:
+        """Add chunks to the pending batch. Returns the batches that are full and ready to be embedded."""
+        ready = []
+        # Count outside of the lock, tokenizing is the expensive part
+        token_counts = self._count_tokens(chunks)
+        with self._lock:
+            for chunk, tokens in zip(chunks, token_counts):
+                if self._batch and self.max_tokens and self._batch_tokens + tokens > self.max_tokens:
+                    ready.append(self._take())
+                if not self._batch:
+                    self._batch_started = time.monotonic()
+                self._batch.append(chunk)
+                self._batch_tokens += tokens
+                if len(self._batch) >= self.max_items:
+                    ready.append(self._take())
+        return ready
+
+    def flush_due(self) -> List[List[NeumDocument]]:
+        """Returns the pending batch if it has waited longer than `max_wait_seconds`."""
+        with self._lock:
+            if self._batch and time.monotonic() - self._batch_started >= self.max_wait_seconds:
+                return [self._take()]
+        return []
+
+    def flush(self) -> List[List[NeumDocument]]:
+        """Returns the pending batch regardless of its size."""
+        with self._lock:
+            if self._batch:
+                return [self._take()]
+        return []
+
+    def _count_tokens(self, chunks:List[NeumDocument]) -> List[int]:
+        if not self.max_tokens:
+            return [0] * len(chunks)
+        if self.batch_token_counter is not None:
+            return self.batch_token_counter([chunk.content for chunk in chunks])
+        return [self.token_counter(chunk.content) for chunk in chunks]
+
+    def _take(self) -> List[NeumDocument]:
+        batch = self._batch
+        self._batch = []
+        self._batch_tokens = 0
+        self._batch_started = None
+        return batch
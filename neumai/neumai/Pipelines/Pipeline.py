@@ -1,15 +1,25 @@
 from neumai.SinkConnectors.filter_utils import FilterCondition
 from .PipelineRun import PipelineRun
 from .TriggerSchedule import TriggerSchedule
+from .PipelineExecutionConfig import PipelineExecutionConfig
+from .StagedPipelineExecutor import StagedPipelineExecutor
+from .EmbedBatchCoalescer import EmbedBatchCoalescer
+from .SyncManifest import SyncManifest
+from .VectorSpool import VectorSpool
 from neumai.SinkConnectors.SinkConnector import SinkConnector
 from neumai.EmbedConnectors.EmbedConnector import EmbedConnector
 from neumai.ModelFactories import EmbedConnectorFactory, SinkConnectorFactory
+from neumai.Chunkers.Chunker import content_chunk_ids
 from neumai.Sources.SourceConnector import SourceConnector
-from neumai.Shared.NeumVector import NeumVector
+from neumai.Loaders.LoaderProcessPool import LoaderProcessPool
 from neumai.Shared.NeumSearch import NeumSearchResult
-from typing import List, Optional
+from neumai.Shared.LocalFile import LocalFile
+from typing import Dict, List, Optional, Union
 from pydantic import BaseModel, Field, validator
-from uuid import uuid4
+from uuid import NAMESPACE_URL, uuid4, uuid5
+from datetime import datetime
+import asyncio
+import hashlib
 import json
 
 class Pipeline(BaseModel):
@@ -130,34 +140,312 @@ class Pipeline(BaseModel):
         except Exception as e:
             raise e
     
-    def run(self) -> int:
+    def run(self, coalesce_batches:bool = False, loader_pool:Optional[LoaderProcessPool] = None, spool:Optional[Union[VectorSpool, str]] = None) -> int:
         # This method is meant for local development only. Not to be used in production.
         # The Neum AI framework provides parallelization constructs through yielding
         # These should be used to run pipelines at scale.
+        # With a `loader_pool`, files are parsed several at a time in the pool's processes.
+        # With a `spool`, embedded vectors are written to disk before the sink (see VectorSpool).
         try:
             self.config_validation()
         except Exception as e:
             raise e
         
+        owns_spool = isinstance(spool, str)
+        if owns_spool:
+            spool = VectorSpool(path=spool)
         try:
-            total_vectors_stored = 0
+            # Vectors left in the spool by a failed or interrupted run are stored first
+            total_vectors_stored = spool.replay(sink=self.sink) if spool is not None else 0
+            # Coalescing packs chunks from different documents into batches sized for the embed connector
+            coalescer = EmbedBatchCoalescer.for_embed(embed=self.embed) if coalesce_batches else None
             for source in self.sources:
-                for cloudFile in source.list_files_full():
-                    for localFile in source.download_files(cloudFile=cloudFile):
-                        for document in source.load_data(file=localFile):
-                            for chunks in source.chunk_data(document=document):
-                                embeddings, embeddings_info = self.embed.embed(documents=chunks)
-                                vectors_to_store = [NeumVector(id=str(uuid4()), vector=embeddings[i], metadata=chunks[i].metadata) for i in range(0,len(embeddings))]
-                                total_vectors_stored += self.sink.store(vectors_to_store=vectors_to_store)
+                for document in self._load_documents(source=source, loader_pool=loader_pool):
+                    for chunks in source.chunk_data(document=document):
+                        batches = coalescer.add(chunks) if coalescer else [chunks]
+                        for batch in batches:
+                            total_vectors_stored += self._embed_and_store(chunks=batch, spool=spool)
+            if coalescer:
+                for batch in coalescer.flush():
+                    total_vectors_stored += self._embed_and_store(chunks=batch, spool=spool)
+            if spool is not None:
+                spool.raise_for_pending()
+                spool.flush(sink=self.sink)
+            else:
+                self.sink.flush()
             return total_vectors_stored
         except Exception as e:
             raise e
+        finally:
+            if owns_spool:
+                spool.close()
+
+    @staticmethod
+    def _load_documents(source:SourceConnector, loader_pool:Optional[LoaderProcessPool] = None):
+        localFiles = (localFile for cloudFile in source.list_files_full() for localFile in source.download_files(cloudFile=cloudFile))
+        if loader_pool is not None:
+            yield from source.load_files(files=localFiles, pool=loader_pool)
+            return
+        for localFile in localFiles:
+            yield from source.load_data(file=localFile)
+
+    def _embed_and_store(self, chunks:List, spool:Optional[VectorSpool] = None) -> int:
+        vectors_to_store, embeddings_info = self.embed.embed_to_batch(documents=chunks)
+        if spool is not None:
+            return spool.store(sink=self.sink, vectors_to_store=vectors_to_store)
+        return self.sink.store(vectors_to_store=vectors_to_store)
+
+    def run_delta(self, last_run:Optional[datetime] = None) -> int:
+        """Run the pipeline only over the files the sources report as changed since `last_run`.
+
+        Vectors carry the id of their file in the `_file_entry_id` metadata field. The vectors of changed files are
+        replaced and the vectors of files listed as deleted (`CloudFile.is_deleted`) are removed with
+        `SinkConnector.delete_vectors_with_file_id`.
+        """
+        try:
+            self.config_validation()
+        except Exception as e:
+            raise e
+
+        total_vectors_stored = 0
+        for source in self.sources:
+            for cloudFile in source.list_files_delta(last_run=last_run):
+                self.sink.delete_vectors_with_file_id(file_id=cloudFile.id)
+                if cloudFile.is_deleted:
+                    continue
+                for localFile in source.download_files(cloudFile=cloudFile):
+                    for document in source.load_data(file=localFile):
+                        for chunks in source.chunk_data(document=document):
+                            for chunk in chunks:
+                                chunk.metadata["_file_entry_id"] = cloudFile.id
+                            total_vectors_stored += self._embed_and_store(chunks=chunks)
+        self.sink.flush()
+        return total_vectors_stored
+
+    def run_staged(self, execution_config:Optional[PipelineExecutionConfig] = None, spool:Optional[Union[VectorSpool, str]] = None) -> int:
+        """Run the pipeline with every stage (list, download, load, chunk, embed, store) executing concurrently.
+
+        Stages are connected through bounded queues, so downloads, embedding calls and sink writes overlap
+        while memory stays bounded. Concurrency per stage is configured through the `PipelineExecutionConfig`.
+        With a `spool`, the store stage writes vectors to disk before the sink and keeps the embed stage going
+        while the sink is down.
+        """
+        try:
+            self.config_validation()
+        except Exception as e:
+            raise e
+
+        if execution_config is None:
+            execution_config = PipelineExecutionConfig()
+        owns_spool = isinstance(spool, str)
+        if owns_spool:
+            spool = VectorSpool(path=spool)
+        try:
+            total_vectors_stored = spool.replay(sink=self.sink) if spool is not None else 0
+            total_vectors_stored += StagedPipelineExecutor(pipeline=self, config=execution_config, spool=spool).run()
+            if spool is not None:
+                spool.raise_for_pending()
+                spool.flush(sink=self.sink)
+            else:
+                self.sink.flush()
+            return total_vectors_stored
+        finally:
+            if owns_spool:
+                spool.close()
+    
+    async def arun(self, max_concurrency:int = 8, spool:Optional[Union[VectorSpool, str]] = None) -> int:
+        """Run the pipeline on an asyncio event loop.
+
+        Files are processed by `max_concurrency` concurrent tasks using the async APIs of the connectors,
+        so many pipelines can share a single event loop. With a `spool`, vectors are written to disk before the sink.
+        """
+        try:
+            await asyncio.to_thread(self.config_validation)
+        except Exception as e:
+            raise e
+
+        owns_spool = isinstance(spool, str)
+        if owns_spool:
+            spool = await asyncio.to_thread(VectorSpool, path=spool)
+        try:
+            return await self._arun(max_concurrency=max_concurrency, spool=spool)
+        finally:
+            if owns_spool:
+                spool.close()
+
+    async def _arun(self, max_concurrency:int, spool:Optional[VectorSpool]) -> int:
+        replayed = await spool.areplay(sink=self.sink) if spool is not None else 0
+
+        files_queue = asyncio.Queue(maxsize=max_concurrency)
+
+        async def list_files():
+            for source in self.sources:
+                async for cloudFile in source.alist_files_full():
+                    await files_queue.put((source, cloudFile))
+            for _ in range(max_concurrency):
+                await files_queue.put(None)
+
+        async def process_files() -> int:
+            vectors_stored = 0
+            while True:
+                item = await files_queue.get()
+                if item is None:
+                    return vectors_stored
+                source, cloudFile = item
+                async for localFile in source.adownload_files(cloudFile=cloudFile):
+                    async for document in source.aload_data(file=localFile):
+                        async for chunks in source.achunk_data(document=document):
+                            vectors_to_store, embeddings_info = await self.embed.aembed_to_batch(documents=chunks)
+                            if spool is not None:
+                                vectors_stored += await spool.astore(sink=self.sink, vectors_to_store=vectors_to_store)
+                            else:
+                                vectors_stored += await self.sink.astore(vectors_to_store=vectors_to_store)
+
+        tasks = [asyncio.create_task(list_files())] + [asyncio.create_task(process_files()) for _ in range(max_concurrency)]
+        try:
+            results = await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+        if spool is not None:
+            spool.raise_for_pending()
+            await spool.aflush(sink=self.sink)
+        else:
+            await self.sink.aflush()
+        return replayed + sum(results[1:])
+    
+    def sync(self, manifest:Union[SyncManifest, str]) -> dict:
+        """Incrementally sync the sources into the sink using a manifest of previously synced files.
+
+        Only new or changed files are processed. The vectors of files that are no longer listed by a source are deleted
+        with `SinkConnector.delete_vectors_with_file_id`. Vectors carry the id of their file in the `_file_entry_id`
+        metadata field.
+
+        Files are compared using the ETag, last modified time or content hash reported when they are listed. Files listed
+        without any of them are downloaded and compared using the hash of their content.
+
+        Within a changed file, vectors are identified by a hash of the content of their chunk. Only chunks that are not
+        already stored are embedded, and the vectors of chunks that disappeared are deleted with
+        `SinkConnector.delete_vectors`. Since chunks are compared by content, changes to their metadata alone are not
+        picked up. Sinks that don't support deleting by id get all the vectors of changed files replaced instead.
+
+        Returns a summary with the number of files added, updated, unchanged and removed, and the vectors stored,
+        unchanged and deleted.
+        """
+        try:
+            self.config_validation()
+        except Exception as e:
+            raise e
+
+        owns_manifest = isinstance(manifest, str)
+        if owns_manifest:
+            manifest = SyncManifest(path=manifest)
+        summary = {"files_added": 0, "files_updated": 0, "files_unchanged": 0, "files_removed": 0, "vectors_stored": 0, "vectors_unchanged": 0, "vectors_deleted": 0}
+        diff_chunks = self.sink.supports_delete_vectors
+        try:
+            for index, source in enumerate(self.sources):
+                source_key = f"{index}:{source.data_connector.connector_name}"
+                seen = set()
+                for cloudFile in source.list_files_sync():
+                    seen.add(cloudFile.id)
+                    entry = manifest.get(source_key=source_key, file_id=cloudFile.id)
+                    if entry is not None and entry.matches(cloudFile):
+                        summary["files_unchanged"] += 1
+                        continue
+                    if cloudFile.has_version:
+                        localFiles = source.download_files(cloudFile=cloudFile)
+                        content_hash = None
+                    else:
+                        # Sources that don't version their files write downloads that outlive the generator,
+                        # so they can be hashed before deciding whether to process them.
+                        localFiles = list(source.download_files(cloudFile=cloudFile))
+                        content_hash = self._hash_local_files(localFiles)
+                        if entry is not None and entry.content_hash == content_hash:
+                            for localFile in localFiles:
+                                localFile.close()
+                            manifest.record(source_key=source_key, cloudFile=cloudFile, vector_ids=entry.vector_ids, content_hash=content_hash)
+                            summary["files_unchanged"] += 1
+                            continue
+                    stored_ids = set(entry.vector_ids) if entry is not None and diff_chunks else set()
+                    if entry is not None and not diff_chunks:
+                        self.sink.delete_vectors_with_file_id(file_id=cloudFile.id)
+                    vector_ids = []
+                    # Identical chunks of a document are numbered across its batches. Loaders splitting a file into
+                    # pages or elements give them all the id of the file, so the numbering spans every document of
+                    # the file sharing an id (i.e. headers repeated on every page).
+                    occurrences_by_document:Dict[str, Dict[str, int]] = {}
+                    for localFile in localFiles:
+                        for document in source.load_data(file=localFile):
+                            occurrences = occurrences_by_document.setdefault(document.id, {})
+                            for chunks in source.chunk_data(document=document):
+                                chunk_ids = self._chunk_vector_ids(file_id=cloudFile.id, document_id=document.id, chunks=chunks, occurrences=occurrences)
+                                new_chunks, new_ids = [], []
+                                for chunk, chunk_id in zip(chunks, chunk_ids):
+                                    if chunk_id not in stored_ids:
+                                        chunk.metadata["_file_entry_id"] = cloudFile.id
+                                        new_chunks.append(chunk)
+                                        new_ids.append(chunk_id)
+                                if new_chunks:
+                                    self._embed_and_store_with_ids(chunks=new_chunks, ids=new_ids)
+                                summary["vectors_stored"] += len(new_chunks)
+                                summary["vectors_unchanged"] += len(chunks) - len(new_chunks)
+                                vector_ids += chunk_ids
+                    if stored_ids:
+                        removed_ids = list(stored_ids - set(vector_ids))
+                        if removed_ids:
+                            self.sink.delete_vectors(ids=removed_ids)
+                        summary["vectors_deleted"] += len(removed_ids)
+                    manifest.record(source_key=source_key, cloudFile=cloudFile, vector_ids=vector_ids, content_hash=content_hash)
+                    summary["files_updated" if entry is not None else "files_added"] += 1
+                # Files that disappeared from the source
+                for file_id in manifest.file_ids(source_key=source_key):
+                    if file_id not in seen:
+                        self.sink.delete_vectors_with_file_id(file_id=file_id)
+                        manifest.remove(source_key=source_key, file_id=file_id)
+                        summary["files_removed"] += 1
+            self.sink.flush()
+            return summary
+        finally:
+            if owns_manifest:
+                manifest.close()
+
+    def _embed_and_store_with_ids(self, chunks:List, ids:List[str]) -> int:
+        vectors_to_store, embeddings_info = self.embed.embed_to_batch(documents=chunks, ids=ids)
+        return self.sink.store(vectors_to_store=vectors_to_store)
+
+    @staticmethod
+    def _chunk_vector_ids(file_id:str, document_id:str, chunks:List, occurrences:Dict[str, int]) -> List[str]:
+        """Deterministic vector ids for the chunks of a file, derived from their content.
+
+        Ids are UUIDs since that is the only format accepted by every sink.
+        """
+        chunk_ids = content_chunk_ids(doc_id=document_id, contents=[chunk.content for chunk in chunks], occurrences=occurrences)
+        return [str(uuid5(NAMESPACE_URL, f"{file_id}/{chunk_id}")) for chunk_id in chunk_ids]
+
+    @staticmethod
+    def _hash_local_files(localFiles:List[LocalFile]) -> str:
+        digest = hashlib.sha256()
+        for localFile in localFiles:
+            if localFile.content is not None or localFile.file_path is not None:
+                with localFile.open_binary() as file:
+                    for block in iter(lambda: file.read(1024 * 1024), b""):
+                        digest.update(block)
+            else:
+                digest.update(json.dumps(localFile.in_mem_data, sort_keys=True, default=str).encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
     
     def search(self, query:str, number_of_results:int, filters:List[FilterCondition]={}) -> List[NeumSearchResult]:
         vector_for_query = self.embed.embed_query(query=query)
         matches =  self.sink.search(vector=vector_for_query, number_of_results=number_of_results, filters=filters)
         return matches
 
+    async def asearch(self, query:str, number_of_results:int, filters:List[FilterCondition]=[]) -> List[NeumSearchResult]:
+        vector_for_query = await self.embed.aembed_query(query=query)
+        matches = await self.sink.asearch(vector=vector_for_query, number_of_results=number_of_results, filters=filters)
+        return matches
+
     # Todo standardize the model serialization as we are mixing FE and BE concepts into the SDK
     def as_pipeline_model(self):
         content_to_return = {}
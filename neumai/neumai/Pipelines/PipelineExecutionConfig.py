@@ -0,0 +1,87 @@
+from typing import Optional
+from pydantic import BaseModel, Field, validator
+
+class PipelineExecutionConfig(BaseModel):
+    """
+    Pipeline Execution Config
+
+    Concurrency settings for `Pipeline.run_staged`. Every stage of the pipeline (list, download, load, chunk, embed and store) runs in its own pool of workers. Stages are joined by bounded queues, so a slow stage applies backpressure to the stages feeding it instead of buffering the whole source in memory.
+
+    Attributes:
+    -----------
+    list_workers : Optional[int]
+        Number of workers listing files. Each source is listed by a single worker, so values above the number of sources have no effect. Default is 1.
+
+    download_workers : Optional[int]
+        Number of workers downloading files from the data connectors. Default is 4.
+
+    load_workers : Optional[int]
+        Number of workers running the loaders over downloaded files. Default is 2.
+
+    chunk_workers : Optional[int]
+        Number of workers chunking loaded documents. Default is 2.
+
+    embed_workers : Optional[int]
+        Number of workers calling the embed connector. Default is 4.
+
+    store_workers : Optional[int]
+        Number of workers calling the sink connector. Default is 4.
+
+    queue_size : Optional[int]
+        Maximum number of items buffered between two consecutive stages. Default is 16.
+
+    coalesce_batches : Optional[bool]
+        If True, chunks from different documents and files are packed into batches sized to the embed connector's request limits before being embedded. Default is False.
+
+    coalesce_max_items : Optional[int]
+        Maximum number of chunks per coalesced batch. Defaults to the embed connector's `max_batch_size`.
+
+    coalesce_max_tokens : Optional[int]
+        Maximum estimated tokens per coalesced batch. Defaults to the embed connector's `max_batch_tokens`.
+
+    coalesce_max_wait : Optional[float]
+        Seconds a partially filled batch waits for more chunks before it is sent to the embed connector. Default is 0.5.
+
+    loader_processes : Optional[int]
+        If set, loaders run in a pool of this many processes instead of the load workers' threads, so CPU bound parsing (PDF, HTML, Markdown) uses several cores. Default is None.
+
+    loader_timeout : Optional[float]
+        Maximum seconds a loader process may spend on a single file. Only used with `loader_processes`.
+
+    loader_max_memory_mb : Optional[int]
+        Maximum memory (address space) of every loader process, in MB. Only used with `loader_processes`.
+    """
+
+    list_workers: Optional[int] = Field(1, description="Number of workers listing files.")
+
+    download_workers: Optional[int] = Field(4, description="Number of workers downloading files.")
+
+    load_workers: Optional[int] = Field(2, description="Number of workers loading files.")
+
+    chunk_workers: Optional[int] = Field(2, description="Number of workers chunking documents.")
+
+    embed_workers: Optional[int] = Field(4, description="Number of workers generating embeddings.")
+
+    store_workers: Optional[int] = Field(4, description="Number of workers storing vectors.")
+
+    queue_size: Optional[int] = Field(16, description="Maximum number of items buffered between stages.")
+
+    coalesce_batches: Optional[bool] = Field(False, description="Pack chunks across documents into batches sized for the embed connector.")
+
+    coalesce_max_items: Optional[int] = Field(None, description="Maximum number of chunks per coalesced batch.")
+
+    coalesce_max_tokens: Optional[int] = Field(None, description="Maximum estimated tokens per coalesced batch.")
+
+    coalesce_max_wait: Optional[float] = Field(0.5, description="Seconds a partial batch waits before being embedded.")
+
+    loader_processes: Optional[int] = Field(None, description="Number of processes running the loaders.")
+
+    loader_timeout: Optional[float] = Field(None, description="Maximum seconds spent loading a single file in a loader process.")
+
+    loader_max_memory_mb: Optional[int] = Field(None, description="Maximum memory of every loader process, in MB.")
+
+    @validator("list_workers", "download_workers", "load_workers", "chunk_workers", "embed_workers", "store_workers", "queue_size")
+    def validate_positive(cls, value):
+        if value is None or value < 1:
+            raise ValueError("Execution settings must be greater or equal to 1")
+        return value
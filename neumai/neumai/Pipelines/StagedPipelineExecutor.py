@@ -0,0 +1,211 @@
+from typing import Any, Callable, Iterable, List, Optional
+from queue import Queue, Empty, Full
+from threading import Event, Lock, Thread
+from neumai.Pipelines.PipelineExecutionConfig import PipelineExecutionConfig
+from neumai.Pipelines.EmbedBatchCoalescer import EmbedBatchCoalescer
+from neumai.Pipelines.VectorSpool import VectorSpool
+from neumai.Loaders.LoaderProcessPool import LoaderProcessPool
+
+_STAGE_DONE = object()
+_STAGE_IDLE = object()
+_POLL_INTERVAL = 0.1
+
+class _Stage:
+    """Pool of workers applying `work` to every item of `inbox` and pushing the outputs to `outbox`.
+
+    `on_idle` is called whenever no input arrived during a poll interval and `on_done` once the input is exhausted.
+    Both return outputs for the next stage, which lets buffering stages release what they hold.
+    """
+
+    def __init__(self, name:str, work:Callable[[Any], Iterable[Any]], workers:int, inbox:Queue, outbox:Optional[Queue], on_idle:Optional[Callable[[], Iterable[Any]]] = None, on_done:Optional[Callable[[], Iterable[Any]]] = None) -> None:
+        self.name = name
+        self.work = work
+        self.on_idle = on_idle
+        self.on_done = on_done
+        self.workers = workers
+        self.inbox = inbox
+        self.outbox = outbox
+        self.active = workers
+        self.lock = Lock()
+        self.next_stage:Optional["_Stage"] = None
+
+class StagedPipelineExecutor:
+    """
+    Staged Pipeline Executor
+
+    Runs a pipeline as a chain of concurrent stages: list -> download -> load -> chunk -> embed -> store.
+    Each stage owns a pool of worker threads and hands its outputs to the next stage through a bounded queue.
+    Network bound stages (download, embed, store) overlap with each other instead of waiting on one another.
+    When batch coalescing is enabled, a single coalesce stage between chunk and embed packs chunks from different
+    documents into batches sized for the embed connector. When `loader_processes` is set, load workers hand files
+    to a pool of loader processes shared by the run. With a `spool`, the store stage writes every batch to the spool
+    before the sink, and only to the spool once the sink failed, so embedding goes on through a sink outage.
+
+    The first exception raised by any stage stops every worker and is re-raised from `run`.
+    """
+
+    def __init__(self, pipeline, config:PipelineExecutionConfig, spool:Optional[VectorSpool] = None) -> None:
+        self.pipeline = pipeline
+        self.config = config
+        self.spool = spool
+        self._stop = Event()
+        self._errors:List[BaseException] = []
+        self._errors_lock = Lock()
+        self._stored_lock = Lock()
+        self.total_vectors_stored = 0
+        self._loader_pool:Optional[LoaderProcessPool] = None
+
+    def run(self) -> int:
+        config = self.config
+        load_workers = config.load_workers
+        if config.loader_processes:
+            self._loader_pool = LoaderProcessPool(workers=config.loader_processes, timeout=config.loader_timeout, max_memory_mb=config.loader_max_memory_mb)
+            # Every load worker waits on one loader process, keep all of them busy
+            load_workers = max(load_workers, config.loader_processes)
+        sources_queue = Queue()
+        for source in self.pipeline.sources:
+            sources_queue.put(source)
+        list_workers = min(config.list_workers, max(len(self.pipeline.sources), 1))
+        for _ in range(list_workers):
+            sources_queue.put(_STAGE_DONE)
+
+        stages = [
+            _Stage("list", self._list, list_workers, sources_queue, Queue(maxsize=config.queue_size)),
+            _Stage("download", self._download, config.download_workers, None, Queue(maxsize=config.queue_size)),
+            _Stage("load", self._load, load_workers, None, Queue(maxsize=config.queue_size)),
+            _Stage("chunk", self._chunk, config.chunk_workers, None, Queue(maxsize=config.queue_size)),
+        ]
+        if config.coalesce_batches:
+            coalescer = EmbedBatchCoalescer.for_embed(
+                embed=self.pipeline.embed,
+                max_items=config.coalesce_max_items,
+                max_tokens=config.coalesce_max_tokens,
+                max_wait_seconds=config.coalesce_max_wait,
+            )
+            stages.append(_Stage("coalesce", coalescer.add, 1, None, Queue(maxsize=config.queue_size), on_idle=coalescer.flush_due, on_done=coalescer.flush))
+        stages += [
+            _Stage("embed", self._embed, config.embed_workers, None, Queue(maxsize=config.queue_size)),
+            _Stage("store", self._store, config.store_workers, None, None),
+        ]
+        for previous, stage in zip(stages, stages[1:]):
+            stage.inbox = previous.outbox
+            previous.next_stage = stage
+
+        threads:List[Thread] = []
+        for stage in stages:
+            for i in range(stage.workers):
+                thread = Thread(target=self._worker, args=(stage,), name=f"neumai-{stage.name}-{i}", daemon=True)
+                thread.start()
+                threads.append(thread)
+        for thread in threads:
+            thread.join()
+        if self._loader_pool is not None:
+            self._loader_pool.close()
+
+        if self._errors:
+            raise self._errors[0]
+        return self.total_vectors_stored
+
+    # Stage implementations. Each one receives an item from the previous stage and yields items for the next one.
+
+    def _list(self, source):
+        for cloudFile in source.list_files_full():
+            yield (source, cloudFile)
+
+    def _download(self, item):
+        source, cloudFile = item
+        for localFile in source.download_files(cloudFile=cloudFile):
+            # Connectors may clean up the downloaded file as soon as their generator resumes,
+            # so hold it until the load stage is done with the file.
+            loaded = Event()
+            yield (source, localFile, loaded)
+            while not loaded.wait(_POLL_INTERVAL):
+                if self._stop.is_set():
+                    return
+
+    def _load(self, item):
+        source, localFile, loaded = item
+        try:
+            for document in source.load_data(file=localFile, pool=self._loader_pool):
+                yield (source, document)
+        finally:
+            loaded.set()
+
+    def _chunk(self, item):
+        source, document = item
+        for chunks in source.chunk_data(document=document):
+            yield chunks
+
+    def _embed(self, chunks):
+        vectors_to_store, embeddings_info = self.pipeline.embed.embed_to_batch(documents=chunks)
+        yield vectors_to_store
+
+    def _store(self, vectors_to_store):
+        if self.spool is not None:
+            vectors_stored = self.spool.store(sink=self.pipeline.sink, vectors_to_store=vectors_to_store)
+        else:
+            vectors_stored = self.pipeline.sink.store(vectors_to_store=vectors_to_store)
+        with self._stored_lock:
+            self.total_vectors_stored += vectors_stored
+        return ()
+
+    # Worker plumbing
+
+    def _worker(self, stage:_Stage):
+        try:
+            while not self._stop.is_set():
+                item = self._get(stage.inbox, idle=stage.on_idle is not None)
+                if item is _STAGE_IDLE:
+                    self._put_all(stage.outbox, stage.on_idle())
+                    continue
+                if item is _STAGE_DONE:
+                    if stage.on_done is not None:
+                        self._put_all(stage.outbox, stage.on_done())
+                    break
+                if item is None:
+                    break
+                if not self._put_all(stage.outbox, stage.work(item)):
+                    break
+                # Deadlines must also be honored while input keeps trickling in
+                if stage.on_idle is not None and not self._put_all(stage.outbox, stage.on_idle()):
+                    break
+        except BaseException as e:
+            self._fail(e)
+        finally:
+            with stage.lock:
+                stage.active -= 1
+                is_last_worker = stage.active == 0
+            # The last worker of a stage tells every worker of the next stage that no more input is coming.
+            if is_last_worker and stage.next_stage is not None:
+                for _ in range(stage.next_stage.workers):
+                    self._put(stage.outbox, _STAGE_DONE)
+
+    def _get(self, queue:Queue, idle:bool = False):
+        while not self._stop.is_set():
+            try:
+                return queue.get(timeout=_POLL_INTERVAL)
+            except Empty:
+                if idle:
+                    return _STAGE_IDLE
+                continue
+        return None
+
+    def _put_all(self, queue:Optional[Queue], outputs:Iterable[Any]) -> bool:
+        for output in outputs:
+            if not self._put(queue, output):
+                return False
+        return True
+
+    def _put(self, queue:Queue, item) -> bool:
+        while not self._stop.is_set():
+            try:
+                queue.put(item, timeout=_POLL_INTERVAL)
+                return True
+            except Full:
+                continue
+        return False
+
+    def _fail(self, error:BaseException):
+        with self._errors_lock:
+            self._errors.append(error)
+        self._stop.set()
@@ -0,0 +1,160 @@
+from typing import Iterable, List, Optional
+from threading import Lock
+from pydantic import BaseModel, Field
+from neumai.Shared.CloudFile import CloudFile
+import json
+import sqlite3
+import time
+
+class SyncManifestEntry(BaseModel):
+    """
+    Sync Manifest Entry
+
+    State of a single file as of the last time it was synced.
+
+    Attributes:
+    -----------
+    source_key : str
+        Identifier of the source the file was listed from.
+
+    file_id : str
+        Identifier of the file (`CloudFile.id`).
+
+    etag : Optional[str]
+        ETag reported by the source.
+
+    last_modified : Optional[str]
+        Last modification time reported by the source.
+
+    content_hash : Optional[str]
+        Hash of the content of the file.
+
+    vector_ids : List[str]
+        Ids of the vectors stored in the sink for the file.
+
+    synced_at : float
+        Timestamp of the last sync of the file.
+    """
+
+    source_key: str = Field(..., description="Identifier of the source.")
+
+    file_id: str = Field(..., description="Identifier of the file.")
+
+    etag: Optional[str] = Field(None, description="ETag reported by the source.")
+
+    last_modified: Optional[str] = Field(None, description="Last modification time reported by the source.")
+
+    content_hash: Optional[str] = Field(None, description="Hash of the content of the file.")
+
+    vector_ids: List[str] = Field(default_factory=list, description="Ids of the vectors stored for the file.")
+
+    synced_at: float = Field(..., description="Timestamp of the last sync.")
+
+    def matches(self, cloudFile:CloudFile) -> bool:
+        """Whether the version reported for the file at listing time is the one that was synced"""
+        if not cloudFile.has_version:
+            return False
+        return (
+            cloudFile.etag == self.etag
+            and cloudFile.last_modified == self.last_modified
+            and (cloudFile.content_hash is None or cloudFile.content_hash == self.content_hash)
+        )
+
+class SyncManifest:
+    """
+    Sync Manifest
+
+    Local SQLite store recording, for every file synced by a pipeline, the version of the file (ETag, last modified time,
+    content hash) and the ids of the vectors produced for it. `Pipeline.sync` uses it to only process new or changed files
+    and to delete the vectors of files that were removed from the source.
+
+    Attributes:
+    -----------
+    path : str
+        Path to the SQLite file. Use ":memory:" for a manifest that only lives for the current process.
+    """
+
+    def __init__(self, path:str) -> None:
+        self.path = path
+        self._lock = Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                """CREATE TABLE IF NOT EXISTS files (
+                    source_key TEXT NOT NULL,
+                    file_id TEXT NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    content_hash TEXT,
+                    vector_ids TEXT NOT NULL,
+                    synced_at REAL NOT NULL,
+                    PRIMARY KEY (source_key, file_id)
+                )"""
+            )
+
+    def get(self, source_key:str, file_id:str) -> Optional[SyncManifestEntry]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT source_key, file_id, etag, last_modified, content_hash, vector_ids, synced_at FROM files WHERE source_key = ? AND file_id = ?",
+                (source_key, file_id),
+            ).fetchone()
+        return self._to_entry(row) if row else None
+
+    def entries(self, source_key:str) -> Iterable[SyncManifestEntry]:
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT source_key, file_id, etag, last_modified, content_hash, vector_ids, synced_at FROM files WHERE source_key = ?",
+                (source_key,),
+            ).fetchall()
+        return [self._to_entry(row) for row in rows]
+
+    def file_ids(self, source_key:str) -> List[str]:
+        with self._lock:
+            rows = self._connection.execute("SELECT file_id FROM files WHERE source_key = ?", (source_key,)).fetchall()
+        return [row[0] for row in rows]
+
+    def record(self, source_key:str, cloudFile:CloudFile, vector_ids:List[str], content_hash:Optional[str] = None) -> SyncManifestEntry:
+        """Record the version of a file that was just synced and the vectors stored for it"""
+        entry = SyncManifestEntry(
+            source_key=source_key,
+            file_id=cloudFile.id,
+            etag=cloudFile.etag,
+            last_modified=cloudFile.last_modified,
+            content_hash=content_hash or cloudFile.content_hash,
+            vector_ids=vector_ids,
+            synced_at=time.time(),
+        )
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO files (source_key, file_id, etag, last_modified, content_hash, vector_ids, synced_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (entry.source_key, entry.file_id, entry.etag, entry.last_modified, entry.content_hash, json.dumps(entry.vector_ids), entry.synced_at),
+            )
+        return entry
+
+    def remove(self, source_key:str, file_id:str) -> None:
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM files WHERE source_key = ? AND file_id = ?", (source_key, file_id))
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def __enter__(self) -> "SyncManifest":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    @staticmethod
+    def _to_entry(row) -> SyncManifestEntry:
+        source_key, file_id, etag, last_modified, content_hash, vector_ids, synced_at = row
+        return SyncManifestEntry(
+            source_key=source_key,
+            file_id=file_id,
+            etag=etag,
+            last_modified=last_modified,
+            content_hash=content_hash,
+            vector_ids=json.loads(vector_ids),
+            synced_at=synced_at,
+        )
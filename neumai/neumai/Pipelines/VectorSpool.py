@@ -0,0 +1,400 @@
+from typing import Dict, Iterator, List, Optional, Tuple
+from threading import Lock
+from neumai.Shared.NeumVectorBatch import NeumVectorBatch
+from neumai.Shared.Exceptions import VectorSpoolFullException, VectorSpoolPendingException
+from neumai.SinkConnectors.SinkConnector import SinkConnector
+import asyncio
+import json
+import numpy as np
+import os
+import struct
+import zlib
+
+# Record layout: header (payload length, crc32 of the payload, sequence number), then the payload:
+# length of the JSON part, JSON part (ids, metadata, dimensions), float32 matrix.
+_RECORD_HEADER = struct.Struct("<IIQ")
+_JSON_LENGTH = struct.Struct("<I")
+_ACK = struct.Struct("<Q")
+_SEGMENT_PREFIX = "segment-"
+_SEGMENT_SUFFIX = ".log"
+_ACK_LOG = "acks.log"
+
+class _Segment:
+    """Append-only segment file, with the number of records written to it and of those not acknowledged yet"""
+
+    def __init__(self, number:int, path:str) -> None:
+        self.number = number
+        self.path = path
+        self.size = 0
+        self.records = 0
+        self.live = 0
+
+class VectorSpool:
+    """
+    Vector Spool
+
+    Durable write-ahead spool between the embed connector and the sink. Embedded vectors are appended to the spool
+    before they are sent to the sink and acknowledged once the sink stored them. Vectors whose write failed, or was
+    interrupted by the process exiting, stay in the spool and are replayed into the sink by `replay`, so a sink outage
+    doesn't cost the embeddings computed before or during it.
+
+    Batches are appended to segment files as length prefixed, checksummed records. Acknowledgements are appended to a
+    separate log, so records are never rewritten in place. Segments are deleted once every record in them is
+    acknowledged and `compact` rewrites the records still pending out of partially acknowledged segments. A torn record
+    at the end of a segment, left by a crash, is truncated when the spool is opened.
+
+    Writes are idempotent as long as sinks upsert by id, which is what makes replaying a batch whose acknowledgement
+    was lost safe.
+
+    Attributes:
+    -----------
+    path : str
+        Directory holding the segments and the acknowledgement log. Created if missing.
+
+    max_bytes : Optional[int]
+        Maximum size of the spool on disk. Appending a batch that doesn't fit, even after compaction, raises
+        `VectorSpoolFullException`. Default is None (unbounded).
+
+    segment_bytes : int
+        Size after which the current segment is closed and a new one is started. Default is 64MB.
+
+    fsync : bool
+        If True, segments are synced to disk after every append, so batches survive a crash of the machine and not only
+        of the process. Default is True.
+    """
+
+    def __init__(self, path:str, max_bytes:Optional[int] = None, segment_bytes:int = 64 * 1024 * 1024, fsync:bool = True) -> None:
+        if max_bytes is not None and max_bytes < 1:
+            raise ValueError("max_bytes must be greater or equal to 1")
+        if segment_bytes < 1:
+            raise ValueError("segment_bytes must be greater or equal to 1")
+        self.path = path
+        self.max_bytes = max_bytes
+        self.segment_bytes = segment_bytes
+        self.fsync = fsync
+        self.sink_error:Optional[BaseException] = None
+        self._lock = Lock()
+        # Pending records by sequence number: (segment number, offset, record size, number of vectors)
+        self._records:Dict[int, Tuple[int, int, int, int]] = {}
+        # Records stored by a sink that applies writes later, acknowledged by `flush`
+        self._unflushed:List[int] = []
+        self._segments:Dict[int, _Segment] = {}
+        self._next_sequence = 0
+        self._active:Optional[_Segment] = None
+        self._active_file = None
+        os.makedirs(path, exist_ok=True)
+        self._recover()
+        self._ack_file = open(os.path.join(path, _ACK_LOG), "ab")
+        self._ack_bytes = self._ack_file.tell()
+        if not self._records:
+            self._truncate_acks()
+
+    @property
+    def pending_batches(self) -> int:
+        with self._lock:
+            return len(self._records)
+
+    @property
+    def pending_vectors(self) -> int:
+        with self._lock:
+            return sum(record[3] for record in self._records.values())
+
+    @property
+    def size_bytes(self) -> int:
+        """Size of the spool on disk"""
+        with self._lock:
+            return self._size_bytes()
+
+    def append(self, vectors_to_store:NeumVectorBatch) -> int:
+        """Durably append a batch of vectors. Returns the id of the record, to acknowledge with `ack`."""
+        vectors_to_store = NeumVectorBatch.from_vectors(vectors_to_store)
+        header = json.dumps(
+            {"ids": vectors_to_store.ids, "metadata": vectors_to_store.metadata, "dimensions": vectors_to_store.dimensions},
+            default=str,
+        ).encode("utf-8")
+        payload = b"".join((_JSON_LENGTH.pack(len(header)), header, vectors_to_store.vectors.tobytes()))
+        with self._lock:
+            record_size = _RECORD_HEADER.size + len(payload)
+            if self.max_bytes is not None and self._size_bytes() + record_size > self.max_bytes:
+                self._compact()
+                if self._size_bytes() + record_size > self.max_bytes:
+                    raise VectorSpoolFullException(f"Spool at {self.path} holds {self._size_bytes()} bytes, a batch of {record_size} bytes would exceed max_bytes ({self.max_bytes})")
+            sequence = self._next_sequence
+            self._next_sequence += 1
+            self._write_record(sequence=sequence, payload=payload, vector_count=len(vectors_to_store))
+            return sequence
+
+    def ack(self, record_id:int) -> None:
+        """Acknowledge that the vectors of a record are stored in the sink"""
+        with self._lock:
+            record = self._records.pop(record_id, None)
+            if record is None:
+                return
+            if not self._records:
+                # Nothing left to replay, start over from empty files instead of logging the acknowledgement
+                self._reset()
+                return
+            self._ack_file.write(_ACK.pack(record_id))
+            self._ack_file.flush()
+            self._ack_bytes += _ACK.size
+            segment = self._segments[record[0]]
+            segment.live -= 1
+            if segment.live == 0 and segment is not self._active:
+                self._delete_segment(segment)
+
+    def pending(self) -> Iterator[Tuple[int, NeumVectorBatch]]:
+        """Records that were not acknowledged yet, oldest first, as (record id, batch)"""
+        with self._lock:
+            record_ids = sorted(self._records)
+        for record_id in record_ids:
+            # Read under the lock, compaction may move the record to another segment
+            with self._lock:
+                record = self._records.get(record_id)
+                if record is None:
+                    continue
+                with open(self._segments[record[0]].path, "rb") as file:
+                    file.seek(record[1])
+                    data = file.read(record[2])
+            yield record_id, self._decode(data[_RECORD_HEADER.size:])
+
+    def store(self, sink, vectors_to_store:NeumVectorBatch) -> int:
+        """Append a batch to the spool, then store it in the sink.
+
+        Once a store fails, the error is kept in `sink_error` and later batches are only appended to the spool, so the
+        pipeline keeps embedding through a sink outage. `raise_for_pending` reports the vectors left in the spool.
+        """
+        record_id = self.append(vectors_to_store)
+        if self.sink_error is not None:
+            return 0
+        try:
+            vectors_stored = sink.store(vectors_to_store=vectors_to_store)
+        except Exception as e:
+            self.sink_error = e
+            return 0
+        self._stored(sink, record_id)
+        return vectors_stored
+
+    async def astore(self, sink, vectors_to_store:NeumVectorBatch) -> int:
+        """Async version of store. Appends run in a worker thread."""
+        record_id = await asyncio.to_thread(self.append, vectors_to_store)
+        if self.sink_error is not None:
+            return 0
+        try:
+            vectors_stored = await sink.astore(vectors_to_store=vectors_to_store)
+        except Exception as e:
+            self.sink_error = e
+            return 0
+        await asyncio.to_thread(self._stored, sink, record_id)
+        return vectors_stored
+
+    def replay(self, sink) -> int:
+        """Store every pending record in the sink, oldest first, acknowledging them as they are stored.
+
+        Returns the number of vectors stored. The first failure is raised and leaves the remaining records pending.
+        """
+        total_vectors_stored = 0
+        for record_id, vectors_to_store in self.pending():
+            total_vectors_stored += sink.store(vectors_to_store=vectors_to_store)
+            self._stored(sink, record_id)
+        self.flush(sink)
+        self.sink_error = None
+        return total_vectors_stored
+
+    async def areplay(self, sink) -> int:
+        """Async version of replay"""
+        total_vectors_stored = 0
+        for record_id, vectors_to_store in await asyncio.to_thread(list, self.pending()):
+            total_vectors_stored += await sink.astore(vectors_to_store=vectors_to_store)
+            await asyncio.to_thread(self._stored, sink, record_id)
+        await self.aflush(sink)
+        self.sink_error = None
+        return total_vectors_stored
+
+    def flush(self, sink) -> None:
+        """Flush the sink, then acknowledge the records it stored without applying them yet.
+
+        Sinks overriding `SinkConnector.flush` (i.e. `MultiSink`, which writes to its secondary sinks in the background)
+        may return from `store` before the vectors are applied, so their records are only acknowledged once `flush`
+        succeeds. If it raises, the records stay in the spool and are replayed.
+        """
+        sink.flush()
+        self._ack_unflushed()
+
+    async def aflush(self, sink) -> None:
+        """Async version of flush"""
+        await sink.aflush()
+        await asyncio.to_thread(self._ack_unflushed)
+
+    def raise_for_pending(self) -> None:
+        """Raise `VectorSpoolPendingException` if a store failed, with the vectors left to replay"""
+        if self.sink_error is None:
+            return
+        pending_vectors = self.pending_vectors
+        raise VectorSpoolPendingException(
+            f"Storing vectors failed, {pending_vectors} vectors are kept in the spool at {self.path} to be replayed: {self.sink_error}",
+            pending_vectors=pending_vectors,
+        ) from self.sink_error
+
+    def _stored(self, sink, record_id:int) -> None:
+        """Acknowledge a record stored by the sink, or hold it until `flush` if the sink applies writes later"""
+        if type(sink).flush is SinkConnector.flush:
+            self.ack(record_id)
+            return
+        with self._lock:
+            self._unflushed.append(record_id)
+
+    def _ack_unflushed(self) -> None:
+        with self._lock:
+            record_ids, self._unflushed = self._unflushed, []
+        for record_id in record_ids:
+            self.ack(record_id)
+
+    def compact(self) -> None:
+        """Rewrite the pending records of partially acknowledged segments into new segments and drop the old ones"""
+        with self._lock:
+            self._compact()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._active_file is not None:
+                self._active_file.close()
+                self._active_file = None
+                self._active = None
+            self._ack_file.close()
+
+    def __enter__(self) -> "VectorSpool":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    # Internals, called with the lock held
+
+    def _size_bytes(self) -> int:
+        return sum(segment.size for segment in self._segments.values()) + self._ack_bytes
+
+    def _write_record(self, sequence:int, payload:bytes, vector_count:int) -> None:
+        if self._active is None or self._active.size >= self.segment_bytes:
+            self._roll()
+        segment = self._active
+        header = _RECORD_HEADER.pack(len(payload), zlib.crc32(payload), sequence)
+        self._active_file.write(header)
+        self._active_file.write(payload)
+        self._active_file.flush()
+        if self.fsync:
+            os.fsync(self._active_file.fileno())
+        self._records[sequence] = (segment.number, segment.size, len(header) + len(payload), vector_count)
+        segment.size += len(header) + len(payload)
+        segment.records += 1
+        segment.live += 1
+
+    def _roll(self) -> None:
+        """Close the active segment and start a new one"""
+        previous = self._active
+        if self._active_file is not None:
+            self._active_file.close()
+        number = max(self._segments, default=-1) + 1
+        segment = _Segment(number=number, path=os.path.join(self.path, f"{_SEGMENT_PREFIX}{number:08d}{_SEGMENT_SUFFIX}"))
+        self._active_file = open(segment.path, "ab")
+        self._segments[number] = segment
+        self._active = segment
+        if previous is not None and previous.live == 0:
+            self._delete_segment(previous)
+
+    def _delete_segment(self, segment:_Segment) -> None:
+        os.remove(segment.path)
+        del self._segments[segment.number]
+
+    def _reset(self) -> None:
+        """Drop every segment and acknowledgement once no record is pending"""
+        for segment in list(self._segments.values()):
+            if segment is not self._active:
+                self._delete_segment(segment)
+        if self._active is not None:
+            self._active_file.truncate(0)
+            self._active.size = 0
+            self._active.records = 0
+            self._active.live = 0
+        self._truncate_acks()
+
+    def _truncate_acks(self) -> None:
+        self._ack_file.truncate(0)
+        self._ack_bytes = 0
+
+    def _compact(self) -> None:
+        if not self._records:
+            self._reset()
+            return
+        partial = [segment for segment in self._segments.values() if segment.live < segment.records]
+        if not partial:
+            return
+        if self._active in partial:
+            self._roll()
+        # Rolling deletes the previous active segment when none of its records are pending
+        partial = [segment for segment in partial if segment.live > 0 and self._segments.get(segment.number) is segment]
+        for segment in partial:
+            moved = sorted((sequence, record) for sequence, record in self._records.items() if record[0] == segment.number)
+            with open(segment.path, "rb") as file:
+                for sequence, (_, offset, size, vector_count) in moved:
+                    file.seek(offset)
+                    data = file.read(size)
+                    self._write_record(sequence=sequence, payload=data[_RECORD_HEADER.size:], vector_count=vector_count)
+            # Records are copied before their segment is removed. After a crash in between, the copies are skipped when
+            # the spool is opened again.
+            self._delete_segment(segment)
+        # Every segment left only holds pending records, so past acknowledgements are no longer needed
+        self._truncate_acks()
+
+    def _recover(self) -> None:
+        """Rebuild the pending records from the segments and the acknowledgement log"""
+        acked = set()
+        ack_path = os.path.join(self.path, _ACK_LOG)
+        if os.path.exists(ack_path):
+            with open(ack_path, "rb") as file:
+                data = file.read()
+            # A torn acknowledgement at the end is dropped, its record is replayed
+            data = data[:len(data) - len(data) % _ACK.size]
+            acked = {sequence for (sequence,) in _ACK.iter_unpack(data)}
+            with open(ack_path, "r+b") as file:
+                file.truncate(len(data))
+        names = sorted(name for name in os.listdir(self.path) if name.startswith(_SEGMENT_PREFIX) and name.endswith(_SEGMENT_SUFFIX))
+        for name in names:
+            number = int(name[len(_SEGMENT_PREFIX):-len(_SEGMENT_SUFFIX)])
+            segment = _Segment(number=number, path=os.path.join(self.path, name))
+            self._segments[number] = segment
+            with open(segment.path, "r+b") as file:
+                data = file.read()
+                offset = 0
+                while offset + _RECORD_HEADER.size <= len(data):
+                    length, checksum, sequence = _RECORD_HEADER.unpack_from(data, offset)
+                    end = offset + _RECORD_HEADER.size + length
+                    payload = data[offset + _RECORD_HEADER.size:end]
+                    if end > len(data) or zlib.crc32(payload) != checksum:
+                        break
+                    self._next_sequence = max(self._next_sequence, sequence + 1)
+                    segment.records += 1
+                    if sequence not in acked and sequence not in self._records:
+                        vector_count = self._vector_count(payload)
+                        self._records[sequence] = (number, offset, end - offset, vector_count)
+                        segment.live += 1
+                    offset = end
+                if offset < len(data):
+                    # Torn write from an interrupted append
+                    file.truncate(offset)
+                segment.size = offset
+        for segment in list(self._segments.values()):
+            if segment.live == 0:
+                self._delete_segment(segment)
+
+    @staticmethod
+    def _vector_count(payload:bytes) -> int:
+        (header_length,) = _JSON_LENGTH.unpack_from(payload)
+        return len(json.loads(payload[_JSON_LENGTH.size:_JSON_LENGTH.size + header_length])["ids"])
+
+    @staticmethod
+    def _decode(payload:bytes) -> NeumVectorBatch:
+        (header_length,) = _JSON_LENGTH.unpack_from(payload)
+        start = _JSON_LENGTH.size + header_length
+        header = json.loads(payload[_JSON_LENGTH.size:start])
+        vectors = np.frombuffer(payload, dtype=np.float32, offset=start).reshape(len(header["ids"]), header["dimensions"])
+        return NeumVectorBatch(ids=header["ids"], vectors=vectors, metadata=header["metadata"])
@@ -8,4 +8,9 @@ from .PipelineRun import (
     PipelineRunTaskDetails
 )
 from .TriggerSchedule import TriggerSchedule
-from .TriggerSyncTypeEnum import TriggerSyncTypeEnum
\ No newline at end of file
+from .TriggerSyncTypeEnum import TriggerSyncTypeEnum
+from .PipelineExecutionConfig import PipelineExecutionConfig
+from .StagedPipelineExecutor import StagedPipelineExecutor
+from .EmbedBatchCoalescer import EmbedBatchCoalescer
+from .SyncManifest import SyncManifest, SyncManifestEntry
+from .VectorSpool import VectorSpool
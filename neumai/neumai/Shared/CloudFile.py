@@ -1,23 +1,44 @@
 from abc import ABC
+import base64
 from neumai.Shared.Exceptions import CloudFileEmptyException
 
 class CloudFile(ABC):
-    def __init__(self, metadata:dict, file_identifier:str = None, id:str = None, data:str = None, type:str = None) -> None:
+    def __init__(self, metadata:dict, file_identifier:str = None, id:str = None, data:str = None, type:str = None, etag:str = None, last_modified:str = None, content_hash:str = None, is_deleted:bool = False, size:int = None) -> None:
         self.file_identifier:str = file_identifier
         self.data:str = data
         self.metadata:dict = metadata
         self.type:str = type
         self.id:str = id
+        # Version of the file reported by the source, used to detect changes between syncs
+        self.etag:str = etag
+        self.last_modified:str = last_modified
+        self.content_hash:str = content_hash
+        # Set by delta listings for files removed from the source, whose vectors must be deleted
+        self.is_deleted:bool = is_deleted
+        # Size in bytes reported by the source, if known, used to pick how the file is downloaded
+        self.size:int = size
+
+    @property
+    def has_version(self) -> bool:
+        return any(v is not None for v in (self.etag, self.last_modified, self.content_hash))
 
     def as_file(dct:dict):
         if dct == None:
             raise CloudFileEmptyException("Received empty dict when converting to as_file")
+        data = dct.get("data", None)
+        if data is not None and dct.get("data_encoding", None) == "base64":
+            data = base64.b64decode(data)
         return CloudFile(
             file_identifier=dct.get("file_identifier", None),
-            data=dct.get("data", None),
+            data=data,
             metadata=dct.get("metadata", None),
             type=dct.get("type", None),
-            id=dct.get("id", None)
+            id=dct.get("id", None),
+            etag=dct.get("etag", None),
+            last_modified=dct.get("last_modified", None),
+            content_hash=dct.get("content_hash", None),
+            is_deleted=dct.get("is_deleted", False),
+            size=dct.get("size", None)
         )
     
     def toJson(self):
@@ -28,9 +49,19 @@ class CloudFile(ABC):
         """
         json_to_return = {}
         json_to_return['file_identifier'] = self.file_identifier
-        json_to_return['data'] = self.data
+        if isinstance(self.data, (bytes, bytearray, memoryview)):
+            # Raw bodies (i.e. pages fetched while crawling) are not valid JSON strings
+            json_to_return['data'] = base64.b64encode(self.data).decode("ascii")
+            json_to_return['data_encoding'] = "base64"
+        else:
+            json_to_return['data'] = self.data
         json_to_return['metadata'] = self.metadata
         json_to_return['type'] = self.type
         json_to_return['id'] = self.id
+        json_to_return['etag'] = self.etag
+        json_to_return['last_modified'] = self.last_modified
+        json_to_return['content_hash'] = self.content_hash
+        json_to_return['is_deleted'] = self.is_deleted
+        json_to_return['size'] = self.size
         return json_to_return
     
\ No newline at end of file
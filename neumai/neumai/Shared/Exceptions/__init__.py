@@ -10,6 +10,14 @@ class LocalFileEmptyException(Exception):
     """Raised when the local file dictionary is empty"""
     pass
 
+class LoaderTimeoutException(Exception):
+    """Raised if loading a file in a loader process takes longer than the configured timeout"""
+    pass
+
+class LoaderProcessException(Exception):
+    """Raised if a loader process exits while loading a file"""
+    pass
+
 class InvalidDataConnectorException(Exception):
     """Raised when an invalid data connector is detected"""
     pass
@@ -50,6 +58,13 @@ class PineconeInsertionException(Exception):
     """Raised if inserting into Pinecone fails"""
     pass
 
+class PineconePartialInsertionException(PineconeInsertionException):
+    """Raised if some of the vectors could not be inserted into Pinecone. Carries the ids of the vectors that failed"""
+    def __init__(self, message:str, vectors_stored:int, failed_ids:list) -> None:
+        super().__init__(message)
+        self.vectors_stored = vectors_stored
+        self.failed_ids = failed_ids
+
 class PineconeIndexInfoException(Exception):
     """Raised if getting index info from Pinecone fails"""
     pass
@@ -82,6 +97,12 @@ class MarqoQueryException(Exception):
     """Raised if querying Marqo fails"""
     pass
 
+class MultiSinkWriteException(Exception):
+    """Raised if writes to some of the sinks of a MultiSink failed after their retries. Failures are keyed by the index of the sink"""
+    def __init__(self, message:str, failures:dict) -> None:
+        super().__init__(message)
+        self.failures = failures
+
 class LanceDBInsertionException(Exception):
     """Raised if inserting into LanceDB fails"""
     pass
@@ -102,6 +123,10 @@ class PostgresConnectionException(Exception):
     """Raised if establishing a connection to a Postgres db fails"""
     pass
 
+class PostgresChangeCaptureException(Exception):
+    """Raised if reading changes from a Postgres db fails"""
+    pass
+
 class S3ConnectionException(Exception):
     """Raised if establishing a connection to AWS S3 fails"""
     pass
@@ -146,6 +171,16 @@ class SupabaseQueryException(Exception):
     """Raised if querying Supabase fails"""
     pass
 
+class VectorSpoolFullException(Exception):
+    """Raised if a batch of vectors doesn't fit in a vector spool, even after compaction"""
+    pass
+
+class VectorSpoolPendingException(Exception):
+    """Raised if storing vectors failed and they were kept in the vector spool to be replayed. Carries the number of vectors pending"""
+    def __init__(self, message:str, pending_vectors:int) -> None:
+        super().__init__(message)
+        self.pending_vectors = pending_vectors
+
 class WeaviateConnectionException(Exception):
     """Raised if establishing a connection to Weaviate fails"""
     pass
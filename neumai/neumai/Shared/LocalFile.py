@@ -1,25 +1,106 @@
 from abc import ABC
+from contextlib import contextmanager
+from typing import IO, Generator, Optional, Union
 from neumai.Shared.Exceptions import LocalFileEmptyException
+import base64
+import io
+import os
+import tempfile
+
+# Downloads up to this size are handed to loaders in memory, larger ones are spilled to a temporary file
+DEFAULT_MAX_IN_MEMORY_SIZE = 32 * 1024 * 1024
 
 class LocalFile(ABC):
-    def __init__(self, metadata:dict, file_path:str = None, in_mem_data:dict = None, type:str = "Any", id:str = None) -> None:
+    def __init__(self, metadata:dict, file_path:str = None, in_mem_data:dict = None, type:str = "Any", id:str = None, content:Union[bytes, memoryview] = None, delete_on_close:bool = False, suffix:str = None) -> None:
         self.file_path:str = file_path
         self.metadata:dict = metadata
         self.in_mem_data:dict = in_mem_data
         self.type:str = type
         self.id:str = id
+        # Raw bytes of the file when it is kept in memory instead of on disk
+        self.content:Optional[Union[bytes, memoryview]] = content
+        # Whether `file_path` is a temporary file owned by this object, removed by `close`
+        self.delete_on_close:bool = delete_on_close
+        # Extension of the file, used to name the temporary file of `as_path`
+        self.suffix:str = suffix if suffix is not None else os.path.splitext(file_path or "")[1]
+
+    @classmethod
+    def from_bytes(cls, content:Union[bytes, memoryview], metadata:dict, id:str = None, type:str = "Any", suffix:str = "", max_in_memory_size:int = DEFAULT_MAX_IN_MEMORY_SIZE) -> "LocalFile":
+        """Wraps downloaded bytes. Content over `max_in_memory_size` is spilled to a temporary file removed by `close`."""
+        if len(content) <= max_in_memory_size:
+            return cls(metadata=metadata, id=id, type=type, content=content, suffix=suffix)
+        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as temp_file:
+            temp_file.write(content)
+        return cls(file_path=temp_file.name, metadata=metadata, id=id, type=type, delete_on_close=True)
+
+    @classmethod
+    def spill_file(cls, metadata:dict, id:str = None, type:str = "Any", suffix:str = "") -> "LocalFile":
+        """Empty temporary file, removed by `close`, for connectors that stream large downloads to disk"""
+        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as temp_file:
+            pass
+        return cls(file_path=temp_file.name, metadata=metadata, id=id, type=type, delete_on_close=True)
+
+    def open_binary(self) -> IO[bytes]:
+        """Opens the content of the file for reading, wherever it is held"""
+        if self.content is not None:
+            return io.BytesIO(self.content)
+        if self.file_path:
+            return open(self.file_path, "rb")
+        raise LocalFileEmptyException("File has no content or path to read from")
+
+    def open_text(self, encoding:Optional[str] = None, newline:Optional[str] = None) -> IO[str]:
+        if self.content is not None:
+            return io.TextIOWrapper(io.BytesIO(self.content), encoding=encoding, newline=newline)
+        if self.file_path:
+            return open(self.file_path, "r", encoding=encoding, newline=newline)
+        raise LocalFileEmptyException("File has no content or path to read from")
+
+    @contextmanager
+    def as_path(self) -> Generator[str, None, None]:
+        """Path to the content of the file, for libraries that only read from disk.
+
+        In memory content is written to a temporary file that is removed on exit.
+        """
+        if self.content is None:
+            yield self.file_path
+            return
+        with tempfile.NamedTemporaryFile(delete=False, suffix=self.suffix) as temp_file:
+            temp_file.write(self.content)
+        try:
+            yield temp_file.name
+        finally:
+            os.remove(temp_file.name)
+
+    def close(self) -> None:
+        """Releases the content of the file and removes the temporary file backing it, if any"""
+        self.content = None
+        if self.delete_on_close and self.file_path:
+            try:
+                os.remove(self.file_path)
+            except FileNotFoundError:
+                pass
+            self.delete_on_close = False
+
+    def __enter__(self) -> "LocalFile":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
 
     def as_file(dct:dict):
         if dct == None:
             raise LocalFileEmptyException("Received empty dict when converting to as_file")
+        content = dct.get("content", None)
         return LocalFile(
             file_path=dct.get("file_path", None),
             metadata=dct.get("metadata", None),
             in_mem_data=dct.get("in_mem_data", None),
             type=dct.get("type", None),
-            id=dct.get("id", None)
+            id=dct.get("id", None),
+            content=base64.b64decode(content) if content is not None else None,
+            suffix=dct.get("suffix", None)
         )
-    
+
     def toJson(self):
         """Python does not have built in serialization. We need this logic to be able to respond in our API..
 
@@ -32,5 +113,7 @@ class LocalFile(ABC):
         json_to_return['in_mem_data'] = self.in_mem_data
         json_to_return['type'] = self.type
         json_to_return['id'] = self.id
+        # Files kept in memory have no path another worker could read, their bytes are sent along
+        json_to_return['content'] = base64.b64encode(self.content).decode("ascii") if self.content is not None else None
+        json_to_return['suffix'] = self.suffix
         return json_to_return
-    
\ No newline at end of file
@@ -0,0 +1,91 @@
+from typing import Dict, Iterator, List, Sequence, Union
+from neumai.Shared.NeumVector import NeumVector
+import numpy as np
+
+class NeumVectorBatch(Sequence):
+    """
+    Neum Vector Batch
+
+    Batch of vectors stored column wise: the vectors in one contiguous float32 matrix, their ids and their metadata in
+    lists. Storing a batch avoids a Python list of floats per vector (~50KB for 1536 dimensions) and lets sinks hand the
+    matrix, or slices of it, to their clients without walking every vector.
+
+    Indexing or iterating a batch yields `NeumVector` views, so code written against `List[NeumVector]` keeps working.
+    Slicing a batch returns a batch sharing the same matrix.
+
+    Attributes:
+    -----------
+    ids : List[str]
+        Ids of the vectors.
+
+    vectors : np.ndarray
+        float32 matrix of shape (number of vectors, dimensions), in C order.
+
+    metadata : List[dict]
+        Metadata of every vector. The dicts are shared with the chunks the vectors were embedded from, not copied.
+    """
+
+    def __init__(self, ids:List[str], vectors:np.ndarray, metadata:List[dict]) -> None:
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        if vectors.ndim == 1 and vectors.size == 0:
+            vectors = vectors.reshape(0, 0)
+        if vectors.ndim != 2:
+            raise ValueError(f"Expected a matrix of vectors, got an array of shape {vectors.shape}")
+        if not (len(ids) == len(metadata) == vectors.shape[0]):
+            raise ValueError(f"Got {len(ids)} ids, {vectors.shape[0]} vectors and {len(metadata)} metadata")
+        self.ids:List[str] = ids
+        self.vectors:np.ndarray = vectors
+        self.metadata:List[dict] = metadata
+
+    @classmethod
+    def from_embeddings(cls, ids:List[str], embeddings:Union[List[List[float]], np.ndarray], metadata:List[dict]) -> "NeumVectorBatch":
+        """Batch from the embeddings returned by an embed connector, converted to float32 in a single pass"""
+        return cls(ids=ids, vectors=np.asarray(embeddings, dtype=np.float32), metadata=metadata)
+
+    @classmethod
+    def from_vectors(cls, vectors:Union["NeumVectorBatch", List[NeumVector]]) -> "NeumVectorBatch":
+        """Batch holding the given vectors. Batches are returned as is."""
+        if isinstance(vectors, NeumVectorBatch):
+            return vectors
+        return cls.from_embeddings(
+            ids=[vector.id for vector in vectors],
+            embeddings=[vector.vector for vector in vectors],
+            metadata=[vector.metadata for vector in vectors],
+        )
+
+    @classmethod
+    def concat(cls, batches:List["NeumVectorBatch"]) -> "NeumVectorBatch":
+        if len(batches) == 1:
+            return batches[0]
+        # Empty batches have no dimensions to concatenate along
+        matrices = [batch.vectors for batch in batches if len(batch)] or [np.empty((0, 0), dtype=np.float32)]
+        return cls(
+            ids=[id for batch in batches for id in batch.ids],
+            vectors=np.concatenate(matrices),
+            metadata=[metadata for batch in batches for metadata in batch.metadata],
+        )
+
+    @property
+    def dimensions(self) -> int:
+        return self.vectors.shape[1]
+
+    def vector_lists(self) -> List[List[float]]:
+        """Vectors as lists of floats, for clients that only accept lists. Converted in a single pass."""
+        return self.vectors.tolist()
+
+    def metadata_columns(self) -> Dict[str, list]:
+        """Metadata as one list of values per field. Vectors missing a field get None."""
+        keys = dict.fromkeys(key for metadata in self.metadata for key in metadata)
+        return {key: [metadata.get(key) for metadata in self.metadata] for key in keys}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return NeumVectorBatch(ids=self.ids[index], vectors=self.vectors[index], metadata=self.metadata[index])
+        return NeumVector(id=self.ids[index], vector=self.vectors[index].tolist(), metadata=self.metadata[index])
+
+    def __iter__(self) -> Iterator[NeumVector]:
+        for id, vector, metadata in zip(self.ids, self.vectors.tolist(), self.metadata):
+            yield NeumVector(id=id, vector=vector, metadata=metadata)
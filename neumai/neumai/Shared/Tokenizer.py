@@ -0,0 +1,61 @@
+from typing import Dict, List
+from threading import Lock
+import os
+import tiktoken
+
+# Encoding used for models unknown to tiktoken (i.e. non OpenAI embedding models)
+DEFAULT_ENCODING = "cl100k_base"
+
+# Batches smaller than this are encoded in the calling thread, handing them to threads costs more than it saves
+_MIN_THREADED_BATCH = 64
+
+class Tokenizer:
+    """
+    Tokenizer
+
+    Counts tokens of texts the way an embedding model does. Loading an encoding is expensive, so tokenizers are created
+    once per model and shared by the whole process through `Tokenizer.for_model`.
+
+    Attributes:
+    -----------
+    model : str
+        Name of the model (i.e. "text-embedding-ada-002") or of a tiktoken encoding (i.e. "cl100k_base").
+        Models unknown to tiktoken are counted with the cl100k_base encoding.
+    """
+
+    _tokenizers:Dict[str, "Tokenizer"] = {}
+
+    _lock = Lock()
+
+    def __init__(self, model:str) -> None:
+        self.model = model
+        self._threads = min(os.cpu_count() or 1, 8)
+        try:
+            self._encoding = tiktoken.encoding_for_model(model)
+        except KeyError:
+            try:
+                self._encoding = tiktoken.get_encoding(model)
+            except ValueError:
+                self._encoding = tiktoken.get_encoding(DEFAULT_ENCODING)
+
+    @classmethod
+    def for_model(cls, model:str) -> "Tokenizer":
+        """Shared tokenizer of a model, created on first use"""
+        tokenizer = cls._tokenizers.get(model)
+        if tokenizer is None:
+            with cls._lock:
+                tokenizer = cls._tokenizers.get(model)
+                if tokenizer is None:
+                    tokenizer = cls(model)
+                    cls._tokenizers[model] = tokenizer
+        return tokenizer
+
+    def count(self, text:str) -> int:
+        # Special tokens (i.e. "<|endoftext|>") in the text are counted as plain text
+        return len(self._encoding.encode_ordinary(text))
+
+    def count_batch(self, texts:List[str]) -> List[int]:
+        """Token counts of several texts. Large batches are encoded in parallel by tiktoken, which releases the GIL"""
+        if self._threads == 1 or len(texts) < _MIN_THREADED_BATCH:
+            return [len(self._encoding.encode_ordinary(text)) for text in texts]
+        return [len(tokens) for tokens in self._encoding.encode_ordinary_batch(texts, num_threads=self._threads)]
@@ -2,15 +2,18 @@ from .CloudFile import CloudFile
 from .LocalFile import LocalFile
 from .NeumDocument import NeumDocument
 from .NeumVector import NeumVector
+from .NeumVectorBatch import NeumVectorBatch
 from .Selector import Selector
 from .NeumSinkInfo import NeumSinkInfo
 from .NeumSearch import NeumSearchResult
+from .Tokenizer import Tokenizer
 from .Exceptions import (
     AzureBlobConnectionException,
     CloudFileEmptyException,
     InvalidDataConnectorException,
     InvalidSinkConnectorException,
     LocalFileEmptyException,
+    MultiSinkWriteException,
     NeumDocumentEmptyException,
     NeumSearchResultEmptyException,
     NeumSinkInfoEmptyException,
@@ -18,6 +21,7 @@ from .Exceptions import (
     PostgresConnectionException,
     PineconeConnectionException,
     PineconeInsertionException,
+    PineconePartialInsertionException,
     PineconeIndexInfoException,
     PineconeQueryException,
     QdrantInsertionException,
@@ -34,6 +38,8 @@ from .Exceptions import (
     SupabaseInsertionException,
     SupabaseIndexInfoException,
     SupabaseQueryException,
+    VectorSpoolFullException,
+    VectorSpoolPendingException,
     WeaviateConnectionException,
     WeaviateInsertionException,
     WeaviateIndexInfoException,
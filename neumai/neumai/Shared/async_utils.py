@@ -0,0 +1,113 @@
+from typing import Any, AsyncGenerator, Awaitable, Callable, Iterable, TypeVar
+from threading import Lock
+from weakref import WeakKeyDictionary
+import asyncio
+import inspect
+import threading
+
+T = TypeVar("T")
+
+_EXHAUSTED = object()
+
+async def iterate_in_thread(iterable:Iterable[T]) -> AsyncGenerator[T, None]:
+    """Iterate a blocking generator from async code.
+
+    Every call to `next` runs in a worker thread, so the event loop is never blocked by the I/O done inside the generator.
+    The generator is only advanced when the consumer asks for the next item, which preserves the semantics of generators
+    that clean up resources (i.e. temporary files) once they are resumed.
+    """
+    iterator = iter(iterable)
+    running = Lock()
+
+    def advance():
+        with running:
+            return next(iterator, _EXHAUSTED)
+
+    def close():
+        with running:
+            close_iterator = getattr(iterator, "close", None)
+            if close_iterator is not None:
+                close_iterator()
+
+    try:
+        while True:
+            item = await asyncio.to_thread(advance)
+            if item is _EXHAUSTED:
+                break
+            yield item
+    finally:
+        if running.locked():
+            # Cancelled while `next` runs in its worker thread, the generator can only be closed once it returns
+            threading.Thread(target=close, name="neumai-close-iterator", daemon=True).start()
+        else:
+            close()
+
+async def aclose_client(client:Any) -> None:
+    """Close a client with its `aclose` or `close` method, awaiting it for async clients"""
+    close = getattr(client, "aclose", None) or getattr(client, "close", None)
+    if close is None:
+        return
+    result = close()
+    if inspect.isawaitable(result):
+        await result
+
+async def _close_on_shutdown(client:Any, aclose:Callable[[Any], Awaitable[None]]) -> AsyncGenerator[None, None]:
+    try:
+        yield
+    finally:
+        await aclose(client)
+
+async def _finalize(finalizer:AsyncGenerator[None, None]) -> None:
+    await finalizer.aclose()
+
+class LoopClients:
+    """Async clients, one per event loop since their connections are bound to the loop they were created on.
+
+    Every client is closed when its loop shuts down its async generators, as `asyncio.run` does before returning, or
+    by `close` / `aclose`.
+    """
+
+    def __init__(self) -> None:
+        # loop -> (client, async generator closing the client when it is finalized)
+        self._clients:WeakKeyDictionary = WeakKeyDictionary()
+        self._lock = Lock()
+
+    def get(self, create:Callable[[], T], aclose:Callable[[T], Awaitable[None]] = aclose_client) -> T:
+        """Client of the running event loop, created on first use"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            entry = self._clients.get(loop)
+            if entry is None:
+                client = create()
+                finalizer = _close_on_shutdown(client, aclose)
+                # Starting the generator within the loop registers it with the loop, which finalizes it on shutdown
+                try:
+                    finalizer.__anext__().send(None)
+                except StopIteration:
+                    pass
+                entry = self._clients[loop] = (client, finalizer)
+        return entry[0]
+
+    async def aclose(self) -> None:
+        """Close the client of the running event loop, and the clients of other loops"""
+        running_loop = asyncio.get_running_loop()
+        with self._lock:
+            entry = self._clients.pop(running_loop, None)
+        if entry is not None:
+            await _finalize(entry[1])
+        self.close()
+
+    def close(self) -> None:
+        """Close the clients of every event loop"""
+        with self._lock:
+            entries = list(self._clients.items())
+            self._clients.clear()
+        for loop, (_, finalizer) in entries:
+            if loop.is_closed():
+                # Transports of a closed loop are already gone
+                continue
+            if loop.is_running():
+                # Closing from inside the loop, or from another thread, can't wait for the loop
+                asyncio.run_coroutine_threadsafe(_finalize(finalizer), loop)
+            else:
+                loop.run_until_complete(_finalize(finalizer))
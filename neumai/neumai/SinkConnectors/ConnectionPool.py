@@ -0,0 +1,178 @@
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+from contextlib import contextmanager
+from threading import Condition, Lock
+import atexit
+import time
+
+class ConnectionPool:
+    """
+    Connection Pool
+
+    Keeps clients / connections to a vector database open so they can be reused across `store`, `search` and `info` calls
+    and across threads. A client is leased exclusively by one caller at a time and returned to the pool afterwards, which
+    also makes pooling safe for clients that keep per-call state (i.e. Weaviate batches or database cursors).
+
+    Attributes:
+    -----------
+    create_client : Callable[[], Any]
+        Function creating a new client.
+
+    close_client : Optional[Callable[[Any], None]]
+        Function closing a client that is evicted from the pool.
+
+    max_size : int
+        Maximum number of clients opened by the pool. Callers wait for a client to be returned once the limit is reached.
+
+    idle_timeout : Optional[float]
+        Seconds an unused client is kept open before being closed. None keeps clients open until the pool is closed.
+    """
+
+    def __init__(self, create_client:Callable[[], Any], close_client:Optional[Callable[[Any], None]] = None, max_size:int = 4, idle_timeout:Optional[float] = 300) -> None:
+        if max_size < 1:
+            raise ValueError("max_size must be greater or equal to 1")
+        self.create_client = create_client
+        self.close_client = close_client
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        # Idle clients with the time they were returned, most recently used last
+        self._idle:List[Tuple[Any, float]] = []
+        self._opened = 0
+        self._closed = False
+        self._condition = Condition()
+
+    @contextmanager
+    def lease(self, timeout:Optional[float] = None):
+        """Lease a client for the duration of the `with` block.
+
+        Clients are returned to the pool when the block exits normally. If the block raises, the client is closed
+        instead, since it may have been left in a broken state.
+        """
+        client = self.acquire(timeout=timeout)
+        try:
+            yield client
+        except BaseException:
+            self.release(client, discard=True)
+            raise
+        else:
+            self.release(client)
+
+    def acquire(self, timeout:Optional[float] = None) -> Any:
+        """Take an idle client or open a new one. Blocks while `max_size` clients are leased."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        expired = []
+        try:
+            with self._condition:
+                while True:
+                    if self._closed:
+                        raise RuntimeError("Connection pool is closed")
+                    expired += self._pop_expired()
+                    if self._idle:
+                        client, _ = self._idle.pop()
+                        return client
+                    if self._opened < self.max_size:
+                        self._opened += 1
+                        break
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise TimeoutError(f"No connection available after {timeout} seconds")
+                    self._condition.wait(remaining)
+        finally:
+            self._close_all(expired)
+        try:
+            return self.create_client()
+        except BaseException:
+            with self._condition:
+                self._opened -= 1
+                self._condition.notify()
+            raise
+
+    def release(self, client:Any, discard:bool = False) -> None:
+        """Return a leased client to the pool, or close it if `discard` is set."""
+        with self._condition:
+            if discard or self._closed:
+                self._opened -= 1
+            else:
+                self._idle.append((client, time.monotonic()))
+            self._condition.notify()
+        if discard or self._closed:
+            self._close_all([client])
+
+    def warm_up(self, size:int = 1) -> int:
+        """Open clients ahead of the first calls so they don't pay the connection setup time. Returns the number of idle clients."""
+        clients = []
+        try:
+            for _ in range(min(size, self.max_size)):
+                with self._condition:
+                    if self._opened >= self.max_size or len(self._idle) + len(clients) >= size:
+                        break
+                clients.append(self.acquire())
+        finally:
+            for client in clients:
+                self.release(client)
+        with self._condition:
+            return len(self._idle)
+
+    def close(self) -> None:
+        """Close every idle client. Clients that are leased are closed when they are returned."""
+        with self._condition:
+            self._closed = True
+            idle = [client for client, _ in self._idle]
+            self._opened -= len(idle)
+            self._idle = []
+            self._condition.notify_all()
+        self._close_all(idle)
+
+    def stats(self) -> dict:
+        with self._condition:
+            return {"opened": self._opened, "idle": len(self._idle), "max_size": self.max_size}
+
+    def _pop_expired(self) -> List[Any]:
+        if self.idle_timeout is None:
+            return []
+        now = time.monotonic()
+        expired = [client for client, returned in self._idle if now - returned > self.idle_timeout]
+        if expired:
+            self._idle = [(client, returned) for client, returned in self._idle if now - returned <= self.idle_timeout]
+            self._opened -= len(expired)
+        return expired
+
+    def _close_all(self, clients:List[Any]) -> None:
+        if self.close_client is None:
+            return
+        for client in clients:
+            try:
+                self.close_client(client)
+            except Exception:
+                # Closing is best effort, the connection may already be gone
+                pass
+
+_pools:Dict[Hashable, ConnectionPool] = {}
+_pools_lock = Lock()
+
+def get_connection_pool(key:Hashable, create_client:Callable[[], Any], close_client:Optional[Callable[[Any], None]] = None, max_size:int = 4, idle_timeout:Optional[float] = 300) -> ConnectionPool:
+    """Returns the pool registered for `key`, creating it on first use.
+
+    Sinks key their pools by connection parameters, so sink instances pointing at the same database share clients.
+    """
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None or pool._closed:
+            pool = ConnectionPool(create_client=create_client, close_client=close_client, max_size=max_size, idle_timeout=idle_timeout)
+            _pools[key] = pool
+        return pool
+
+def close_connection_pool(key:Hashable) -> None:
+    with _pools_lock:
+        pool = _pools.pop(key, None)
+    if pool is not None:
+        pool.close()
+
+def close_all_pools() -> None:
+    """Close every registered pool. Called automatically when the interpreter exits."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+atexit.register(close_all_pools)
@@ -1,5 +1,6 @@
 from neumai.Shared.NeumSinkInfo import NeumSinkInfo
 from neumai.Shared.NeumVector  import NeumVector
+from neumai.Shared.NeumVectorBatch import NeumVectorBatch
 from neumai.Shared.NeumSearch import NeumSearchResult
 from neumai.Shared.Exceptions import(
     LanceDBInsertionException,
@@ -8,11 +9,13 @@ from neumai.Shared.Exceptions import(
     LanceDBQueryException
 )
 from neumai.SinkConnectors.SinkConnector import SinkConnector
-from typing import List, Optional
+from typing import List, Optional, Union
 from neumai.SinkConnectors.filter_utils import FilterCondition
 from pydantic import Field
 
+import lance
 import lancedb
+import pyarrow as pa
 from lancedb import DBConnection
 
 
@@ -41,8 +44,15 @@ class LanceDBSink(SinkConnector):
         Name of LanceDB table to use
     create_index: bool
         LanceDB offers flat search as well as ANN search. If set to True,
-        a vector index would be created for searching instead of a 
-        brute-force knn search.
+        an IVF_PQ vector index is built once the table holds `index_min_rows`
+        rows and used for searching instead of a brute-force knn search.
+    index_min_rows: int
+        Number of rows from which the index is built. Flat search is fast
+        enough below it, and IVF_PQ needs enough rows to train its partitions.
+    index_rebuild_factor: float
+        The index is rebuilt once the rows added since the last build reach
+        this fraction of the indexed rows. Rows not indexed yet are still
+        searched, but with a flat search.
     metric: str
         The distance metric to use. By default it uses euclidean distance 'L2'. 
         It also supports 'cosine' and 'dot' distance as well. Needs to be set if create_index is True.
@@ -72,6 +82,8 @@ class LanceDBSink(SinkConnector):
     num_partitions: int = Field(default=256, description="The number of partitions of the index")
     num_sub_vectors: int = Field(default=96, description="The number of sub-vectors (M) that will be created during Product Quantization (PQ)")
     accelerator: str = Field(default=None, description="Specify to cuda or mps (on Apple Silicon) to enable GPU training.")
+    index_min_rows: int = Field(default=100000, description="Number of rows from which the index is built")
+    index_rebuild_factor: float = Field(default=0.5, description="Fraction of the indexed rows added since the last build that triggers a rebuild")
 
     # Check API reference for more details
     # - https://lancedb.github.io/lancedb/python/python/#lancedb.connect
@@ -87,102 +99,189 @@ class LanceDBSink(SinkConnector):
     
     @property
     def optional_properties(self) -> List[str]:
-        return []
+        return ['create_index', 'metric', 'num_partitions', 'num_sub_vectors', 'accelerator', 'index_min_rows', 'index_rebuild_factor', 'pool_max_size', 'pool_idle_timeout']
     
     def validation(self) -> bool:
         """config_validation connector setup"""
         db = lancedb.connect(uri=self.uri, api_key=self.api_key, region=self.region)
         return True 
     
-    def _get_db_connection(self) -> DBConnection:
+    def _create_client(self) -> DBConnection:
         return lancedb.connect(uri=self.uri, api_key=self.api_key, region=self.region)
 
-    def store(self, vectors_to_store: List[NeumVector]) -> int:
-        db = self._get_db_connection()
-        table_name = self.table_name
-
-        data = []
-        for vec in vectors_to_store:
-            dic = {
-                'id': vec.id,
-                'vector': vec.vector,
-            }
-            for k,v in vec.metadata.items():
-                dic[k] = v
-            data.append(dic)
-
-        tbl = db.create_table(table_name, data=data, mode="overwrite")
-        if tbl:
-            return len(tbl.to_pandas())
-        raise LanceDBInsertionException("LanceDB storing failed. Try later")
-    
+    def _close_client(self, client:DBConnection) -> None:
+        # Connections to LanceDB don't hold resources that need to be released
+        pass
 
-    def search(self, vector: List[float], number_of_results: int, filters: List[FilterCondition] = []) -> List[NeumSearchResult]:
+    def _open_table(self):
+        with self.lease_client() as db:
+            return db.open_table(self.table_name)
 
-        db = self._get_db_connection()
-        tbl = db.open_table(self.table_name)
+    def store(self, vectors_to_store: Union[List[NeumVector], NeumVectorBatch]) -> int:
+        """Appends the vectors to the table, creating it on the first store.
 
+        Vectors are written as an Arrow table built from the float32 matrix (shared, not copied) and the metadata
+        columns. The schema of the table evolves with the metadata: new fields are added as columns (null for the rows
+        already stored), numeric columns are widened (i.e. int to float) and fields missing from a batch are stored as
+        nulls. Metadata whose type can't be merged with the existing column raises a `LanceDBInsertionException`.
+        """
+        vectors_to_store = NeumVectorBatch.from_vectors(vectors_to_store)
+        if len(vectors_to_store) == 0:
+            return 0
+        data = self._to_arrow(vectors_to_store)
+        try:
+            with self.lease_client() as db:
+                if self.table_name in db.table_names():
+                    tbl = db.open_table(self.table_name)
+                    schema = self._evolve_schema(tbl, data.schema)
+                    tbl.add(self._conform_to_schema(data, schema))
+                else:
+                    tbl = db.create_table(self.table_name, data=data)
+        except LanceDBInsertionException:
+            raise
+        except Exception as e:
+            raise LanceDBInsertionException(f"LanceDB storing failed. Exception - {e}")
         if self.create_index:
-            # For more details, refer to docs
-            # - https://lancedb.github.io/lancedb/python/python/#lancedb.table.Table.create_index
-            try:
-                tbl.create_index(
-                    metric=self.metric, 
-                    num_partitions=self.num_partitions,
-                    num_sub_vectors=self.num_sub_vectors,
-                    accelerator=self.accelerator,
-                    replace=True)
-            except Exception as e:
-                raise LanceDBIndexCreationException(f"LanceDB index creation failed. \nException - {e}")
+            self._maintain_index(tbl)
+        return len(vectors_to_store)
+
+    @staticmethod
+    def _to_arrow(vectors_to_store:NeumVectorBatch) -> pa.Table:
+        vectors = pa.FixedSizeListArray.from_arrays(pa.array(vectors_to_store.vectors.ravel()), vectors_to_store.dimensions)
+        columns = {'id': pa.array(vectors_to_store.ids, type=pa.string()), 'vector': vectors}
+        for field, values in vectors_to_store.metadata_columns().items():
+            if field in columns:
+                continue
+            column = pa.array(values)
+            # Columns of nulls only have no type Lance can store
+            columns[field] = column.cast(pa.string()) if pa.types.is_null(column.type) else column
+        return pa.table(columns)
+
+    @staticmethod
+    def _evolve_schema(tbl, incoming:pa.Schema) -> pa.Schema:
+        """Adds the columns of `incoming` the table lacks and widens the columns whose type changed. Returns the schema
+        of the table afterwards."""
+        schema = tbl.schema
+        try:
+            merged = pa.unify_schemas([schema, incoming], promote_options="permissive")
+        except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+            raise LanceDBInsertionException(f"Metadata doesn't match the schema of LanceDB table {tbl.name}. Exception - {e}")
+        if merged.equals(schema):
+            return schema
+        dataset = tbl.to_lance()
+        new_fields = pa.schema([field for field in merged if field.name not in schema.names])
+        if len(new_fields):
+            @lance.batch_udf()
+            def add_nulls(batch):
+                return pa.RecordBatch.from_arrays([pa.nulls(batch.num_rows, type=field.type) for field in new_fields], schema=new_fields)
+            dataset.add_columns(add_nulls, read_columns=['id'])
+        for field in schema:
+            widened = merged.field(field.name)
+            if widened.type.equals(field.type):
+                continue
+            # Lance can't change the type of a column in place: the widened values are written to a new column
+            # which then replaces the old one
+            temporary_name = f"{field.name}__widened"
+            @lance.batch_udf()
+            def widen(batch, name=field.name, widened=widened, temporary_name=temporary_name):
+                return pa.RecordBatch.from_arrays([batch.column(name).cast(widened.type)], names=[temporary_name])
+            dataset.add_columns(widen, read_columns=[field.name])
+            dataset.drop_columns([field.name])
+            dataset.alter_columns({"path": temporary_name, "name": field.name})
+        return tbl.schema
+
+    @staticmethod
+    def _conform_to_schema(data:pa.Table, schema:pa.Schema) -> pa.Table:
+        columns = [
+            data.column(field.name).cast(field.type) if field.name in data.column_names else pa.nulls(data.num_rows, type=field.type)
+            for field in schema
+        ]
+        return pa.Table.from_arrays(columns, schema=schema)
+
+    def _maintain_index(self, tbl) -> None:
+        """Builds the IVF_PQ index once the table reaches `index_min_rows`, and rebuilds it once enough rows were added
+        since the last build. Rows added in between are searched with a flat search until then."""
+        dataset = tbl.to_lance()
+        indices = [index for index in dataset.list_indices() if "vector" in index["fields"]]
+        if indices:
+            stats = dataset.stats.index_stats(indices[0]["name"])
+            rebuild = stats["num_unindexed_rows"] >= stats["num_indexed_rows"] * self.index_rebuild_factor
+        else:
+            rebuild = dataset.count_rows() >= self.index_min_rows
+        if not rebuild:
+            return
+        # For more details, refer to docs
+        # - https://lancedb.github.io/lancedb/python/python/#lancedb.table.Table.create_index
+        try:
+            tbl.create_index(
+                metric=self.metric, 
+                num_partitions=self.num_partitions,
+                num_sub_vectors=self.num_sub_vectors,
+                accelerator=self.accelerator,
+                replace=True)
+        except Exception as e:
+            raise LanceDBIndexCreationException(f"LanceDB index creation failed. \nException - {e}")
+
+    def search(self, vector: List[float], number_of_results: int, filters: List[FilterCondition] = []) -> List[NeumSearchResult]:
+
+        tbl = self._open_table()
 
         try:
             search_results = tbl.search(query=vector)
             for filter in filters:
                 search_results = search_results.where(f"{filter.field} {filter.operator.value} {filter.value}")
-            search_results = search_results.limit(number_of_results).to_pandas()
+            search_results = search_results.limit(number_of_results).to_arrow()
 
         except Exception as e:
             raise LanceDBQueryException(f"Failed to query LanceDB. Exception - {e}")
 
+        # Read the results column wise instead of building a dataframe
+        columns = {name: search_results.column(name).to_pylist() for name in search_results.column_names}
+        metadata_fields = [name for name in columns if name not in ['id', 'vector', '_distance']]
         matches = []
-        cols = search_results.columns
-
-        for i in range(len(search_results)):
-            _id = search_results.iloc[i]['id']
-            _vec = list(search_results.iloc[i]['vector'])
+        for i in range(search_results.num_rows):
             matches.append(
                 NeumSearchResult(
-                    id=_id,
-                    vector=_vec,
-                    metadata={k:search_results.iloc[i][k] for k in cols if k not in ['id', 'vector', '_distance']},
-                    score=1-search_results.iloc[i]['_distance']
+                    id=columns['id'][i],
+                    vector=columns['vector'][i],
+                    metadata={k:columns[k][i] for k in metadata_fields},
+                    score=1-columns['_distance'][i]
                 )
             )
         return matches
     
 
     def get_representative_vector(self) -> list:
-        db = self._get_db_connection()
-        tbl = db.open_table(self.table_name)
-        return list(tbl.to_pandas()['vector'].mean())
+        tbl = self._open_table()
+        vectors = tbl.to_lance().to_table(columns=['vector']).column('vector').combine_chunks()
+        matrix = vectors.flatten().to_numpy().reshape(len(vectors), -1)
+        return matrix.mean(axis=0).tolist()
     
     
     def info(self) -> NeumSinkInfo:
         try:
-            db = self._get_db_connection()
-            tbl = db.open_table(self.table_name)
+            tbl = self._open_table()
             return(NeumSinkInfo(number_vectors_stored=len(tbl)))
         except Exception as e:
             raise LanceDBIndexInfoException(f"Failed to get information from LanceDB. Exception - {e}")
         
 
     def delete_vectors_with_file_id(self, file_id: str) -> bool:
-        db = self._get_db_connection()
-        table_name = self.table_name
-
-        tbl = db.open_table(table_name)
+        tbl = self._open_table()
+        if '_file_entry_id' not in tbl.schema.names:
+            # No vector was stored with a file id
+            return True
         try:
-            tbl.delete(where=f"id = '{file_id}'")
+            tbl.delete(where=f"_file_entry_id = '{file_id}'")
         except:
             raise Exception("LanceDB deletion by file id failed.")
+        return True
+
+    def delete_vectors(self, ids: List[str]) -> bool:
+        tbl = self._open_table()
+        quoted_ids = ", ".join("'" + id.replace("'", "''") + "'" for id in ids)
+        try:
+            tbl.delete(where=f"id IN ({quoted_ids})")
+        except:
+            raise Exception("LanceDB deletion by id failed.")
         return True
\ No newline at end of file
@@ -1,5 +1,6 @@
 from neumai.Shared.NeumSinkInfo import NeumSinkInfo
 from neumai.Shared.NeumVector  import NeumVector
+from neumai.Shared.NeumVectorBatch import NeumVectorBatch
 from neumai.Shared.NeumSearch import NeumSearchResult
 from neumai.Shared.Exceptions import(
     MarqoInsertionException,
@@ -51,7 +52,13 @@ class MarqoSink(SinkConnector):
 
     @property
     def optional_properties(self) -> List[str]:
-        return []
+        return ['pool_max_size', 'pool_idle_timeout']
+
+    def _create_client(self) -> marqo.Client:
+        return marqo.Client(
+            url=self.url, 
+            api_key=self.api_key,
+        )
 
     def validation(self) -> bool:
         """config_validation connector setup"""
@@ -101,19 +108,17 @@ class MarqoSink(SinkConnector):
         )
 
 
-    def store(self, vectors_to_store:List[NeumVector]) -> int:
-        url = self.url
-        api_key = self.api_key
+    def store(self, vectors_to_store:Union[List[NeumVector], NeumVectorBatch]) -> int:
         index_name = self.index_name
 
-        marqo_client = marqo.Client(
-            url=url, 
-            api_key=api_key,
-        )
+        with self.lease_client() as marqo_client:
+            return self._store(marqo_client=marqo_client, index_name=index_name, vectors_to_store=NeumVectorBatch.from_vectors(vectors_to_store))
+
+    def _store(self, marqo_client:marqo.Client, index_name:str, vectors_to_store:NeumVectorBatch) -> int:
         self._create_index(index_name=index_name,
                           marqo_client=marqo_client,
                           similarity="cosinesimil",
-                          embedding_dim=len(vectors_to_store[0].vector))
+                          embedding_dim=vectors_to_store.dimensions)
         mod_vecs = []
         for vec in vectors_to_store:
             _id = vec.id
@@ -193,23 +198,18 @@ class MarqoSink(SinkConnector):
     
 
     def search(self, vector: List[float], number_of_results: int, filters: List[FilterCondition] = []) -> List:
-        url = self.url
-        api_key = self.api_key
         index_name = self.index_name
         filter_string = self._get_filter_string_from_filter_condition(filter_conditions=filters)
         
         try:
-            marqo_client = marqo.Client(
-                url=url, 
-                api_key=api_key,
-            )
-            search_result = marqo_client.index(index_name).search(
-                context={
-                    'tensor':[{'vector': vector, 'weight' : 1}]
-                },
-                limit=number_of_results,
-                filter_string=filter_string if filter_string else None
-            )
+            with self.lease_client() as marqo_client:
+                search_result = marqo_client.index(index_name).search(
+                    context={
+                        'tensor':[{'vector': vector, 'weight' : 1}]
+                    },
+                    limit=number_of_results,
+                    filter_string=filter_string if filter_string else None
+                )
         except Exception as e:
             raise MarqoQueryException(f"Failed to query Marqo. Exception - {e}")
         
@@ -226,17 +226,14 @@ class MarqoSink(SinkConnector):
 
     
     def _get_embeddings_from_ids(self, ids):
-        marqo_client = marqo.Client(
-            url=self.url, 
-            api_key=self.api_key,
-        )
         embeddings = []
-        for i in ids:
-            doc = marqo_client.index(self.index_name).get_document(
-                document_id=i,
-                expose_facets=True)
-            tensor = doc['_tensor_facets'][0]['_embedding']
-            embeddings.append(tensor)
+        with self.lease_client() as marqo_client:
+            for i in ids:
+                doc = marqo_client.index(self.index_name).get_document(
+                    document_id=i,
+                    expose_facets=True)
+                tensor = doc['_tensor_facets'][0]['_embedding']
+                embeddings.append(tensor)
         return embeddings
     
     def get_representative_vector(self) -> list:
@@ -250,18 +247,14 @@ class MarqoSink(SinkConnector):
         """
         import numpy as np
 
-        marqo_client = marqo.Client(
-            url=self.url, 
-            api_key=self.api_key,
-        )
+        with self.lease_client() as marqo_client:
+            # In Neum, we have one vector per document for marqo, so max number of vectors
+            # would be same as number of documents
+            max_results = marqo_client.index(self.index_name).get_stats()['numberOfDocuments']
 
-        # In Neum, we have one vector per document for marqo, so max number of vectors
-        # would be same as number of documents
-        max_results = marqo_client.index(self.index_name).get_stats()['numberOfDocuments']
-
-        vector_dimension = marqo_client.index(
-            self.index_name
-            ).get_settings()['index_defaults']['model_properties']['dimensions']
+            vector_dimension = marqo_client.index(
+                self.index_name
+                ).get_settings()['index_defaults']['model_properties']['dimensions']
         
         dummy_vector = [1.0 for _ in range(vector_dimension)]
         ids = [i.id for i in self.search(
@@ -272,23 +265,23 @@ class MarqoSink(SinkConnector):
 
     
     def info(self) -> NeumSinkInfo:
-        url = self.url
-        api_key = self.api_key
         index_name = self.index_name
 
         try:
-            marqo_client = marqo.Client(
-                url=url, 
-                api_key=api_key,
-            )
-            index_stats = marqo_client.index(index_name).get_stats()
+            with self.lease_client() as marqo_client:
+                index_stats = marqo_client.index(index_name).get_stats()
             return(NeumSinkInfo(number_vectors_stored=index_stats['numberOfVectors']))
         except Exception as e:
             raise MarqoIndexInfoException(f"Failed to get information from Marqo. Exception - {e}")
     
     def delete_vectors_with_file_id(self, file_id: str) -> bool:
-        marqo_client = marqo.Client(url=self.url, api_key=self.api_key)
-        deletion_info = marqo_client.index(self.index_name).delete_documents(ids=[file_id])
+        with self.lease_client() as marqo_client:
+            deletion_info = marqo_client.index(self.index_name).delete_documents(ids=[file_id])
         if not deletion_info:
             raise Exception("Marqo doesn't have support to delete vectors by metadata")
+        return True
+
+    def delete_vectors(self, ids: List[str]) -> bool:
+        with self.lease_client() as marqo_client:
+            marqo_client.index(self.index_name).delete_documents(ids=ids)
         return True
\ No newline at end of file
@@ -0,0 +1,228 @@
+from neumai.Shared.NeumSinkInfo import NeumSinkInfo
+from neumai.Shared.NeumVector import NeumVector
+from neumai.Shared.NeumVectorBatch import NeumVectorBatch
+from neumai.Shared.NeumSearch import NeumSearchResult
+from neumai.Shared.Exceptions import MultiSinkWriteException
+from neumai.SinkConnectors.SinkConnector import SinkConnector
+from neumai.SinkConnectors.filter_utils import FilterCondition
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+from pydantic import Field, PrivateAttr, validator
+from queue import Queue
+from threading import Lock, Thread
+import random
+import time
+
+_WRITER_DONE = object()
+
+def _with_retries(operation:Callable[[], Any], max_retries:int, retry_backoff:float) -> Any:
+    for attempt in range(max_retries + 1):
+        try:
+            return operation()
+        except Exception:
+            if attempt == max_retries:
+                raise
+            time.sleep(random.uniform(0, retry_backoff * 2 ** attempt))
+
+class _SinkWriter:
+    """Applies the writes (stores and deletes) of one sink in order, from its own thread.
+
+    Writes are queued in a bounded queue, so a sink falling behind holds at most `max_pending` writes before callers
+    wait for it. Writes failing after their retries are recorded and reported by `MultiSink.flush`.
+    """
+
+    def __init__(self, index:int, sink:SinkConnector, max_pending:int, max_retries:int, retry_backoff:float) -> None:
+        self.index = index
+        self.sink = sink
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.queue:Queue = Queue(maxsize=max_pending)
+        # (description of the write, exception, number of vectors not stored)
+        self.failures:List[Tuple[str, Exception, int]] = []
+        self.thread = Thread(target=self._run, name=f"neumai-multisink-{index}-{sink.sink_name}", daemon=True)
+        self.thread.start()
+
+    def submit(self, description:str, operation:Callable[[], Any], vectors:int = 0) -> None:
+        self.queue.put((description, operation, vectors))
+
+    def _run(self) -> None:
+        while True:
+            item = self.queue.get()
+            try:
+                if item is _WRITER_DONE:
+                    return
+                description, operation, vectors = item
+                try:
+                    _with_retries(operation, self.max_retries, self.retry_backoff)
+                except Exception as e:
+                    self.failures.append((description, e, vectors))
+            finally:
+                self.queue.task_done()
+
+    def stop(self) -> None:
+        self.queue.put(_WRITER_DONE)
+        self.thread.join()
+
+class MultiSink(SinkConnector):
+    """
+    Multi Sink
+
+    Writes the vectors of a pipeline to several sinks, so data is embedded once and mirrored into every vector store
+    (i.e. Pinecone for serving and LanceDB for offline analysis).
+
+    The primary sink is written to by `store` itself and serves `search` and `info`. Every other sink is written to
+    from its own thread, through a bounded queue of pending writes: a slow or failing sink retries on its own without
+    holding up the others, until its queue is full. `flush` (called by pipelines at the end of a run) waits until every
+    queue is drained and raises a MultiSinkWriteException if writes to a sink failed after their retries. Since `store`
+    returns before the secondary sinks applied the vectors, a `VectorSpool` only acknowledges them once `flush` succeeds.
+
+    Attributes:
+    -----------
+    sinks : List[SinkConnector]
+        Sinks to write to.
+
+    primary : Optional[int]
+        Index in `sinks` of the sink serving searches. Default is 0.
+
+    max_pending_writes : Optional[int]
+        Number of writes queued for a secondary sink before `store` waits for it. Default is 8.
+
+    max_retries : Optional[int]
+        Number of times a failed write is retried, per sink. Default is 3.
+
+    retry_backoff : Optional[float]
+        Base delay between retries in seconds, doubled on every attempt and jittered. Default is 1.
+    """
+
+    sinks: List[SinkConnector] = Field(..., description="Sinks to write to.")
+
+    primary: Optional[int] = Field(0, description="Index of the sink serving searches.")
+
+    max_pending_writes: Optional[int] = Field(8, description="Writes queued per secondary sink.")
+
+    max_retries: Optional[int] = Field(3, description="Retries of a failed write, per sink.")
+
+    retry_backoff: Optional[float] = Field(1.0, description="Base delay in seconds between retries.")
+
+    _writers: Optional[List[_SinkWriter]] = PrivateAttr(default=None)
+
+    _writers_lock: Lock = PrivateAttr(default_factory=Lock)
+
+    @validator("sinks", pre=True, each_item=True)
+    def deserialize_sinks(cls, value):
+        if isinstance(value, dict):
+            from neumai.ModelFactories.SinkConnectorFactory import SinkConnectorFactory
+            return SinkConnectorFactory.get_sink(value.get("sink_name"), value.get("sink_information"))
+        return value
+
+    @validator("primary", always=True)
+    def validate_primary(cls, value, values):
+        sinks = values.get("sinks") or []
+        if not 0 <= value < len(sinks):
+            raise ValueError(f"primary must be the index of one of the {len(sinks)} sinks")
+        return value
+
+    @property
+    def sink_name(self) -> str:
+        return 'MultiSink'
+
+    @property
+    def required_properties(self) -> List[str]:
+        return ['sinks']
+
+    @property
+    def optional_properties(self) -> List[str]:
+        return ['primary', 'max_pending_writes', 'max_retries', 'retry_backoff']
+
+    @property
+    def primary_sink(self) -> SinkConnector:
+        return self.sinks[self.primary]
+
+    def _secondary_writers(self) -> List[_SinkWriter]:
+        if self._writers is None:
+            with self._writers_lock:
+                if self._writers is None:
+                    self._writers = [
+                        _SinkWriter(index=i, sink=sink, max_pending=self.max_pending_writes, max_retries=self.max_retries, retry_backoff=self.retry_backoff)
+                        for i, sink in enumerate(self.sinks) if i != self.primary
+                    ]
+        return self._writers
+
+    def _write(self, description:str, write:Callable[[SinkConnector], Any], vectors:int = 0) -> Any:
+        """Queues the write for every secondary sink, then applies it to the primary one"""
+        for writer in self._secondary_writers():
+            writer.submit(description, lambda sink=writer.sink: write(sink), vectors)
+        return _with_retries(lambda: write(self.primary_sink), self.max_retries, self.retry_backoff)
+
+    def validation(self) -> bool:
+        """config_validation connector setup"""
+        return all(sink.validation() for sink in self.sinks)
+
+    def store(self, vectors_to_store:Union[List[NeumVector], NeumVectorBatch]) -> int:
+        """Stores the vectors in every sink. Returns the number stored by the primary sink, once it stored them."""
+        vectors_to_store = NeumVectorBatch.from_vectors(vectors_to_store)
+        return self._write(f"store of {len(vectors_to_store)} vectors", lambda sink: sink.store(vectors_to_store=vectors_to_store), vectors=len(vectors_to_store))
+
+    def delete_vectors_with_file_id(self, file_id:str) -> bool:
+        # Deletes go through the same queues as stores, so every sink applies them in the same order
+        return self._write(f"delete of file {file_id}", lambda sink: sink.delete_vectors_with_file_id(file_id=file_id))
+
+    def delete_vectors(self, ids:List[str]) -> bool:
+        return self._write(f"delete of {len(ids)} vectors", lambda sink: sink.delete_vectors(ids=ids))
+
+    @property
+    def supports_delete_vectors(self) -> bool:
+        return all(sink.supports_delete_vectors for sink in self.sinks)
+
+    def flush(self) -> None:
+        """Waits until every sink applied the writes queued for it, then flushes the sinks.
+
+        Failed writes are reported by the index of their sink in `sinks`, since several sinks may be of the same type.
+        """
+        failures:Dict[int, List[Tuple[str, Exception, int]]] = {}
+        for writer in self._writers or []:
+            writer.queue.join()
+            if writer.failures:
+                failures[writer.index] = writer.failures
+                writer.failures = []
+        for i, sink in enumerate(self.sinks):
+            if i not in failures:
+                sink.flush()
+        if failures:
+            summary = "; ".join(
+                f"sink {i} ({self.sinks[i].sink_name}): {len(sink_failures)} writes ({sum(vectors for _, _, vectors in sink_failures)} vectors), last exception - {sink_failures[-1][1]}"
+                for i, sink_failures in failures.items()
+            )
+            raise MultiSinkWriteException(f"Writes to some sinks failed. {summary}", failures=failures)
+
+    def search(self, vector:List[float], number_of_results:int, filters:List[FilterCondition]=[]) -> List[NeumSearchResult]:
+        return self.primary_sink.search(vector=vector, number_of_results=number_of_results, filters=filters)
+
+    async def asearch(self, vector:List[float], number_of_results:int, filters:List[FilterCondition]=[]) -> List[NeumSearchResult]:
+        return await self.primary_sink.asearch(vector=vector, number_of_results=number_of_results, filters=filters)
+
+    def info(self) -> NeumSinkInfo:
+        return self.primary_sink.info()
+
+    def warm_up(self, size:int = 1) -> int:
+        return min(sink.warm_up(size=size) for sink in self.sinks)
+
+    def close(self) -> None:
+        """Waits for the queued writes, stops the writer threads and closes the sinks"""
+        with self._writers_lock:
+            writers, self._writers = self._writers or [], None
+        for writer in writers:
+            writer.stop()
+        for sink in self.sinks:
+            sink.close()
+
+    def as_json(self):
+        json_to_return = {}
+        json_to_return['sink_name'] = self.sink_name
+        json_to_return['sink_information'] = {
+            'sinks': [sink.as_json() for sink in self.sinks],
+            'primary': self.primary,
+            'max_pending_writes': self.max_pending_writes,
+            'max_retries': self.max_retries,
+            'retry_backoff': self.retry_backoff,
+        }
+        return json_to_return
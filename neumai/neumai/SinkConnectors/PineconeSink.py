@@ -1,17 +1,27 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple, Union
 from neumai.Shared.NeumSearch import NeumSearchResult
 from neumai.Shared.NeumSinkInfo import NeumSinkInfo
 from neumai.SinkConnectors.SinkConnector import SinkConnector
 from neumai.Shared.NeumVector  import NeumVector
+from neumai.Shared.NeumVectorBatch import NeumVectorBatch
 from neumai.Shared.Exceptions import (
     PineconeConnectionException,
     PineconeInsertionException,
+    PineconePartialInsertionException,
     PineconeIndexInfoException,
     PineconeQueryException,
 )
 from neumai.SinkConnectors.filter_utils import FilterCondition, FilterOperator
 from pydantic import Field
+from pinecone.core.client.exceptions import ApiException
+import json
 import pinecone
+import random
+import time
+import urllib3
+
+# Bytes of an upserted vector besides its values, metadata and id (JSON keys and punctuation)
+_VECTOR_OVERHEAD_BYTES = 64
 
 class  PineconeSink(SinkConnector):
     """
@@ -32,6 +42,22 @@ class  PineconeSink(SinkConnector):
 
     namespace : str
         Namespace within the Pinecone environment. Used for organizing data.
+
+    batch_size : Optional[int]
+        Maximum number of vectors per upsert request. Batches are also capped by max_request_bytes. Default is 100.
+
+    max_request_bytes : Optional[int]
+        Maximum estimated size of an upsert request, in bytes. Pinecone rejects requests over 2MB. Batches rejected for
+        their size are split in half and retried.
+
+    pool_threads : Optional[int]
+        Number of upsert requests sent concurrently by a client. Default is 4.
+
+    max_retries : Optional[int]
+        Number of times a batch is retried after a transient error (rate limiting, server or connection errors). Default is 3.
+
+    retry_backoff : Optional[float]
+        Base delay between retries in seconds. The delay doubles on every attempt and is jittered. Default is 0.5.
     """
 
     api_key: str = Field(..., description="API key for Pinecone.")
@@ -42,6 +68,16 @@ class  PineconeSink(SinkConnector):
 
     namespace: str = Field(..., description="Data namespace.")
 
+    batch_size: Optional[int] = Field(100, description="Maximum number of vectors per upsert request.")
+
+    max_request_bytes: Optional[int] = Field(2 * 1000 * 1000, description="Maximum estimated size of an upsert request in bytes.")
+
+    pool_threads: Optional[int] = Field(4, description="Number of concurrent upsert requests.")
+
+    max_retries: Optional[int] = Field(3, description="Retries of a batch failing with a transient error.")
+
+    retry_backoff: Optional[float] = Field(0.5, description="Base delay in seconds between retries, doubled on every attempt.")
+
     @property
     def sink_name(self) -> str:
         return 'PineconeSink'
@@ -52,7 +88,11 @@ class  PineconeSink(SinkConnector):
 
     @property
     def optional_properties(self) -> List[str]:
-        return []
+        return ['batch_size', 'max_request_bytes', 'pool_threads', 'max_retries', 'retry_backoff', 'pool_max_size', 'pool_idle_timeout']
+
+    def _create_client(self) -> pinecone.Index:
+        pinecone.init(api_key=self.api_key, environment=self.environment)
+        return pinecone.Index(index_name=self.index, pool_threads=self.pool_threads)
 
     def validation(self) -> bool:
         """config_validation connector setup"""
@@ -66,43 +106,112 @@ class  PineconeSink(SinkConnector):
         return True 
 
     def delete_vectors_with_file_id(self, file_id: str) -> bool:
-        api_key =  self.api_key
         environment = self.environment
-        index = self.index
         namespace = self.namespace
         if environment == "gcp-starter":
             raise Exception("Pinecone does not support deleting vectors by metadata in the gcp starter environment")
-        pinecone.init(      
-            api_key=api_key,      
-            environment=environment)    
-        index = pinecone.Index(index)
-        index.delete(filter={"_file_entry_id": {"$eq": file_id}}, namespace=namespace)
+        with self.lease_client() as index:
+            index.delete(filter={"_file_entry_id": {"$eq": file_id}}, namespace=namespace)
+        return True
+
+    def delete_vectors(self, ids: List[str]) -> bool:
+        namespace = self.namespace
+        if self.environment == "gcp-starter": namespace = None # short-term fix given gcp-starter limitation
+        with self.lease_client() as index:
+            # Pinecone deletes at most 1000 ids per request
+            for i in range(0, len(ids), 1000):
+                index.delete(ids=ids[i:i + 1000], namespace=namespace)
         return True
 
-    def store(self, vectors_to_store:List[NeumVector]) -> int:
-        api_key =  self.api_key
+    def store(self, vectors_to_store:Union[List[NeumVector], NeumVectorBatch]) -> int:
+        """Upserts vectors in batches sent concurrently. Batches are retried on transient errors.
+
+        If some batches still fail, the others are stored and a PineconePartialInsertionException listing the ids of the
+        vectors that were not stored is raised.
+        """
         environment = self.environment
-        index = self.index
         namespace = self.namespace
         if environment == "gcp-starter": namespace = None # short-term fix given gcp-starter limitation
 
+        vectors_to_store = NeumVectorBatch.from_vectors(vectors_to_store)
+        if len(vectors_to_store) == 0:
+            return 0
         try:
-            pinecone.init(api_key=api_key, environment=environment)    
-            index = pinecone.Index(index_name=index)
-            batch_size = 32 # how does changing this affect ?
-            vectors_stored = 0
-            for i in range(0, len(vectors_to_store), batch_size):
-                # set end position of batch
-                i_end = min(i + batch_size, len(vectors_to_store))
-                # get batch of texts and ids
-                vector_batch = vectors_to_store[i:i_end]
-                to_upsert = [(vector.id, vector.vector, vector.metadata) for vector in vector_batch]
-                result = index.upsert(vectors=to_upsert, namespace=namespace)
-                vectors_stored += result['upserted_count'] 
+            vectors = vectors_to_store.vectors.tolist()
+            batches = self._plan_batches(ids=vectors_to_store.ids, vectors=vectors, metadata=vectors_to_store.metadata)
+            with self.lease_client() as index:
+                vectors_stored, failures = self._upsert_batches(index=index, batches=batches, ids=vectors_to_store.ids, vectors=vectors, metadata=vectors_to_store.metadata, namespace=namespace)
         except Exception as e:
             raise PineconeInsertionException(f"Failed to store in Pinecone. Exception - {e}")
-        return int(vectors_stored)
+        if failures:
+            failed_ids = [id for start, end, _ in failures for id in vectors_to_store.ids[start:end]]
+            raise PineconePartialInsertionException(
+                f"Failed to store {len(failed_ids)} of {len(vectors_to_store)} vectors in Pinecone. Exception - {failures[-1][2]}",
+                vectors_stored=vectors_stored,
+                failed_ids=failed_ids,
+            )
+        return vectors_stored
+
+    def _plan_batches(self, ids:List[str], vectors:List[List[float]], metadata:List[dict]) -> List[Tuple[int, int]]:
+        """Splits vectors into (start, end) batches of up to `batch_size` vectors and `max_request_bytes` of JSON"""
+        # Values of embeddings serialize to about the same length, measure them once
+        value_bytes = len(json.dumps(vectors[0])) * 1.05
+        batches = []
+        start = 0
+        request_bytes = 0
+        for i in range(len(ids)):
+            vector_bytes = value_bytes + len(ids[i]) + len(json.dumps(metadata[i], default=str)) + _VECTOR_OVERHEAD_BYTES
+            if i > start and (i - start >= self.batch_size or request_bytes + vector_bytes > self.max_request_bytes):
+                batches.append((start, i))
+                start = i
+                request_bytes = 0
+            request_bytes += vector_bytes
+        batches.append((start, len(ids)))
+        return batches
+
+    def _upsert_batches(self, index:pinecone.Index, batches:List[Tuple[int, int]], ids:List[str], vectors:List[List[float]], metadata:List[dict], namespace:Optional[str]) -> Tuple[int, List[Tuple[int, int, Exception]]]:
+        """Sends every batch as an async request on the client's threads. Returns the number of vectors stored and the failed batches."""
+        vectors_stored = 0
+        failures = []
+        pending = [(start, end, 0) for start, end in batches]
+        while pending:
+            requests = [
+                (start, end, attempt, index.upsert(vectors=list(zip(ids[start:end], vectors[start:end], metadata[start:end])), namespace=namespace, async_req=True))
+                for start, end, attempt in pending
+            ]
+            pending = []
+            retry_attempt = 0
+            for start, end, attempt, request in requests:
+                try:
+                    vectors_stored += request.get().upserted_count
+                except Exception as e:
+                    if self._is_too_large(e) and end - start > 1:
+                        # The size estimate was off, split the batch
+                        middle = (start + end) // 2
+                        pending += [(start, middle, attempt), (middle, end, attempt)]
+                    elif self._is_transient(e) and attempt < self.max_retries:
+                        pending.append((start, end, attempt + 1))
+                        retry_attempt = max(retry_attempt, attempt + 1)
+                    else:
+                        failures.append((start, end, e))
+            if retry_attempt:
+                time.sleep(random.uniform(0, self.retry_backoff * 2 ** (retry_attempt - 1)))
+        return vectors_stored, failures
+
+    @staticmethod
+    def _is_transient(error:Exception) -> bool:
+        if isinstance(error, ApiException):
+            return error.status == 429 or error.status >= 500
+        return isinstance(error, (urllib3.exceptions.HTTPError, pinecone.core.exceptions.PineconeProtocolError, ConnectionError, TimeoutError))
+
+    @staticmethod
+    def _is_too_large(error:Exception) -> bool:
+        if not isinstance(error, ApiException):
+            return False
+        body = str(error.body or "").lower()
+        return error.status == 413 or (error.status == 400 and ("exceeds the maximum" in body or "too large" in body))
     
+    @staticmethod
     def translate_to_pinecone(filter_conditions:List[FilterCondition]):
         query_parts = []
 
@@ -126,27 +235,21 @@ class  PineconeSink(SinkConnector):
         return {"$and": query_parts}  # Combine using $and
 
     def search(self, vector: List[float], number_of_results:int, filters:List[FilterCondition] = []) -> List[NeumSearchResult]:
-        import pinecone
-        api_key =  self.api_key
         environment = self.environment
-        index = self.index
         namespace = self.namespace
         if environment == "gcp-starter": namespace = None # short-term fix given gcp-starter limitation
         
         filters_pinecone =  self.translate_to_pinecone(filters)
 
         try:
-            pinecone.init(      
-                api_key=api_key,      
-                environment=environment)    
-            index = pinecone.Index(index)
-            results = index.query(
-                vector=vector, 
-                filter=filters_pinecone,
-                top_k=number_of_results, 
-                namespace=namespace, 
-                include_values=False, 
-                include_metadata=True)["matches"]
+            with self.lease_client() as index:
+                results = index.query(
+                    vector=vector, 
+                    filter=filters_pinecone,
+                    top_k=number_of_results, 
+                    namespace=namespace, 
+                    include_values=False, 
+                    include_metadata=True)["matches"]
         except Exception as e:
             raise PineconeQueryException(f"Failed to query pinecone. Exception - {e}")
         
@@ -156,20 +259,15 @@ class  PineconeSink(SinkConnector):
         return matches
     
     def info(self) -> NeumSinkInfo:
-        import pinecone
-        api_key =  self.api_key
         environment = self.environment
-        index = self.index
         namespace = self.namespace
         if environment == "gcp-starter": namespace = None # short-term fix given gcp-starter limitation
         
         try:
-            pinecone.init(      
-                api_key=api_key,      
-                environment=environment)    
-            index = pinecone.Index(index)
-            namespaces = index.describe_index_stats()["namespace"]
+            with self.lease_client() as index:
+                namespaces = index.describe_index_stats()["namespaces"]
             if namespace in namespaces:
                 return NeumSinkInfo(number_vectors_stored=namespaces[namespace]["vector_count"])
+            return NeumSinkInfo(number_vectors_stored=0)
         except Exception as e:
             raise PineconeIndexInfoException(f"Failed to get info for pinecone. Exception - {e}")
\ No newline at end of file
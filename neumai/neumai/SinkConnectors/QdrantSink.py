@@ -1,5 +1,6 @@
 from neumai.Shared.NeumSinkInfo import NeumSinkInfo
 from neumai.Shared.NeumVector  import NeumVector
+from neumai.Shared.NeumVectorBatch import NeumVectorBatch
 from neumai.Shared.NeumSearch import NeumSearchResult
 from neumai.Shared.Exceptions import(
     QdrantInsertionException,
@@ -7,14 +8,20 @@ from neumai.Shared.Exceptions import(
     QdrantQueryException
 )
 from neumai.SinkConnectors.SinkConnector import SinkConnector
-from typing import List, Optional
+from typing import List, Optional, Union
 from neumai.SinkConnectors.filter_utils import FilterCondition, FilterOperator
-from qdrant_client.http.models import Distance, VectorParams
-from qdrant_client.http.models import PointStruct
-from qdrant_client.http.models import UpdateStatus
-from qdrant_client import QdrantClient
-from qdrant_client.http.models import Filter
-from pydantic import Field
+from neumai.Shared.async_utils import LoopClients
+from qdrant_client.http.models import Batch, Distance, VectorParams
+from qdrant_client import QdrantClient, AsyncQdrantClient
+from qdrant_client.http.models import Filter, FilterSelector, FieldCondition, MatchValue, PointIdsList
+from pydantic import Field, PrivateAttr
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+import random
+import time
+
+# Payload key no point has, targeted by the filter based no-op `flush` uses as a barrier
+_BARRIER_KEY = "_neum_barrier"
 
 class QdrantSink(SinkConnector):
     """
@@ -31,7 +38,27 @@ class QdrantSink(SinkConnector):
         API key required for authenticating with the Qdrant service.
 
     collection_name : str
-        Name of the collection in Qdrant where the data will be stored.
+        Name of the collection in Qdrant where the data will be stored. It is created on the first store if it doesn't exist.
+
+    prefer_grpc : Optional[bool]
+        Use the gRPC interface of Qdrant instead of REST. Vectors are sent as binary floats instead of JSON.
+
+    grpc_port : Optional[int]
+        Port of the gRPC interface. Default is 6334.
+
+    upload_batch_size : Optional[int]
+        Number of points per upload request. Default is 256.
+
+    upload_parallel : Optional[int]
+        Number of batches of a store call uploaded concurrently. Default is 1, worth raising for stores of thousands of
+        vectors.
+
+    max_retries : Optional[int]
+        Number of times a failed upload request is retried. Default is 3.
+
+    wait : Optional[bool]
+        Wait for every upload to be applied before returning. By default uploads return once Qdrant received them, and
+        `flush` waits until all of them are applied.
     """
 
     url: str = Field(..., description="URL for Qdrant.")
@@ -40,6 +67,27 @@ class QdrantSink(SinkConnector):
 
     collection_name: str = Field(..., description="Collection name.")
 
+    prefer_grpc: Optional[bool] = Field(False, description="Use the gRPC interface of Qdrant.")
+
+    grpc_port: Optional[int] = Field(6334, description="Port of the gRPC interface.")
+
+    upload_batch_size: Optional[int] = Field(256, description="Number of points per upload request.")
+
+    upload_parallel: Optional[int] = Field(1, description="Number of batches uploaded concurrently.")
+
+    max_retries: Optional[int] = Field(3, description="Retries of a failed upload request.")
+
+    wait: Optional[bool] = Field(False, description="Wait for every upload to be applied.")
+
+    _collection_ready: bool = PrivateAttr(default=False)
+
+    _collection_lock: Lock = PrivateAttr(default_factory=Lock)
+
+    _unflushed: bool = PrivateAttr(default=False)
+
+    # Async clients are bound to the event loop they were first used on, and closed when it shuts down
+    _async_clients: LoopClients = PrivateAttr(default_factory=LoopClients)
+
     @property
     def sink_name(self) -> str:
         return 'QdrantSink'
@@ -50,43 +98,182 @@ class QdrantSink(SinkConnector):
 
     @property
     def optional_properties(self) -> List[str]:
-        return []
+        return ['prefer_grpc', 'grpc_port', 'upload_batch_size', 'upload_parallel', 'max_retries', 'wait', 'pool_max_size', 'pool_idle_timeout']
+
+    def _create_client(self) -> QdrantClient:
+        return QdrantClient(
+            url=self.url, 
+            api_key=self.api_key,
+            prefer_grpc=self.prefer_grpc,
+            grpc_port=self.grpc_port,
+        )
+
+    def _create_async_client(self) -> AsyncQdrantClient:
+        return AsyncQdrantClient(
+            url=self.url, 
+            api_key=self.api_key,
+            prefer_grpc=self.prefer_grpc,
+            grpc_port=self.grpc_port,
+        )
+
+    @property
+    def async_client(self) -> AsyncQdrantClient:
+        """Async client created on first use within the running event loop and reused by later calls on that loop"""
+        return self._async_clients.get(create=self._create_async_client)
+
+    def close(self) -> None:
+        """Close the pooled clients and the async clients of the sink"""
+        super().close()
+        self._async_clients.close()
+
+    async def aclose(self) -> None:
+        """Async version of close"""
+        super().close()
+        await self._async_clients.aclose()
 
     def validation(self) -> bool:
         """config_validation connector setup"""
-        from qdrant_client import QdrantClient
+        from qdrant_client import QdrantClient, AsyncQdrantClient
         qdrant_client = QdrantClient(
             url=self.url, 
             api_key=self.api_key,
+            prefer_grpc=self.prefer_grpc,
+            grpc_port=self.grpc_port,
         )
         return True 
 
     def delete_vectors_with_file_id(self, file_id: str) -> bool:
-        raise Exception("Qdrant doesn't have support to delete vectors by metadata")
+        with self.lease_client() as qdrant_client:
+            qdrant_client.delete(
+                collection_name=self.collection_name,
+                points_selector=FilterSelector(filter=Filter(must=[FieldCondition(key="_file_entry_id", match=MatchValue(value=file_id))])),
+                wait=True
+            )
+        return True
+
+    def delete_vectors(self, ids: List[str]) -> bool:
+        with self.lease_client() as qdrant_client:
+            qdrant_client.delete(
+                collection_name=self.collection_name,
+                points_selector=PointIdsList(points=ids),
+                wait=True
+            )
+        return True
     
-    def store(self, vectors_to_store:List[NeumVector]) -> int:
-        url = self.url
-        api_key = self.api_key
-        collection_name = self.collection_name
+    def _ensure_collection(self, qdrant_client:QdrantClient, dimensions:int) -> None:
+        """Creates the collection if it doesn't exist yet, keeping the points it already holds"""
+        if self._collection_ready:
+            return
+        with self._collection_lock:
+            if self._collection_ready:
+                return
+            collections = qdrant_client.get_collections().collections
+            if not any(collection.name == self.collection_name for collection in collections):
+                try:
+                    qdrant_client.create_collection(
+                        collection_name=self.collection_name,
+                        vectors_config=VectorParams(size=dimensions, distance=Distance.DOT)
+                    )
+                except Exception:
+                    # Created by another process in the meantime
+                    collections = qdrant_client.get_collections().collections
+                    if not any(collection.name == self.collection_name for collection in collections):
+                        raise
+            self._collection_ready = True
 
-        qdrant_client = QdrantClient(
-            url=url, 
-            api_key=api_key,
-        )
-        qdrant_client.recreate_collection(
-            collection_name=collection_name,
-            vectors_config=VectorParams(size=len(vectors_to_store[0].vector), distance=Distance.DOT)
-        )
-        points = [PointStruct(id=vector.id, vector=vector.vector, payload=vector.metadata) for vector in vectors_to_store]
-        operation_info = qdrant_client.upsert(
-            collection_name=collection_name,
-            wait=True,
-            points=points
-        )
-        if(operation_info.status == UpdateStatus.COMPLETED):
-            return  len(points)
-        raise QdrantInsertionException("Qdrant storing failed. Try again later.")
+    async def _aensure_collection(self, qdrant_client:AsyncQdrantClient, dimensions:int) -> None:
+        if self._collection_ready:
+            return
+        collections = (await qdrant_client.get_collections()).collections
+        if not any(collection.name == self.collection_name for collection in collections):
+            try:
+                await qdrant_client.create_collection(
+                    collection_name=self.collection_name,
+                    vectors_config=VectorParams(size=dimensions, distance=Distance.DOT)
+                )
+            except Exception:
+                # Created by another store in the meantime
+                collections = (await qdrant_client.get_collections()).collections
+                if not any(collection.name == self.collection_name for collection in collections):
+                    raise
+        self._collection_ready = True
+
+    def store(self, vectors_to_store:Union[List[NeumVector], NeumVectorBatch]) -> int:
+        """Uploads the vectors in batches of `upload_batch_size`, `upload_parallel` of them at a time.
+
+        Batches are slices of the vector matrix, converted to lists one batch at a time as they are sent instead of
+        building points for the whole store call.
+        """
+        vectors_to_store = NeumVectorBatch.from_vectors(vectors_to_store)
+        if len(vectors_to_store) == 0:
+            return 0
+        batches = [vectors_to_store[start:start + self.upload_batch_size] for start in range(0, len(vectors_to_store), self.upload_batch_size)]
+        try:
+            with self.lease_client() as qdrant_client:
+                self._ensure_collection(qdrant_client=qdrant_client, dimensions=vectors_to_store.dimensions)
+                self._unflushed = True
+                if self.upload_parallel > 1 and len(batches) > 1:
+                    # Clients are thread safe, batches share the leased one
+                    with ThreadPoolExecutor(max_workers=self.upload_parallel) as executor:
+                        list(executor.map(lambda batch: self._upload_batch(qdrant_client=qdrant_client, batch=batch), batches))
+                else:
+                    for batch in batches:
+                        self._upload_batch(qdrant_client=qdrant_client, batch=batch)
+        except Exception as e:
+            raise QdrantInsertionException(f"Qdrant storing failed. Exception - {e}")
+        return len(vectors_to_store)
+
+    def _upload_batch(self, qdrant_client:QdrantClient, batch:NeumVectorBatch) -> None:
+        # The uploader of qdrant_client (`upload_collection`) sends every batch `max_retries` times, so batches are
+        # upserted here, as columns instead of one point struct per vector.
+        points = Batch(ids=batch.ids, vectors=batch.vector_lists(), payloads=batch.metadata)
+        for attempt in range(self.max_retries + 1):
+            try:
+                qdrant_client.upsert(collection_name=self.collection_name, points=points, wait=self.wait)
+                return
+            except Exception:
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(random.uniform(0, 0.5 * 2 ** attempt))
+
+    async def astore(self, vectors_to_store:Union[List[NeumVector], NeumVectorBatch]) -> int:
+        vectors_to_store = NeumVectorBatch.from_vectors(vectors_to_store)
+        if len(vectors_to_store) == 0:
+            return 0
+        qdrant_client = self.async_client
+        try:
+            await self._aensure_collection(qdrant_client=qdrant_client, dimensions=vectors_to_store.dimensions)
+            self._unflushed = True
+            # The async client uploads collections in blocking calls, batches are upserted one after the other instead
+            for start in range(0, len(vectors_to_store), self.upload_batch_size):
+                batch = vectors_to_store[start:start + self.upload_batch_size]
+                await qdrant_client.upsert(
+                    collection_name=self.collection_name,
+                    points=Batch(ids=batch.ids, vectors=batch.vector_lists(), payloads=batch.metadata),
+                    wait=self.wait,
+                )
+        except Exception as e:
+            raise QdrantInsertionException(f"Qdrant storing failed. Exception - {e}")
+        return len(vectors_to_store)
+
+    def flush(self) -> None:
+        """Waits until the uploads sent without `wait` are applied.
+
+        Qdrant applies the updates of a shard in order, and operations selecting points with a filter are sent to every
+        shard. Removing a payload key no point has, with `wait`, therefore returns once every earlier upload is applied.
+        """
+        if self.wait or not self._unflushed:
+            return
+        with self.lease_client() as qdrant_client:
+            qdrant_client.delete_payload(
+                collection_name=self.collection_name,
+                keys=[_BARRIER_KEY],
+                points=Filter(must=[FieldCondition(key=_BARRIER_KEY, match=MatchValue(value=True))]),
+                wait=True
+            )
+        self._unflushed = False
     
+    @staticmethod
     def filter_conditions_to_qdrant_filter(filters: List[FilterCondition]) -> dict:
         if len(filters) > 1:
             weaviate_filter = {
@@ -109,6 +296,7 @@ class QdrantSink(SinkConnector):
             } 
         return weaviate_filter
     
+    @staticmethod
     def translate_to_qdrant(filter_conditions:List[FilterCondition]):
         qdrant_filter = {"must": []}
 
@@ -134,18 +322,38 @@ class QdrantSink(SinkConnector):
         return qdrant_filter
 
     def search(self, vector: List[float], number_of_results: int, filters:List[FilterCondition]=[]) -> List:
-        url = self.url
-        api_key = self.api_key
         collection_name = self.collection_name
-        filters_qdrant = self.translate_to_qdrant(filter)
+        filters_qdrant = self.translate_to_qdrant(filters)
 
         try:
-            qdrant_client = QdrantClient(
-                url=url, 
-                api_key=api_key,
+            with self.lease_client() as qdrant_client:
+                search_result = qdrant_client.search(
+                    collection_name=collection_name,
+                    query_vector=vector, 
+                    with_payload= True,
+                    limit=number_of_results,
+                    query_filter=Filter(**filters_qdrant)
+                )
+        except Exception as e:
+            raise QdrantQueryException(f"Failed to query Qdrant. Exception - {e}")
+        
+        matches = []
+        for result in search_result:
+            matches.append(
+                NeumSearchResult(
+                    id=result.id,
+                    metadata=result.payload,
+                    score=result.score
+                )
             )
-            search_result = qdrant_client.search(
-                collection_name=collection_name,
+        return matches
+
+    async def asearch(self, vector: List[float], number_of_results: int, filters:List[FilterCondition]=[]) -> List:
+        filters_qdrant = self.translate_to_qdrant(filters)
+
+        try:
+            search_result = await self.async_client.search(
+                collection_name=self.collection_name,
                 query_vector=vector, 
                 with_payload= True,
                 limit=number_of_results,
@@ -166,16 +374,11 @@ class QdrantSink(SinkConnector):
         return matches
     
     def info(self) -> NeumSinkInfo:
-        url = self.url
-        api_key = self.api_key
         collection_name = self.collection_name
 
         try:
-            qdrant_client = QdrantClient(
-                url=url, 
-                api_key=api_key,
-            )
-            collection_info = qdrant_client.get_collection(collection_name=collection_name)
+            with self.lease_client() as qdrant_client:
+                collection_info = qdrant_client.get_collection(collection_name=collection_name)
             return(NeumSinkInfo(number_vectors_stored=collection_info.indexed_vectors_count))
         except Exception as e:
             raise QdrantIndexInfoException(f"Failed to get information from Qdrant. Exception - {e}")
\ No newline at end of file
@@ -1,5 +1,6 @@
 from neumai.Shared.NeumSinkInfo import NeumSinkInfo
 from neumai.Shared.NeumVector  import NeumVector
+from neumai.Shared.NeumVectorBatch import NeumVectorBatch
 from neumai.Shared.NeumSearch import NeumSearchResult
 from neumai.Shared.Exceptions import(
     SinglestoreConnectionException,
@@ -8,9 +9,10 @@ from neumai.Shared.Exceptions import(
     SinglestoreQueryException
 )
 from neumai.SinkConnectors.SinkConnector import SinkConnector
-from typing import List, Optional
+from typing import List, Optional, Union
 from neumai.SinkConnectors.filter_utils import FilterCondition, FilterOperator
 from pydantic import Field
+import json
 import singlestoredb as s2
 
 class SingleStoreSink(SinkConnector):
@@ -30,8 +32,8 @@ class SingleStoreSink(SinkConnector):
     table : str
         The name of the table within SingleStore where data needs to be stored. This table needs to be pre-created.
 
-    batch_size : Optional[str]
-        Optional size of row batches to be extracted and stored in SingleStore. Default is 1000.
+    batch_size : Optional[int]
+        Optional number of rows inserted per statement batch. Default is 1000.
     """
 
     url: str = Field(..., description="URL for SingleStore.")
@@ -40,7 +42,7 @@ class SingleStoreSink(SinkConnector):
 
     table: str = Field(..., description="Table name. Needs to be pre-created")
 
-    batch_size: Optional[str] = Field(1000, description="Optional size of row batches extracted")
+    batch_size: Optional[int] = Field(1000, description="Optional number of rows inserted per statement batch")
 
     @property
     def sink_name(self) -> str:
@@ -52,7 +54,10 @@ class SingleStoreSink(SinkConnector):
 
     @property
     def optional_properties(self) -> List[str]:
-        return ['batch_size']
+        return ['batch_size', 'pool_max_size', 'pool_idle_timeout']
+
+    def _create_client(self) -> s2.connection.Connection:
+        return s2.connect(self.url, results_type="dict")
 
     def validation(self) -> bool:
         """config_validation connector setup"""
@@ -64,58 +69,65 @@ class SingleStoreSink(SinkConnector):
         return True 
 
     def delete_vectors_with_file_id(self, file_id: str) -> bool:
-        with s2.connect(self.url) as conn:
+        with self.lease_client() as conn:
             with conn.cursor() as cur:
                 delete_query = f"""DELETE FROM {self.table} WHERE _file_entry_id='{file_id}';"""
                 cur.execute(delete_query)
         return True
-    
-    def store(self, vectors_to_store:List[NeumVector]) -> int:
-        batch_size = self.batch_size
-        url = self.url
-        table = self.table
-
-        # Get metadata list
-        # metadata_fields = ""
-        if vectors_to_store[0].metadata is not None:
-            metadata_keys = vectors_to_store[0].metadata.keys()
-            if(len(metadata_keys) > 0):
-                metadata_fields = ', ' + ', '.join(metadata_keys)
-            else: metadata_fields = ""
 
-        # Determine the number of batches
-        num_batches = (len(vectors_to_store) + batch_size-1) // batch_size
+    def delete_vectors(self, ids: List[str]) -> bool:
+        with self.lease_client() as conn:
+            with conn.cursor() as cur:
+                for i in range(0, len(ids), 1000):
+                    batch = ids[i:i + 1000]
+                    placeholders = ", ".join(["%s"] * len(batch))
+                    cur.execute(f"DELETE FROM {self.table} WHERE id IN ({placeholders});", batch)
+        return True
+    
+    def store(self, vectors_to_store:Union[List[NeumVector], NeumVectorBatch]) -> int:
+        """Inserts vectors with parameterized statements, `batch_size` rows per `executemany` call.
+
+        Vectors are sent as packed little endian float32 blobs, the format `json_array_pack` produces, instead of JSON
+        text the server has to parse. Metadata fields are inserted in the columns of the same name, vectors missing a
+        field get NULL.
+        """
+        vectors_to_store = NeumVectorBatch.from_vectors(vectors_to_store)
+        if len(vectors_to_store) == 0:
+            return 0
+        metadata_columns = vectors_to_store.metadata_columns()
+        columns = ", ".join(self._quote_identifier(column) for column in ["id", "vector", *metadata_columns])
+        placeholders = ", ".join(["%s"] * (2 + len(metadata_columns)))
+        insert_query = f"INSERT INTO {self.table} ({columns}) VALUES ({placeholders})"
+
+        vectors = vectors_to_store.vectors.astype("<f4", copy=False)
+        metadata_values = [[self._to_sql_value(value) for value in values] for values in metadata_columns.values()]
         try:
-            with s2.connect(url) as conn:
+            with self.lease_client() as conn:
                 with conn.cursor() as cur:
-                    for batch_num in range(num_batches):
-                        # Get the start and end indices for this batch
-                        start_idx = batch_num * 1000
-                        end_idx = start_idx + 1000
-                        # Generate the values string for this batch
-                        # Assumes a string based id. Needs to ensure the table is created as such
-                        if metadata_fields != "":
-                            value_strings = [
-                                "(\'{}\', \'{}\', json_array_pack(\'{}\'), {})".format(
-                                    vectors_to_store[i].id, vectors_to_store[i].vector, ', '.join(["'" + str(value) + "'" for value in vectors_to_store[i].metadata.values()])
-                                )
-                                for i in range(start_idx, min(end_idx, len(vectors_to_store)))
-                            ]
-                        else:
-                            value_strings = [
-                                "(\'{}\', \'{}\', json_array_pack(\'{}\'))".format(
-                                    vectors_to_store[i].id, vectors_to_store[i].vector
-                                )
-                                for i in range(start_idx, min(end_idx, len(vectors_to_store)))
-                            ]
-                        values_sql = ',\n'.join(value_strings)
-                        insert_query = f"""INSERT INTO {table} (id, vector{metadata_fields})\nVALUES\n{values_sql};"""
-                        cur.execute(insert_query)
+                    for start in range(0, len(vectors_to_store), self.batch_size):
+                        end = min(start + self.batch_size, len(vectors_to_store))
+                        rows = [
+                            (vectors_to_store.ids[i], vectors[i].tobytes(), *[values[i] for values in metadata_values])
+                            for i in range(start, end)
+                        ]
+                        # executemany packs the rows into multi row INSERT statements
+                        cur.executemany(insert_query, rows)
         except Exception as e:
-            raise SinglestoreInsertionException("SingleStore storing failed. Try again later.")
-        
-        return len(vectors_to_store), None
+            raise SinglestoreInsertionException(f"SingleStore storing failed. Exception - {e}")
+        return len(vectors_to_store)
+
+    @staticmethod
+    def _quote_identifier(name:str) -> str:
+        return "`" + str(name).replace("`", "``") + "`"
+
+    @staticmethod
+    def _to_sql_value(value):
+        if value is None or isinstance(value, (str, int, float, bool)):
+            return value
+        # Lists and dicts are stored as JSON
+        return json.dumps(value, default=str)
     
+    @staticmethod
     def translate_to_sql(filter_conditions:List[FilterCondition]):
         query_parts = []
         for condition in filter_conditions:
@@ -132,7 +144,6 @@ class SingleStoreSink(SinkConnector):
         return conditions_str
 
     def search(self, vector: List[float], number_of_results: int, filters:List[FilterCondition]=[]) -> List[NeumSearchResult]:
-        url = self.url
         table = self.table
 
         if len(filters)>0:
@@ -150,7 +161,7 @@ class SingleStoreSink(SinkConnector):
             LIMIT {number_of_results}"""
 
         try:
-            with s2.connect(url, results_type="dict") as conn:
+            with self.lease_client() as conn:
                 with conn.cursor() as cur:
                     matches:List[NeumSearchResult] = []
                     cur.execute(query)
@@ -161,14 +172,13 @@ class SingleStoreSink(SinkConnector):
             raise SinglestoreQueryException(f"Failed to query single store. Exception - {e}")
 
     def info(self) -> NeumSinkInfo:
-        url = self.url
         table = self.table
 
         query = f"""SELECT Count(*) as count
         FROM {table}"""
         
         try:
-            with s2.connect(url, results_type="dict") as conn:
+            with self.lease_client() as conn:
                 with conn.cursor() as cur:
                     cur.execute(query)
                     rows = cur.fetchall()
@@ -1,14 +1,21 @@
 from neumai.Shared.NeumSearch import NeumSearchResult
 from neumai.Shared.NeumVector import NeumVector
+from neumai.Shared.NeumVectorBatch import NeumVectorBatch
 from neumai.Shared.NeumSinkInfo import NeumSinkInfo
 from abc import ABC, abstractmethod
-from typing import List
-from pydantic import BaseModel
+from typing import Any, Hashable, List, Optional, Union
+from pydantic import BaseModel, Field
 from neumai.SinkConnectors.filter_utils import FilterCondition
+from neumai.SinkConnectors.ConnectionPool import ConnectionPool, get_connection_pool, close_connection_pool
+import asyncio
 import json
 
 class SinkConnector(ABC, BaseModel):
 
+    pool_max_size: Optional[int] = Field(4, description="Maximum number of pooled clients / connections to the sink.")
+
+    pool_idle_timeout: Optional[float] = Field(300, description="Seconds an unused pooled client is kept open.")
+
     @property
     @abstractmethod
     def sink_name(self) -> str:
@@ -29,8 +36,8 @@ class SinkConnector(ABC, BaseModel):
         """config_validation sink setup"""
 
     @abstractmethod
-    def store(self, vectors_to_store:List[NeumVector]) -> int:
-        """Store vectors with a given service"""
+    def store(self, vectors_to_store:Union[List[NeumVector], NeumVectorBatch]) -> int:
+        """Store vectors with a given service. Pipelines pass a NeumVectorBatch, which sinks can read column wise."""
 
     @abstractmethod
     def search(self, vector:List[float], number_of_results:int, filters:List[FilterCondition]={}) -> List[NeumSearchResult]:
@@ -40,10 +47,76 @@ class SinkConnector(ABC, BaseModel):
     def delete_vectors_with_file_id(self, file_id:str ) -> bool:
         """Deletes vectors for a specific file id"""
     
+    def delete_vectors(self, ids:List[str]) -> bool:
+        """Deletes vectors by id. Used by `Pipeline.sync` to only remove the chunks of a file that changed."""
+        raise NotImplementedError(f"{self.sink_name} does not support deleting vectors by id")
+
+    @property
+    def supports_delete_vectors(self) -> bool:
+        """Whether `delete_vectors` is implemented. `Pipeline.sync` replaces all the vectors of changed files otherwise."""
+        return type(self).delete_vectors is not SinkConnector.delete_vectors
+
     @abstractmethod
     def info(self) -> NeumSinkInfo:
         """Get information about what is stores in the sink"""
 
+    def flush(self) -> None:
+        """Wait until the vectors stored are applied by the sink. Pipelines call it once a run is done.
+
+        Sinks acknowledging writes before applying them override it, by default stores are applied when they return.
+        """
+
+    async def aflush(self) -> None:
+        """Async version of flush. By default the blocking call is run in a worker thread."""
+        await asyncio.to_thread(self.flush)
+
+    async def astore(self, vectors_to_store:Union[List[NeumVector], NeumVectorBatch]) -> int:
+        """Async version of store. By default the blocking call is run in a worker thread."""
+        return await asyncio.to_thread(self.store, vectors_to_store=vectors_to_store)
+
+    async def asearch(self, vector:List[float], number_of_results:int, filters:List[FilterCondition]=[]) -> List[NeumSearchResult]:
+        """Async version of search. By default the blocking call is run in a worker thread."""
+        return await asyncio.to_thread(self.search, vector=vector, number_of_results=number_of_results, filters=filters)
+
+    # Connection pooling. Sinks override `_create_client` (and `_close_client` if needed) and lease clients
+    # with `with self.lease_client() as client:` instead of opening a new one on every call.
+
+    def _pool_key(self) -> Hashable:
+        """Connection parameters identifying the pool. Defaults to the full sink configuration."""
+        return (self.sink_name, self.json(exclude={'pool_max_size', 'pool_idle_timeout'}))
+
+    def _create_client(self) -> Any:
+        """Open a new client / connection to the sink"""
+        raise NotImplementedError(f"{self.sink_name} does not support connection pooling")
+
+    def _close_client(self, client:Any) -> None:
+        """Close a client evicted from the pool"""
+        close = getattr(client, "close", None)
+        if callable(close):
+            close()
+
+    @property
+    def pool(self) -> ConnectionPool:
+        return get_connection_pool(
+            key=self._pool_key(),
+            create_client=self._create_client,
+            close_client=self._close_client,
+            max_size=self.pool_max_size,
+            idle_timeout=self.pool_idle_timeout,
+        )
+
+    def lease_client(self):
+        """Lease a pooled client for the duration of a `with` block"""
+        return self.pool.lease()
+
+    def warm_up(self, size:int = 1) -> int:
+        """Open pooled clients ahead of the first calls. Returns the number of idle clients."""
+        return self.pool.warm_up(size=size)
+
+    def close(self) -> None:
+        """Close the pooled clients of the sink"""
+        close_connection_pool(self._pool_key())
+
     def as_json(self):
         """Python does not have built in serialization. We need this logic to be able to respond in our API..
 
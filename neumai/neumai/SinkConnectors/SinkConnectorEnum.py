@@ -6,6 +6,7 @@ class SinkConnectorEnum(str, Enum):
     singlestoresink = "singlestoresink"
     supabasesink = "supabasesink"
     weaviatesink = "weaviatesink"
+    multisink = "multisink"
 
     def as_data_connector_enum(sink_connector_name: str):
         if sink_connector_name == None or sink_connector_name == "":
@@ -1,7 +1,8 @@
-from typing import List, Optional
+from typing import List, Optional, Union
 from neumai.SinkConnectors.SinkConnector import SinkConnector
 from neumai.Shared.NeumSinkInfo import NeumSinkInfo
 from neumai.Shared.NeumVector  import NeumVector
+from neumai.Shared.NeumVectorBatch import NeumVectorBatch
 from neumai.Shared.NeumSearch import NeumSearchResult
 from neumai.Shared.Exceptions import(
     SupabaseConnectionException,
@@ -42,7 +43,13 @@ class SupabaseSink(SinkConnector):
 
     @property
     def optional_properties(self) -> List[str]:
-        return []
+        return ['pool_max_size', 'pool_idle_timeout']
+
+    def _create_client(self) -> vecs.Client:
+        return vecs.create_client(self.database_connection)
+
+    def _close_client(self, client:vecs.Client) -> None:
+        client.disconnect()
 
     def validation(self) -> bool:
         """config_validation connector setup"""
@@ -54,36 +61,39 @@ class SupabaseSink(SinkConnector):
         return True 
 
     def delete_vectors_with_file_id(self, file_id: str) -> bool:
-        database_connection = self.database_connection
-        vx = vecs.create_client(database_connection)
         try:
-            collection_name = self.collection_name
-            db = vx.get_collection(name=collection_name)
-            db.delete(filters={"_file_entry_id": {"$eq": file_id}})
+            with self.lease_client() as vx:
+                collection_name = self.collection_name
+                db = vx.get_collection(name=collection_name)
+                db.delete(filters={"_file_entry_id": {"$eq": file_id}})
+        except Exception as e:
+            raise Exception(f"Supabase deletion failed. Exception {e}")
+        return True
+
+    def delete_vectors(self, ids: List[str]) -> bool:
+        try:
+            with self.lease_client() as vx:
+                db = vx.get_collection(name=self.collection_name)
+                db.delete(ids=ids)
         except Exception as e:
             raise Exception(f"Supabase deletion failed. Exception {e}")
-        finally:
-            vx.disconnect()
         return True
     
-    def store(self, vectors_to_store:List[NeumVector]) -> int:
-        database_connection = self.database_connection
-        vx = vecs.create_client(database_connection)
+    def store(self, vectors_to_store:Union[List[NeumVector], NeumVectorBatch]) -> int:
+        vectors_to_store = NeumVectorBatch.from_vectors(vectors_to_store)
         try:
-            collection_name = self.collection_name
-            dimensions = len(vectors_to_store[0].vector)
-            db = vx.get_or_create_collection(name=collection_name, dimension=dimensions)
-            to_upsert = []
-            for i in range(0, len(vectors_to_store)):
-                to_upsert.append((vectors_to_store[i].id, vectors_to_store[i].vector, vectors_to_store[i].metadata))
-
-            db.upsert(records=to_upsert)
+            with self.lease_client() as vx:
+                collection_name = self.collection_name
+                dimensions = vectors_to_store.dimensions
+                db = vx.get_or_create_collection(name=collection_name, dimension=dimensions)
+                to_upsert = list(zip(vectors_to_store.ids, vectors_to_store.vector_lists(), vectors_to_store.metadata))
+
+                db.upsert(records=to_upsert)
         except Exception as e:
             raise SupabaseInsertionException(f"Supabase storing failed. Exception {e}")
-        finally:
-            vx.disconnect()
         return len(vectors_to_store)
     
+    @staticmethod
     def translate_to_supabase(filter_conditions:List[FilterCondition]):
         query_parts = []
 
@@ -107,29 +117,24 @@ class SupabaseSink(SinkConnector):
         return {"$and": query_parts}  # Combine using $and, can be changed to $or if needed
 
     def search(self, vector: List[float], number_of_results:int, filters:List[FilterCondition]=[]) -> List:
-        database_connection = self.database_connection
-        vx = vecs.create_client(database_connection)
         collection_name = self.collection_name
         filters_supabase = self.translate_to_supabase(filters)
 
-        try:
-            db = vx.get_collection(name=collection_name)
-        except:
-            raise SupabaseQueryException(f"Collection {collection_name} does not exist")
-        finally:
-            vx.disconnect()
-        try:
-            results = db.query(
-                data=vector,
-                include_metadata=True,
-                include_value=True,
-                limit=number_of_results,
-                filters=filters_supabase
-            )
-        except Exception as e:
-            raise SupabaseQueryException(f"Error querying vectors from Supabase. Exception: {e}")
-        finally:
-            vx.disconnect()
+        with self.lease_client() as vx:
+            try:
+                db = vx.get_collection(name=collection_name)
+            except:
+                raise SupabaseQueryException(f"Collection {collection_name} does not exist")
+            try:
+                results = db.query(
+                    data=vector,
+                    include_metadata=True,
+                    include_value=True,
+                    limit=number_of_results,
+                    filters=filters_supabase
+                )
+            except Exception as e:
+                raise SupabaseQueryException(f"Error querying vectors from Supabase. Exception: {e}")
         matches = []
         for result in results:
             matches.append(NeumSearchResult(
@@ -141,16 +146,13 @@ class SupabaseSink(SinkConnector):
         return matches
     
     def info(self) -> NeumSinkInfo:
-        database_connection = self.database_connection
-        vx = vecs.create_client(database_connection)
         collection_name = self.collection_name
-        try:
-            db = vx.get_collection(name=collection_name)
-        except:
-            raise SupabaseIndexInfoException(f"Collection {collection_name} does not exist")
-        finally:
-            vx.disconnect()
+        with self.lease_client() as vx:
+            try:
+                db = vx.get_collection(name=collection_name)
+            except:
+                raise SupabaseIndexInfoException(f"Collection {collection_name} does not exist")
         
-        number_of_vectors = db.table.select('count(*)')[0].count
+            number_of_vectors = db.table.select('count(*)')[0].count
 
         return NeumSinkInfo(number_vectors_stored=number_of_vectors)
\ No newline at end of file
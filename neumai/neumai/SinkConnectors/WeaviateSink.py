@@ -1,6 +1,7 @@
-from typing import List, Optional, Tuple
+from typing import List, Optional, Tuple, Union
 from neumai.SinkConnectors.SinkConnector import SinkConnector
 from neumai.Shared.NeumVector  import NeumVector
+from neumai.Shared.NeumVectorBatch import NeumVectorBatch
 from neumai.Shared.NeumSinkInfo import NeumSinkInfo
 from neumai.Shared.NeumSearch import NeumSearchResult
 from neumai.Shared.Exceptions import(
@@ -73,7 +74,17 @@ class WeaviateSink(SinkConnector):
 
     @property
     def optional_properties(self) -> List[str]:
-        return ['num_workers', 'shard_count', 'batch_size', 'is_dynamic_batch', 'batch_connection_error_retries']
+        return ['num_workers', 'shard_count', 'batch_size', 'is_dynamic_batch', 'batch_connection_error_retries', 'pool_max_size', 'pool_idle_timeout']
+
+    def _create_client(self) -> weaviate.Client:
+        if not self.api_key:
+            return weaviate.Client(
+                url=self.url
+            )
+        return weaviate.Client(
+            url=self.url,
+            auth_client_secret=weaviate.AuthApiKey(api_key=self.api_key),
+        )
 
     def validation(self) -> bool:
         """config_validation connector setup"""
@@ -103,46 +114,45 @@ class WeaviateSink(SinkConnector):
                         partial_failure['number_of_failures'] += 1
 
     def delete_vectors_with_file_id(self, file_id: str) -> bool:
-        api_key = self.api_key
-        url = self.url
         # Weaviate requires first letter to be capitalized
         class_name = self.class_name.replace("-","_")
         class_name = _capitalize_first_letter(class_name)
-        client = weaviate.Client(
-            url=url,
-            auth_client_secret=weaviate.AuthApiKey(api_key=api_key),
-        )
-        client.batch.delete_objects(
-            class_name=class_name,
-            where={
-                "path": ["_file_entry_id"],
-                "operator": "Equal",
-                "valueText": file_id
-            },
-        )
+        with self.lease_client() as client:
+            client.batch.delete_objects(
+                class_name=class_name,
+                where={
+                    "path": ["_file_entry_id"],
+                    "operator": "Equal",
+                    "valueText": file_id
+                },
+            )
+        return True
+
+    def delete_vectors(self, ids: List[str]) -> bool:
+        class_name = self.class_name.replace("-","_")
+        class_name = _capitalize_first_letter(class_name)
+        with self.lease_client() as client:
+            for id in ids:
+                # Objects are stored under the uuid generated from the vector id
+                client.data_object.delete(uuid=generate_uuid5(id), class_name=class_name)
         return True
     
-    def store(self, vectors_to_store:List[NeumVector]) -> Tuple[List, dict]:
-        url = self.url
+    def store(self, vectors_to_store:Union[List[NeumVector], NeumVectorBatch]) -> Tuple[List, dict]:
+        class_name = self.class_name.replace("-","_")
+        class_name = _capitalize_first_letter(class_name)
+        partial_failure = {'did_fail': False, 'latest_failure': None, 'number_of_failures': 0}
+        vectors_to_store = NeumVectorBatch.from_vectors(vectors_to_store)
+
+        with self.lease_client() as client:
+            self._store(client=client, vectors_to_store=vectors_to_store, class_name=class_name, partial_failure=partial_failure)
+        return len(vectors_to_store)
+
+    def _store(self, client:weaviate.Client, vectors_to_store:NeumVectorBatch, class_name:str, partial_failure:dict):
         num_workers = self.num_workers
         shard_count = self.shard_count
         batch_size = self.batch_size
         is_dynamic_batch = self.is_dynamic_batch
         batch_connection_error_retries = self.batch_connection_error_retries
-        class_name = self.class_name.replace("-","_")
-        class_name = _capitalize_first_letter(class_name)
-        partial_failure = {'did_fail': False, 'latest_failure': None, 'number_of_failures': 0}
-
-        if 'https' not in url:
-            client = weaviate.Client(
-                url=url
-            )
-        else:
-            api_key = self.api_key
-            client = weaviate.Client(
-                url=url,
-                auth_client_secret=weaviate.AuthApiKey(api_key=api_key),
-            )
         try:
             client.schema.create_class({
                 "class": class_name,
@@ -159,19 +169,18 @@ class WeaviateSink(SinkConnector):
             dynamic=is_dynamic_batch,
             connection_error_retries=batch_connection_error_retries
         ) as batch:
-            for i in range(0, len(vectors_to_store)):
+            for id, vector, metadata in zip(vectors_to_store.ids, vectors_to_store.vector_lists(), vectors_to_store.metadata):
                 try:
                     batch.add_data_object(
-                        data_object=vectors_to_store[i].metadata,
+                        data_object=metadata,
                         class_name=class_name,
-                        vector=vectors_to_store[i].vector,
-                        uuid=generate_uuid5(vectors_to_store[i].id)
+                        vector=vector,
+                        uuid=generate_uuid5(id)
                     )
                 except Exception as e:
                     raise WeaviateInsertionException(f"Error when adding data object to Weaviate. Error: {str(e)}")
 
-        return len(vectors_to_store)
-
+    @staticmethod
     def filter_conditions_to_weaviate_filter(filters: List[FilterCondition]) -> dict:
         if len(filters) > 1:
             weaviate_filter = {
@@ -195,16 +204,13 @@ class WeaviateSink(SinkConnector):
         return weaviate_filter
 
     def search(self, vector: List[float], number_of_results: int, filters:List[FilterCondition]=[]) -> List[NeumSearchResult]:
-        api_key = self.api_key
-        url = self.url
         # Weaviate requires first letter to be capitalized
         class_name = self.class_name.replace("-","_")
         class_name = _capitalize_first_letter(class_name)
-        client = weaviate.Client(
-            url=url,
-            auth_client_secret=weaviate.AuthApiKey(api_key=api_key),
-        )
-        
+        with self.lease_client() as client:
+            return self._search(client=client, vector=vector, number_of_results=number_of_results, filters=filters, class_name=class_name)
+
+    def _search(self, client:weaviate.Client, vector: List[float], number_of_results: int, filters:List[FilterCondition], class_name:str) -> List[NeumSearchResult]:
         try:
             class_schema = client.schema.get(class_name)
         except Exception as e:
@@ -237,22 +243,16 @@ class WeaviateSink(SinkConnector):
         return matches
 
     def info(self) -> NeumSinkInfo:
-        api_key = self.api_key
-        url = self.url
-        
         class_name = self.class_name.replace("-","_")
         class_name = _capitalize_first_letter(class_name)
-        client = weaviate.Client(
-            url=url,
-            auth_client_secret=weaviate.AuthApiKey(api_key=api_key),
-        )
         try:
-            response = (
-                client.query
-                .aggregate(class_name=class_name)
-                .with_meta_count()
-                .do()
-            )
+            with self.lease_client() as client:
+                response = (
+                    client.query
+                    .aggregate(class_name=class_name)
+                    .with_meta_count()
+                    .do()
+                )
             vectors_stored_in_class = response["data"]["Aggregate"][class_name]["meta"]["count"]
             return NeumSinkInfo(number_vectors_stored=vectors_stored_in_class)
         except Exception as e:
@@ -5,5 +5,6 @@ from .SingleStoreSink import SingleStoreSink
 from .SupabaseSink import SupabaseSink
 from .MarqoSink import MarqoSink
 from .LanceDBSink import LanceDBSink
+from .MultiSink import MultiSink
 from .SinkConnector import SinkConnector
 from .SinkConnectorEnum import SinkConnectorEnum
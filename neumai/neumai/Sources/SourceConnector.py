@@ -1,4 +1,4 @@
-from typing import List, Generator, Dict, Optional
+from typing import List, Generator, AsyncGenerator, Dict, Iterable, Optional
 from datetime import datetime
 from pydantic import BaseModel, Field, validator
 from neumai.DataConnectors.DataConnector import DataConnector
@@ -6,10 +6,12 @@ from neumai.Chunkers.Chunker import Chunker
 from neumai.Chunkers.RecursiveChunker import RecursiveChunker
 from neumai.Loaders.Loader import Loader
 from neumai.Loaders.AutoLoader import AutoLoader
+from neumai.Loaders.LoaderProcessPool import LoaderProcessPool
 from neumai.ModelFactories import ChunkerFactory, DataConnectorFactory, LoaderFactory
 from neumai.Shared.NeumDocument import NeumDocument
 from neumai.Shared.LocalFile import LocalFile
 from neumai.Shared.CloudFile import CloudFile
+from neumai.Shared.async_utils import iterate_in_thread
 
 # Assuming DataConnector, Chunker, RecursiveChunker, Loader, and AutoLoader are defined elsewhere
 class SourceConnector(BaseModel):
@@ -47,16 +49,52 @@ class SourceConnector(BaseModel):
     def list_files_delta(self, last_run:datetime) -> Generator[CloudFile, None, None]:
         yield from self.data_connector.connect_and_list_delta(last_run=last_run)
 
+    def list_files_sync(self) -> Generator[CloudFile, None, None]:
+        yield from self.data_connector.connect_and_list_sync()
+
     def download_files(self, cloudFile:CloudFile) -> Generator[LocalFile, None, None]:
         yield from self.data_connector.connect_and_download(cloudFile=cloudFile)
 
-    def load_data(self, file:LocalFile) -> Generator[NeumDocument, None, None]:
-        yield from self.loader.load(file=file)
+    def load_data(self, file:LocalFile, pool:Optional[LoaderProcessPool] = None) -> Generator[NeumDocument, None, None]:
+        try:
+            if pool is not None:
+                yield from pool.load(loader=self.loader, file=file)
+            else:
+                yield from self.loader.load(file=file)
+        finally:
+            # Drop in memory content and remove spilled downloads as soon as the file is loaded
+            file.close()
+
+    def load_files(self, files:Iterable[LocalFile], pool:LoaderProcessPool) -> Generator[NeumDocument, None, None]:
+        """Loads several files at a time in the processes of `pool`. Documents are yielded as they are loaded."""
+        for _, documents in pool.load_files(loader=self.loader, files=files):
+            yield from documents
 
     def chunk_data(self, document:NeumDocument) -> Generator[List[NeumDocument], None, None]:
         for chunk_set in self.chunker.chunk(documents=[document]):
             chunk_set_with_custom_metadata = [NeumDocument(id=chunk.id, content=chunk.content, metadata={**chunk.metadata, **self.custom_metadata, **{"text":chunk.content}}) for chunk in chunk_set]
             yield chunk_set_with_custom_metadata
+
+    async def alist_files_full(self) -> AsyncGenerator[CloudFile, None]:
+        async for cloudFile in self.data_connector.aconnect_and_list_full():
+            yield cloudFile
+
+    async def alist_files_delta(self, last_run:datetime) -> AsyncGenerator[CloudFile, None]:
+        async for cloudFile in self.data_connector.aconnect_and_list_delta(last_run=last_run):
+            yield cloudFile
+
+    async def adownload_files(self, cloudFile:CloudFile) -> AsyncGenerator[LocalFile, None]:
+        async for localFile in self.data_connector.aconnect_and_download(cloudFile=cloudFile):
+            yield localFile
+
+    async def aload_data(self, file:LocalFile) -> AsyncGenerator[NeumDocument, None]:
+        # Loaders are CPU bound, keep them off the event loop
+        async for document in iterate_in_thread(self.load_data(file=file)):
+            yield document
+
+    async def achunk_data(self, document:NeumDocument) -> AsyncGenerator[List[NeumDocument], None]:
+        async for chunk_set in iterate_in_thread(self.chunk_data(document=document)):
+            yield chunk_set
     
     def validation(self) -> bool:
         core_validation = self.data_connector.config_validation() and self.loader.config_validation() and self.chunker.config_validation()
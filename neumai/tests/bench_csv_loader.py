@@ -0,0 +1,59 @@
+"""Rows/sec of CSVLoader, reading row by row with csv.DictReader (columnar=False) against column batches with pyarrow.
+
+    python tests/bench_csv_loader.py [--rows 500000] [--path bench.csv]
+
+The CSV (5 columns, ~72MB for 500k rows) is generated on the first run and reused afterwards.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from neumai.Loaders.CSVLoader import CSVLoader
+from neumai.Shared.LocalFile import LocalFile
+from neumai.Shared.Selector import Selector
+
+WORDS = ["alpha", "beta", "gamma", "delta", "lorem", "ipsum", "dolor", "sit", "amet", "neum"]
+SELECTORS = {
+    "all columns": Selector(to_embed=[], to_metadata=[]),
+    "selector": Selector(to_embed=["title", "text"], to_metadata=["id", "category"]),
+}
+
+
+def write_csv(path:str, rows:int) -> None:
+    rng = random.Random(1)
+    with open(path, "w") as file:
+        file.write("id,title,text,category,price\n")
+        for i in range(rows):
+            text = " ".join(rng.choice(WORDS) for _ in range(20))
+            file.write(f'{i},"Title {i}","{text}, more",{rng.choice(WORDS)},{rng.random():.4f}\n')
+
+
+def bench(label:str, count_rows) -> None:
+    start = time.perf_counter()
+    rows = count_rows()
+    elapsed = time.perf_counter() - start
+    print(f"{label:36s} {rows} rows {elapsed:6.2f}s {rows / elapsed:10,.0f} rows/s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--path", default=os.path.join(tempfile.gettempdir(), "neumai_bench.csv"))
+    args = parser.parse_args()
+    if not os.path.exists(args.path):
+        write_csv(args.path, args.rows)
+    print(f"{args.path}: {os.path.getsize(args.path) / 2**20:.0f}MB")
+
+    def file():
+        return LocalFile(file_path=args.path, metadata={}, id="bench")
+
+    for name, selector in SELECTORS.items():
+        bench(f"{name}, DictReader", lambda: sum(1 for _ in CSVLoader(selector=selector, columnar=False).load(file())))
+        bench(f"{name}, columnar", lambda: sum(1 for _ in CSVLoader(selector=selector).load(file())))
+        bench(f"{name}, columnar load_batches", lambda: sum(len(batch) for batch in CSVLoader(selector=selector).load_batches(file())))
+
+
+if __name__ == "__main__":
+    main()
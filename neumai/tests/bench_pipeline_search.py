@@ -0,0 +1,163 @@
+"""p50 / p99 latency of Pipeline.search (OpenAIEmbed.embed_query then QdrantSink.search) against a local stub server,
+creating new embedding / sink clients on every call against reusing them.
+
+    python tests/bench_pipeline_search.py [--searches 300] [--server-time 0.002] [--offline-tokenizer]
+
+The stub serves the OpenAI embeddings API and the Qdrant search API over TLS with a self-signed certificate, so the
+handshakes saved by reused clients are counted. --offline-tokenizer replaces tiktoken's cl100k_base with a byte level
+encoding, for machines that can't download it. Tokenization then costs the same in every mode.
+"""
+import argparse
+import contextlib
+import datetime
+import json
+import os
+import random
+import ssl
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DIMENSIONS = 1536
+
+
+def write_certificate(directory:str):
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.x509.oid import NameOID
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "localhost")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    certificate = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(minutes=5))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .add_extension(x509.SubjectAlternativeName([x509.DNSName("localhost")]), critical=False)
+        .add_extension(x509.BasicConstraints(ca=True, path_length=None), critical=True)
+        .sign(key, hashes.SHA256())
+    )
+    certificate_path, key_path = os.path.join(directory, "cert.pem"), os.path.join(directory, "key.pem")
+    with open(certificate_path, "wb") as file:
+        file.write(certificate.public_bytes(serialization.Encoding.PEM))
+    with open(key_path, "wb") as file:
+        file.write(key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()))
+    return certificate_path, key_path
+
+
+def start_stub(certificate_path:str, key_path:str, server_time:float) -> str:
+    vector = [round(random.random(), 6) for _ in range(DIMENSIONS)]
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            time.sleep(server_time)
+            if self.path.endswith("/embeddings"):
+                count = len(body["input"]) if isinstance(body["input"], list) else 1
+                reply = {
+                    "object": "list",
+                    "model": "text-embedding-ada-002",
+                    "usage": {"prompt_tokens": 3, "total_tokens": 3},
+                    "data": [{"object": "embedding", "index": i, "embedding": vector} for i in range(count)],
+                }
+            else:
+                points = [{"id": i, "version": 0, "score": 0.9, "payload": {"text": f"chunk {i}"}} for i in range(body.get("limit", 3))]
+                reply = {"status": "ok", "time": 0, "result": points}
+            data = json.dumps(reply).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(certificate_path, key_path)
+    server.socket = context.wrap_socket(server.socket, server_side=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"https://localhost:{server.server_address[1]}"
+
+
+def use_offline_tokenizer() -> None:
+    import tiktoken
+    import tiktoken.registry
+
+    tiktoken.registry.ENCODINGS["cl100k_base"] = tiktoken.Encoding(
+        name="cl100k_base",
+        pat_str=r"""(?i:'s|'t|'re|'ve|'m|'ll|'d)|[^\r\n\p{L}\p{N}]?\p{L}+|\p{N}{1,3}| ?[^\s\p{L}\p{N}]+[\r\n]*|\s*[\r\n]+|\s+(?!\S)|\s+""",
+        mergeable_ranks={bytes([i]): i for i in range(256)},
+        special_tokens={"<|endoftext|>": 256},
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--searches", type=int, default=300)
+    parser.add_argument("--server-time", type=float, default=0.002, help="Seconds the stub spends on every request.")
+    parser.add_argument("--offline-tokenizer", action="store_true")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    certificate_path, key_path = write_certificate(directory)
+    # Trusted by httpx (OpenAI) and requests / httpx (Qdrant) through the environment
+    os.environ["SSL_CERT_FILE"] = os.environ["REQUESTS_CA_BUNDLE"] = certificate_path
+    url = start_stub(certificate_path, key_path, args.server_time)
+    os.environ["OPENAI_API_BASE"] = url + "/v1"
+    if args.offline_tokenizer:
+        use_offline_tokenizer()
+
+    from neumai.EmbedConnectors import OpenAIEmbed
+    from neumai.EmbedConnectors.EmbedConnector import EmbedConnector
+    from neumai.Pipelines import Pipeline
+    from neumai.SinkConnectors import QdrantSink
+    from neumai.SinkConnectors.SinkConnector import SinkConnector
+
+    reused_client, reused_lease = EmbedConnector.client, SinkConnector.lease_client
+
+    def new_embed_client(self):
+        return self._create_client()
+
+    @contextlib.contextmanager
+    def new_sink_client(self):
+        client = self._create_client()
+        try:
+            yield client
+        finally:
+            self._close_client(client)
+
+    def run(label:str, new_embed:bool, new_sink:bool) -> None:
+        # Clients built on every access, as before clients were pooled and reused
+        EmbedConnector.client = property(new_embed_client) if new_embed else reused_client
+        SinkConnector.lease_client = new_sink_client if new_sink else reused_lease
+        pipeline = Pipeline(sources=[], embed=OpenAIEmbed(api_key="sk-bench"), sink=QdrantSink(url=url, api_key="bench", collection_name="bench"))
+        for _ in range(10):
+            pipeline.search(query="warm up", number_of_results=3)
+        latencies = []
+        for i in range(args.searches):
+            start = time.perf_counter()
+            pipeline.search(query=f"what is neum {i}", number_of_results=3)
+            latencies.append((time.perf_counter() - start) * 1000)
+        pipeline.embed.close()
+        pipeline.sink.close()
+        latencies.sort()
+        print(f"{label:44s} p50 {latencies[len(latencies) // 2]:7.2f} ms  p99 {latencies[int(len(latencies) * 0.99)]:7.2f} ms")
+
+    print(f"TLS stub, {args.server_time * 1000:.0f} ms per request, {args.searches} searches")
+    run("new embed client + new sink client per call", new_embed=True, new_sink=True)
+    run("new embed client per call, pooled sink", new_embed=True, new_sink=False)
+    run("reused embed client, pooled sink", new_embed=False, new_sink=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""MB/s of the splitters in splitter_utils against langchain's RecursiveCharacterTextSplitter and CharacterTextSplitter.
+
+    python tests/bench_splitter_utils.py [--megabytes 40] [--docs ../docs]
+
+The Markdown files under --docs are repeated until they add up to --megabytes.
+"""
+import argparse
+import glob
+import logging
+import os
+import time
+
+from langchain.text_splitter import CharacterTextSplitter, RecursiveCharacterTextSplitter
+
+from neumai.Chunkers.splitter_utils import split_text_on_separator, split_text_recursive
+
+SETTINGS = [(500, 0), (500, 100), (2000, 200)]
+
+
+def load_docs(path:str, megabytes:float):
+    docs = []
+    for name in glob.glob(os.path.join(path, "**", "*.md*"), recursive=True):
+        with open(name, encoding="utf-8", errors="ignore") as file:
+            docs.append(file.read())
+    if not docs:
+        raise SystemExit(f"No Markdown files under {path}")
+    return docs * max(1, int(megabytes * 1e6 // sum(map(len, docs))))
+
+
+def bench(label:str, split, docs, megabytes:float) -> None:
+    start = time.perf_counter()
+    chunks = sum(len(split(doc)) for doc in docs)
+    elapsed = time.perf_counter() - start
+    print(f"  {label:42s} {megabytes / elapsed:7.1f} MB/s ({chunks} chunks)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--megabytes", type=float, default=40)
+    parser.add_argument("--docs", default=os.path.join(os.path.dirname(__file__), "..", "..", "docs"))
+    args = parser.parse_args()
+    # langchain warns about every chunk longer than chunk_size
+    logging.disable(logging.WARNING)
+    docs = load_docs(args.docs, args.megabytes)
+    megabytes = sum(len(doc.encode("utf-8")) for doc in docs) / 1e6
+    for chunk_size, chunk_overlap in SETTINGS:
+        print(f"{megabytes:.0f}MB, chunk_size={chunk_size} chunk_overlap={chunk_overlap}")
+        # The chunkers used to build a langchain splitter for every document
+        bench("langchain RecursiveCharacterTextSplitter", lambda doc: RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap, length_function=len).split_text(doc), docs, megabytes)
+        bench("split_text_recursive", lambda doc: split_text_recursive(doc, chunk_size, chunk_overlap), docs, megabytes)
+        bench("langchain CharacterTextSplitter", lambda doc: CharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap, length_function=len).split_text(doc), docs, megabytes)
+        bench("split_text_on_separator", lambda doc: split_text_on_separator(doc, chunk_size, chunk_overlap), docs, megabytes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+import asyncio
+import threading
+
+from neumai.Shared.async_utils import LoopClients, iterate_in_thread
+
+
+class Client:
+    def __init__(self) -> None:
+        self.closed = False
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+def test_loop_clients_are_closed_when_their_loop_shuts_down():
+    clients = LoopClients()
+    created = []
+
+    async def use_client():
+        client = clients.get(create=Client)
+        assert clients.get(create=Client) is client
+        created.append(client)
+
+    asyncio.run(use_client())
+    asyncio.run(use_client())
+    assert len(created) == 2
+    assert all(client.closed for client in created)
+
+
+def test_loop_clients_close():
+    clients = LoopClients()
+    loop = asyncio.new_event_loop()
+    try:
+        async def get_client():
+            return clients.get(create=Client)
+        client = loop.run_until_complete(get_client())
+        clients.close()
+        assert client.closed
+    finally:
+        loop.close()
+
+
+def test_loop_clients_aclose():
+    clients = LoopClients()
+
+    async def main():
+        client = clients.get(create=Client)
+        await clients.aclose()
+        assert client.closed
+        assert clients.get(create=Client) is not client
+
+    asyncio.run(main())
+
+
+def test_iterate_in_thread_cancelled_while_next_runs():
+    started, release, closed = threading.Event(), threading.Event(), threading.Event()
+
+    def items():
+        try:
+            yield 1
+            started.set()
+            release.wait()
+            yield 2
+        finally:
+            closed.set()
+
+    async def consume():
+        async for _ in iterate_in_thread(items()):
+            pass
+
+    async def main():
+        task = asyncio.create_task(consume())
+        await asyncio.to_thread(started.wait)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        # The generator is closed once the running `next` returns
+        assert not closed.is_set()
+        release.set()
+        assert await asyncio.to_thread(closed.wait, 5)
+
+    asyncio.run(main())
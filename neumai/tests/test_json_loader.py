@@ -0,0 +1,20 @@
+import io
+import json
+
+import pytest
+
+from neumai.Loaders.JSONLoader import _iter_json_array
+
+CASES = ["[]", "[ ]", "[1, 2]", '[{"a": 1}, [2, 3], "x"]', " [1e5]  \n", "[1,]", "[,]", "[,1]", "[1 2]", "[1] x", "[1]]", "[1, "]
+
+
+@pytest.mark.parametrize("text", CASES)
+@pytest.mark.parametrize("chunk_size", [1, 3, 1024])
+def test_iter_json_array_matches_json_loads(text, chunk_size):
+    try:
+        expected = json.loads(text)
+    except json.JSONDecodeError:
+        with pytest.raises(json.JSONDecodeError):
+            list(_iter_json_array(io.StringIO(text), chunk_size=chunk_size))
+    else:
+        assert list(_iter_json_array(io.StringIO(text), chunk_size=chunk_size)) == expected
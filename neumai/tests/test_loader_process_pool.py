@@ -0,0 +1,51 @@
+import json
+
+import pytest
+
+from neumai.Loaders.JSONLoader import JSONLoader
+from neumai.Loaders.LoaderProcessPool import LoaderProcessPool, _BUFFERED_DOCUMENTS
+from neumai.Shared.LocalFile import LocalFile
+
+
+def json_file(name:str, count:int) -> LocalFile:
+    records = [{"id": f"{name}-{i}"} for i in range(count)]
+    return LocalFile.from_bytes(json.dumps(records).encode("utf-8"), metadata={}, id=name, suffix=".json")
+
+
+@pytest.fixture
+def pool():
+    with LoaderProcessPool(workers=2, start_method="fork") as pool:
+        yield pool
+
+
+@pytest.mark.parametrize("ordered", [True, False])
+def test_load_files_streams_documents(pool, ordered):
+    counts = {"a": 3 * _BUFFERED_DOCUMENTS, "b": 1, "c": 0, "d": 10}
+    files = [json_file(name, count) for name, count in counts.items()]
+    loaded = {}
+    for file, documents in pool.load_files(loader=JSONLoader(streaming=True), files=files, ordered=ordered):
+        loaded[file.id] = [document.id for document in documents]
+    if ordered:
+        assert list(loaded) == list(counts)
+    assert {name: len(ids) for name, ids in loaded.items()} == counts
+    assert loaded["a"][:2] == ["a-0.id", "a-1.id"]
+
+
+def test_load_files_raises_loader_errors(pool):
+    broken = LocalFile.from_bytes(b"[1, ", metadata={}, id="broken", suffix=".json")
+    results = pool.load_files(loader=JSONLoader(streaming=True), files=[json_file("a", 2), broken])
+    assert len(list(next(results)[1])) == 2
+    _, documents = next(results)
+    with pytest.raises(Exception):
+        list(documents)
+
+
+def test_load_files_stops_early(pool):
+    files = [json_file(name, 5 * _BUFFERED_DOCUMENTS) for name in "abcd"]
+    results = pool.load_files(loader=JSONLoader(streaming=True), files=files)
+    _, documents = next(results)
+    assert next(documents).id == "a-0.id"
+    results.close()
+    # Loader processes interrupted mid-file are replaced
+    loaded = [[document.id for document in documents] for _, documents in pool.load_files(loader=JSONLoader(streaming=True), files=[json_file("e", 2)])]
+    assert loaded == [["e-0.id", "e-1.id"]]
@@ -0,0 +1,98 @@
+import random
+
+import pytest
+from langchain.text_splitter import CharacterTextSplitter, RecursiveCharacterTextSplitter
+
+from neumai.Chunkers.splitter_utils import DEFAULT_SEPARATORS, split_text_on_separator, split_text_recursive
+
+SEPARATOR_LISTS = [
+    DEFAULT_SEPARATORS,
+    ["\n\n", "\n", " "],
+    ["\n", "."],
+    ["ab", "a", ""],
+    [""],
+]
+ALPHABET = "ab. \n\t"
+
+
+def random_text(rng:random.Random) -> str:
+    # A small alphabet makes separators, runs of whitespace and repeated pieces frequent
+    words = ["".join(rng.choice(ALPHABET) for _ in range(rng.randint(0, 8))) for _ in range(rng.randint(0, 60))]
+    return rng.choice(["", " ", "\n\n", "\n"]).join(words)
+
+
+def random_sizes(rng:random.Random):
+    chunk_size = rng.randint(1, 40)
+    return chunk_size, rng.randint(0, chunk_size)
+
+
+def word_counter(texts):
+    return [len(text.split()) + text.count("\n") for text in texts]
+
+
+def langchain_recursive(text, chunk_size, chunk_overlap, separators, length_function=len):
+    return RecursiveCharacterTextSplitter(separators=separators, chunk_size=chunk_size, chunk_overlap=chunk_overlap, length_function=length_function).split_text(text)
+
+
+def langchain_character(text, chunk_size, chunk_overlap, separator, length_function=len):
+    return CharacterTextSplitter(separator=separator, chunk_size=chunk_size, chunk_overlap=chunk_overlap, length_function=length_function).split_text(text)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_recursive_matches_langchain(seed):
+    rng = random.Random(seed)
+    for _ in range(300):
+        text = random_text(rng)
+        chunk_size, chunk_overlap = random_sizes(rng)
+        separators = rng.choice(SEPARATOR_LISTS)
+        assert split_text_recursive(text, chunk_size, chunk_overlap, separators=separators) == langchain_recursive(text, chunk_size, chunk_overlap, separators)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_character_matches_langchain(seed):
+    rng = random.Random(seed)
+    for _ in range(300):
+        text = random_text(rng)
+        chunk_size, chunk_overlap = random_sizes(rng)
+        separator = rng.choice(["\n\n", "\n", " ", ".", "ab"])
+        assert split_text_on_separator(text, chunk_size, chunk_overlap, separator=separator) == langchain_character(text, chunk_size, chunk_overlap, separator)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_token_counter_matches_langchain_length_function(seed):
+    rng = random.Random(seed)
+    length_function = lambda text: word_counter([text])[0]
+    for _ in range(200):
+        text = random_text(rng)
+        chunk_size, chunk_overlap = random_sizes(rng)
+        separators = rng.choice(SEPARATOR_LISTS)
+        assert split_text_recursive(text, chunk_size, chunk_overlap, separators=separators, token_counter=word_counter) == langchain_recursive(text, chunk_size, chunk_overlap, separators, length_function)
+        separator = rng.choice(["\n\n", "\n", " "])
+        assert split_text_on_separator(text, chunk_size, chunk_overlap, separator=separator, token_counter=word_counter) == langchain_character(text, chunk_size, chunk_overlap, separator, length_function)
+
+
+@pytest.mark.parametrize("text", ["", "abcdefghij", "a b c d e f", "one\n\ntwo\n\nthree"])
+def test_empty_separator(text):
+    assert split_text_recursive(text, 3, 1, separators=[""]) == langchain_recursive(text, 3, 1, [""])
+    assert split_text_on_separator(text, 3, 1, separator="") == langchain_character(text, 3, 1, "")
+
+
+@pytest.mark.parametrize("chunk_size", [1, 5, 12])
+def test_overlap_equal_to_chunk_size(chunk_size):
+    text = "alpha beta gamma\n\ndelta epsilon\nzeta eta theta iota"
+    assert split_text_recursive(text, chunk_size, chunk_size) == langchain_recursive(text, chunk_size, chunk_size, DEFAULT_SEPARATORS)
+    assert split_text_on_separator(text, chunk_size, chunk_size, separator=" ") == langchain_character(text, chunk_size, chunk_size, " ")
+
+
+@pytest.mark.parametrize("text", ["   ", "\n\n\n\n", "a\n\n  \n\n b", " \t \n \t ", "x" + " " * 30 + "y"])
+def test_whitespace_only_pieces(text):
+    for chunk_size, chunk_overlap in [(1, 0), (4, 2), (10, 0)]:
+        assert split_text_recursive(text, chunk_size, chunk_overlap) == langchain_recursive(text, chunk_size, chunk_overlap, DEFAULT_SEPARATORS)
+        assert split_text_on_separator(text, chunk_size, chunk_overlap, separator="\n\n") == langchain_character(text, chunk_size, chunk_overlap, "\n\n")
+
+
+def test_overlap_larger_than_chunk_size_raises():
+    with pytest.raises(ValueError):
+        split_text_recursive("text", 2, 3)
+    with pytest.raises(ValueError):
+        split_text_on_separator("text", 2, 3)
@@ -0,0 +1,102 @@
+import numpy as np
+import pytest
+
+from neumai.Pipelines.VectorSpool import VectorSpool
+from neumai.Shared.Exceptions import MultiSinkWriteException, VectorSpoolFullException
+from neumai.Shared.NeumVectorBatch import NeumVectorBatch
+from neumai.SinkConnectors.MultiSink import MultiSink
+from neumai.SinkConnectors.SinkConnector import SinkConnector
+
+
+class MemorySink(SinkConnector):
+    fail: bool = False
+
+    @property
+    def sink_name(self) -> str:
+        return "MemorySink"
+
+    @property
+    def required_properties(self):
+        return []
+
+    @property
+    def optional_properties(self):
+        return []
+
+    def validation(self) -> bool:
+        return True
+
+    def store(self, vectors_to_store) -> int:
+        if self.fail:
+            raise RuntimeError("sink is down")
+        return len(vectors_to_store)
+
+    def search(self, vector, number_of_results, filters=[]):
+        return []
+
+    def delete_vectors_with_file_id(self, file_id:str) -> bool:
+        return True
+
+    def info(self):
+        return None
+
+
+def make_batch(prefix:str, count:int = 2, dimensions:int = 4) -> NeumVectorBatch:
+    return NeumVectorBatch(
+        ids=[f"{prefix}-{i}" for i in range(count)],
+        vectors=np.arange(count * dimensions, dtype=np.float32).reshape(count, dimensions),
+        metadata=[{"text": f"{prefix} {i}"} for i in range(count)],
+    )
+
+
+def pending_ids(spool:VectorSpool):
+    return [batch.ids[0] for _, batch in spool.pending()]
+
+
+def test_compact_with_acknowledged_active_segment(tmp_path):
+    with VectorSpool(str(tmp_path), segment_bytes=1) as spool:
+        records = [spool.append(make_batch(name)) for name in ("a", "b", "c")]
+        spool.ack(records[1])
+        spool.ack(records[2])
+        spool.compact()
+        assert pending_ids(spool) == ["a-0"]
+    with VectorSpool(str(tmp_path)) as spool:
+        assert pending_ids(spool) == ["a-0"]
+
+
+def test_append_compacts_when_full(tmp_path):
+    with VectorSpool(str(tmp_path), segment_bytes=1) as spool:
+        records = [spool.append(make_batch(name)) for name in ("a", "b", "c")]
+        spool.ack(records[1])
+        spool.ack(records[2])
+        spool.max_bytes = spool.size_bytes
+        spool.append(make_batch("d"))
+        assert pending_ids(spool) == ["a-0", "d-0"]
+        with pytest.raises(VectorSpoolFullException):
+            spool.append(make_batch("e", count=50))
+
+
+def test_recover_pending_records(tmp_path):
+    with VectorSpool(str(tmp_path), segment_bytes=1) as spool:
+        records = [spool.append(make_batch(name)) for name in ("a", "b", "c")]
+        spool.ack(records[0])
+    with VectorSpool(str(tmp_path)) as spool:
+        assert spool.pending_batches == 2
+        assert spool.pending_vectors == 4
+        (_, batch), _ = spool.pending()
+        np.testing.assert_array_equal(batch.vectors, make_batch("b").vectors)
+        assert batch.metadata == make_batch("b").metadata
+
+
+def test_multisink_batches_acknowledged_after_flush(tmp_path):
+    sink = MultiSink(sinks=[MemorySink(), MemorySink(fail=True)], max_retries=0)
+    with VectorSpool(str(tmp_path)) as spool:
+        assert spool.store(sink, make_batch("a")) == 2
+        assert spool.pending_batches == 1
+        with pytest.raises(MultiSinkWriteException):
+            spool.flush(sink)
+        assert spool.pending_batches == 1
+        sink.sinks[1].fail = False
+        assert spool.replay(sink) == 2
+        assert spool.pending_batches == 0
+    sink.close()